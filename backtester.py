@@ -1,25 +1,56 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
-from datetime import datetime
-from strategy import Trade
-from config import LOG
+from typing import Dict, List, Optional
+from strategy import Trade, bar_time
+from metrics import METRICS
+from performance import compute_metrics, periods_per_year
+from journal import BUY, CLOSE, SELL, TradeJournal
+from tradelog import TradeLog
 
 
+BACKTEST_MODES = ("vectorized", "loop")
+
 
 class Backtester:
-    def __init__(self, signals_df: pd.DataFrame, ticker: str, starting_cash: float = 100000.0):
+    def __init__(self, signals_df: pd.DataFrame, ticker: str, starting_cash: float = 100000.0, mode: str = "vectorized",
+                 journal: Optional[TradeJournal] = None):
+        if mode not in BACKTEST_MODES:
+            raise ValueError(f"Unknown backtest mode {mode!r}, expected one of {BACKTEST_MODES}")
         self.signals = signals_df
         self.ticker = ticker
         self.starting_cash = starting_cash
-        self.trades: List[Trade] = []
+        self.mode = mode
+        self.trade_log = TradeLog(tickers=[ticker])
+        # BUY/SELL events; logged from a background thread once the run is done
+        self.journal = journal if journal is not None else TradeJournal()
+        # per-bar equity, drawdown and shares held, filled in by run()
+        self.equity: np.ndarray = np.empty(0)
+        self.drawdown: np.ndarray = np.empty(0)
+        self.shares: np.ndarray = np.empty(0)
 
     def run(self):
+        with METRICS.timer("backtest.run", self.ticker):
+            if self.mode == "loop":
+                result = self._run_loop()
+            else:
+                result = self._run_vectorized()
+        self.journal.publish()
+        METRICS.observe("backtest.trades", len(self.trade_log))
+        return result
+
+    @property
+    def trades(self) -> List[Trade]:
+        """The trades as Trade objects (materialized from `trade_log` on each access)."""
+        return self.trade_log.to_trades()
+
+    def _run_loop(self):
+        trades: List[Trade] = []
+        entries: List[int] = []
+        exits: List[int] = []
         cash = self.starting_cash
         position = None  # Trade object
-        for idx, row in self.signals.iterrows():
-            date = idx.date()
+        for i, (idx, row) in enumerate(self.signals.iterrows()):
+            date = bar_time(idx)
             close = row["Close"]
             if position is None and row.get("buy_signal", False):
                 size = cash // close  # integer shares
@@ -27,36 +58,141 @@ class Backtester:
                     continue
                 position = Trade(ticker=self.ticker, entry_date=date, entry_price=close, size=size)
                 cash -= size * close
-                LOG.info(f"{self.ticker} BUY on {date} @ {close} size={size}")
+                entries.append(i)
+                self.journal.record(BUY, self.ticker, idx, close, size, bar=i)
             elif position is not None and row.get("sell_signal", False):
                 position.exit_date = date
                 position.exit_price = close
                 cash += position.size * close
-                LOG.info(f"{self.ticker} SELL on {date} @ {close} size={position.size}")
-                self.trades.append(position)
+                self.journal.record(SELL, self.ticker, idx, close, position.size, bar=i)
+                exits.append(i)
+                trades.append(position)
                 position = None
         # close any open position at last price
         if position is not None:
             last_price = self.signals.iloc[-1]["Close"]
-            position.exit_date = self.signals.index[-1].date()
+            position.exit_date = bar_time(self.signals.index[-1])
             position.exit_price = last_price
             cash += position.size * last_price
-            self.trades.append(position)
+            self.journal.record(CLOSE, self.ticker, self.signals.index[-1], last_price, position.size,
+                                bar=len(self.signals) - 1)
+            exits.append(len(self.signals) - 1)
+            trades.append(position)
             position = None
         final_value = cash
-        return self.trades, final_value
+        self._build_equity(self.signals["Close"].to_numpy(dtype=float), np.asarray(entries, dtype=np.intp),
+                           np.asarray(exits, dtype=np.intp), np.asarray([t.size for t in trades], dtype=float))
+        self.trade_log = TradeLog.from_trades(trades, tz=self.signals.index.tz) if trades else TradeLog(tickers=[self.ticker])
+        return self.trade_log, final_value
+
+    def _signal_array(self, column: str) -> np.ndarray:
+        if column not in self.signals:
+            return np.zeros(len(self.signals), dtype=bool)
+        return self.signals[column].fillna(False).to_numpy(dtype=bool)
+
+    def _run_vectorized(self):
+        close = self.signals["Close"].to_numpy(dtype=float)
+        buy = self._signal_array("buy_signal")
+        sell = self._signal_array("sell_signal")
+        n = len(close)
+
+        # Only bars carrying a signal can change state, so walk those instead of every bar.
+        entries: List[int] = []
+        exits: List[int] = []
+        sizes: List[float] = []
+        cash = self.starting_cash
+        in_position = False
+        size = 0.0
+        for i in np.flatnonzero(buy | sell).tolist():
+            price = close[i]
+            if not in_position and buy[i]:
+                size = cash // price  # integer shares
+                if size <= 0:
+                    continue
+                cash -= size * price
+                in_position = True
+                entries.append(i)
+                sizes.append(size)
+            elif in_position and sell[i]:
+                cash += size * price
+                in_position = False
+                exits.append(i)
+        if in_position:
+            # close any open position at last price
+            cash += size * close[-1]
+            exits.append(n - 1)
+
+        entry_idx = np.asarray(entries, dtype=np.intp)
+        exit_idx = np.asarray(exits, dtype=np.intp)
+        size_arr = np.asarray(sizes, dtype=float)
+        self._build_equity(close, entry_idx, exit_idx, size_arr)
+
+        index = self.signals.index
+        self.trade_log = TradeLog.from_arrays(self.ticker, index[entry_idx], index[exit_idx], close[entry_idx],
+                                              close[exit_idx], size_arr)
+        if self.journal.enabled:
+            for e, x, s in zip(entry_idx.tolist(), exit_idx.tolist(), size_arr.tolist()):
+                self.journal.record(BUY, self.ticker, index[e], close[e], s, bar=e)
+                self.journal.record(SELL if x != n - 1 or sell[x] else CLOSE, self.ticker, index[x], close[x], s,
+                                    bar=x)
+        return self.trade_log, cash
+
+    def _build_equity(self, close: np.ndarray, entry_idx: np.ndarray, exit_idx: np.ndarray, sizes: np.ndarray):
+        """Mark-to-market equity and drawdown per bar from the resolved entry/exit bars."""
+        n = len(close)
+        if n == 0:
+            self.equity = np.empty(0)
+            self.drawdown = np.empty(0)
+            self.shares = np.empty(0)
+            return
+        # Shares held at the close of each bar: +size from the entry bar, -size from the exit bar.
+        delta = np.zeros(n + 1)
+        np.add.at(delta, entry_idx, sizes)
+        np.add.at(delta, exit_idx, -sizes)
+        shares = np.cumsum(delta[:n])
+        # Cash moves by the traded notional on entry and exit bars.
+        flows = np.zeros(n + 1)
+        np.add.at(flows, entry_idx, -sizes * close[entry_idx])
+        np.add.at(flows, exit_idx, sizes * close[exit_idx])
+        cash = self.starting_cash + np.cumsum(flows[:n])
+        equity = cash + shares * close
+        peak = np.maximum.accumulate(equity)
+        self.equity = equity
+        self.drawdown = equity / peak - 1.0
+        self.shares = shares
 
     def summary(self):
-        wins = 0
-        losses = 0
-        total_pnl = 0.0
-        for t in self.trades:
-            pnl = t.pnl() or 0.0
-            total_pnl += pnl
-            if pnl > 0:
-                wins += 1
-            else:
-                losses += 1
-        win_ratio = wins / (wins + losses) if (wins + losses) > 0 else None
-        return {"trades": len(self.trades), "wins": wins, "losses": losses, "win_ratio": win_ratio, "total_pnl": total_pnl}
+        return self.trade_log.summary()
+
+    @property
+    def equity_curve(self) -> List[Dict]:
+        """Per-bar rows {index, equity, drawdown} (index counts bars from 1), as CSVSLogger.log_equity_curve takes."""
+        return pd.DataFrame({
+            "index": np.arange(1, len(self.equity) + 1),
+            "equity": self.equity,
+            "drawdown": self.drawdown,
+        }).to_dict("records")
 
+    def get_performance_metrics(self, risk_free: float = 0.0) -> Dict:
+        """Trade stats plus equity-curve metrics for the last run, keyed the way the results logs expect."""
+        summary = self.summary()
+        m = compute_metrics(self.equity, self.shares, self.signals["Close"].to_numpy(dtype=float),
+                            periods_per_year(self.signals.index), risk_free)
+        win_ratio = summary["win_ratio"]
+        return {
+            "Total_Trades": summary["trades"],
+            "Winning_Trades": summary["wins"],
+            "Losing_Trades": summary["losses"],
+            "Win_Rate": win_ratio * 100 if win_ratio is not None else 0.0,
+            "Total_PnL": summary["total_pnl"],
+            "Final_Equity": float(self.equity[-1]) if len(self.equity) else self.starting_cash,
+            "Total_Return_Pct": m["total_return"] * 100,
+            "CAGR_Pct": m["cagr"] * 100,
+            "Volatility_Pct": m["volatility"] * 100,
+            "Sharpe_Ratio": m["sharpe"],
+            "Sortino_Ratio": m["sortino"],
+            "Max_Drawdown_Pct": m["max_drawdown"] * 100,
+            "Max_Drawdown_Duration": m["max_drawdown_duration"],
+            "Exposure_Pct": m["exposure"] * 100,
+            "Turnover": m["turnover"],
+        }
@@ -0,0 +1,466 @@
+"""Offline performance benchmarks.
+
+Run with ``python benchmark.py <name> [options]``; every benchmark prints a JSON
+report so results can be diffed between runs. Save a report with ``--json`` and pass
+it back as ``--baseline`` to exit non-zero when any timing regressed by more than
+``--tolerance``.
+
+All data comes from `synthetic`, so benchmarks are deterministic and need no network:
+``--tickers`` 1..5000, ``--bars`` per ticker and ``--freq`` ("B" daily, "min" 1-minute).
+
+``python benchmark.py imports`` measures import time of the CLI entry modules with
+``python -X importtime`` and exits non-zero when one exceeds its budget in
+IMPORT_BUDGETS or eagerly imports a heavy optional dependency.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Sequence
+
+import pandas as pd
+
+from backtester import Backtester
+from config import LOG
+from csv_logger import CSVSLogger
+from data_fetcher import DataFetcher
+from data_quality import DataQualityValidator
+from indicators import Indicators, PanelIndicators
+from market_store import MarketDataStore, legacy_csv_path
+from ml_model import MLModel, PooledModel, latest_features
+from orchestration import Pipeline
+from screener import Screener
+from strategy import Strategy
+from synthetic import SyntheticProvider, synthetic_universe
+from tradelog import TradeLog
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (falls back to peak RSS off Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _in_fresh_process(fn: Callable, *args):
+    # a clean (spawned, not forked) interpreter per measurement keeps RSS numbers independent
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def _load_csv_universe(csv_dir: str, tickers: List[str]) -> Dict[str, float]:
+    before = rss_mb()
+    start = time.perf_counter()
+    frames = {t: pd.read_csv(legacy_csv_path(csv_dir, t), index_col=0, parse_dates=True) for t in tickers}
+    loaded = time.perf_counter()
+    checksum = sum(float(df["Close"].iloc[-1]) for df in frames.values())
+    return {"load_s": loaded - start, "load_and_touch_s": time.perf_counter() - start,
+            "rss_delta_mb": rss_mb() - before, "checksum": checksum}
+
+
+def _load_store_universe(store_dir: str, tickers: List[str]) -> Dict[str, float]:
+    before = rss_mb()
+    start = time.perf_counter()
+    store = MarketDataStore(store_dir)
+    frames = store.load_many(tickers)
+    loaded = time.perf_counter()
+    checksum = sum(float(df["Close"].iloc[-1]) for df in frames.values())
+    return {"load_s": loaded - start, "load_and_touch_s": time.perf_counter() - start,
+            "rss_delta_mb": rss_mb() - before, "checksum": checksum}
+
+
+def _measure(fn: Callable[[], object], memory: bool = True):
+    """Run `fn` once for wall time, then (if `memory`) once more under tracemalloc for peak allocation.
+
+    Timing and tracing are separate runs because tracemalloc slows allocation-heavy code.
+    """
+    start = time.perf_counter()
+    result = fn()
+    stats = {"seconds": time.perf_counter() - start}
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            stats["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result, stats
+
+
+def bench_stages(n_tickers: int = 50, n_bars: int = 252, freq: str = "B", ml_tickers: int = 20,
+                 memory: bool = True, workdir: str = None) -> dict:
+    """Time and memory-profile every stage of the batch pipeline on a synthetic universe.
+
+    Stages: warm-cache DataFetcher load, per-ticker and panel indicators, signal
+    generation, backtest run + summary, ML training (first `ml_tickers` tickers) and
+    the CSVSLogger trade/metrics writes (through to disk).
+    """
+    universe = synthetic_universe(n_tickers, n_bars=n_bars, freq=freq)
+    tickers = list(universe)
+    stages = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        store = MarketDataStore(os.path.join(tmp, "store"))
+        for t, df in universe.items():
+            store.write(t, df, flush=False)
+        store.flush()
+
+        def fetch():
+            # the provider only has the cached bars, so this is the warm path: cache load + tail check
+            fetcher = DataFetcher(tickers, period="max", store=store, provider=SyntheticProvider(universe),
+                                  max_workers=8)
+            return fetcher.fetch()
+
+        data, stages["fetch_cached"] = _measure(fetch, memory)
+
+        def indicators():
+            for df in data.values():
+                close = df["Close"]
+                Indicators.rsi(close, 14)
+                Indicators.sma(close, 20)
+                Indicators.sma(close, 50)
+                Indicators.macd(close)
+
+        _, stages["indicators"] = _measure(indicators, memory)
+
+        closes = pd.concat({t: df["Close"] for t, df in data.items()}, axis=1, sort=True)
+        _, stages["panel_indicators"] = _measure(lambda: PanelIndicators.compute(closes), memory)
+
+        signals, stages["signals"] = _measure(
+            lambda: {t: Strategy(df).generate_signals() for t, df in data.items()}, memory)
+
+        def backtest():
+            out = {}
+            for t, sig in signals.items():
+                bt = Backtester(sig, t)
+                trades, _ = bt.run()
+                out[t] = (trades, bt.summary())
+            return out
+
+        backtests, stages["backtest"] = _measure(backtest, memory)
+
+        ml_subset = tickers[:ml_tickers]
+        _, stages["ml_train"] = _measure(lambda: [MLModel(signals[t]).train() for t in ml_subset], memory)
+
+        trades_df = TradeLog.concat(trades for trades, _ in backtests.values()).to_frame()
+        summaries = {t: summary for t, (_, summary) in backtests.items()}
+
+        def csv_logging():
+            csv_log = CSVSLogger(os.path.join(tmp, "results"))
+            csv_log.log_trades(trades_df)
+            for t, summary in summaries.items():
+                csv_log.log_performance_metrics(summary, ticker=t)
+            csv_log.close()
+
+        _, stages["results_logging"] = _measure(csv_logging, memory)
+
+    return {
+        "benchmark": "stages",
+        "tickers": n_tickers,
+        "bars": n_bars,
+        "freq": freq,
+        "ml_tickers": len(ml_subset),
+        "trades": len(trades_df),
+        "stages": stages,
+        "total_s": sum(stage["seconds"] for stage in stages.values()),
+    }
+
+
+def bench_store(n_tickers: int = 500, n_bars: int = 1260, freq: str = "B", workdir: str = None) -> dict:
+    """Compare loading a universe from legacy per-ticker CSVs against the columnar store."""
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        csv_dir = os.path.join(tmp, "csv")
+        store_dir = os.path.join(tmp, "store")
+        os.makedirs(csv_dir)
+        universe = synthetic_universe(n_tickers, n_bars=n_bars, freq=freq)
+        for t, df in universe.items():
+            df.to_csv(legacy_csv_path(csv_dir, t))
+        tickers = list(universe)
+        del universe
+
+        start = time.perf_counter()
+        MarketDataStore(store_dir).import_csv_cache(csv_dir)
+        migrate_s = time.perf_counter() - start
+
+        csv = _in_fresh_process(_load_csv_universe, csv_dir, tickers)
+        store = _in_fresh_process(_load_store_universe, store_dir, tickers)
+    return {
+        "benchmark": "store",
+        "tickers": n_tickers,
+        "bars": n_bars,
+        "migrate_s": migrate_s,
+        "csv": csv,
+        "store": store,
+        "speedup": csv["load_s"] / store["load_s"] if store["load_s"] else None,
+    }
+
+
+def bench_fetch(n_tickers: int = 500, n_bars: int = 126, freq: str = "B", latency: float = 0.02,
+                error_rate: float = 0.02, max_rps: float = None, concurrency: Sequence[int] = (1, 2, 4, 8, 16, 32),
+                workdir: str = None) -> dict:
+    """Cold-cache DataFetcher throughput against a SyntheticProvider with injected latency and errors."""
+    universe = synthetic_universe(n_tickers, n_bars=n_bars, freq=freq)
+    levels = []
+    for workers in concurrency:
+        provider = SyntheticProvider(universe, latency=latency, error_rate=error_rate, max_rps=max_rps)
+        with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+            fetcher = DataFetcher(list(universe), period="max", store=MarketDataStore(tmp), provider=provider,
+                                  max_workers=workers, rate_limit=max_rps, backoff=0.01)
+            start = time.perf_counter()
+            result = fetcher.fetch()
+            elapsed = time.perf_counter() - start
+        levels.append({
+            "workers": workers,
+            "seconds": elapsed,
+            "tickers_per_s": len(result) / elapsed,
+            "fetched": len(result),
+            "failed": len(fetcher.failures),
+            "requests": provider.requests,
+            "injected_errors": provider.errors,
+            "throttled": provider.throttled,
+        })
+    return {"benchmark": "fetch", "tickers": n_tickers, "bars": n_bars, "latency_s": latency,
+            "error_rate": error_rate, "max_rps": max_rps, "levels": levels}
+
+
+def bench_ml(n_tickers: int = 500, n_bars: int = 126, freq: str = "B", model_type: str = "tree",
+             memory: bool = True, **_) -> dict:
+    """Per-ticker MLModel loop vs one PooledModel: training plus a next-bar prediction for every ticker.
+
+    The signals are built once up front, so only feature preparation, fitting and
+    prediction are measured (wall time and tracemalloc peak).
+    """
+    universe = synthetic_universe(n_tickers, n_bars=n_bars, freq=freq)
+    closes = pd.concat({t: df["Close"] for t, df in universe.items()}, axis=1, sort=True)
+    panel = PanelIndicators.compute(closes)
+    signals = {t: Strategy.from_panel(df, panel, t).generate_signals() for t, df in universe.items()}
+
+    def per_ticker():
+        accuracy, predictions = {}, {}
+        for t, sig in signals.items():
+            model, accuracy[t] = MLModel(sig).train(model_type)
+            predictions[t] = int(model.predict(latest_features(sig))[0])
+        return accuracy, predictions
+
+    def pooled():
+        model = PooledModel(model_type)
+        result = model.fit(signals)
+        return result, model.predict_latest(signals)
+
+    (accuracy, _), loop_stats = _measure(per_ticker, memory)
+    (result, predictions), pooled_stats = _measure(pooled, memory)
+    return {
+        "benchmark": "ml",
+        "tickers": n_tickers,
+        "bars": n_bars,
+        "model_type": model_type,
+        "per_ticker": {**loop_stats, "mean_accuracy": float(pd.Series(accuracy).mean())},
+        "pooled": {**pooled_stats, "accuracy": result["accuracy"], "train_rows": result["n_train"],
+                   "predicted": len(predictions)},
+        "speedup": loop_stats["seconds"] / pooled_stats["seconds"] if pooled_stats["seconds"] else None,
+    }
+
+
+def bench_quality(n_tickers: int = 500, n_bars: int = 1260, freq: str = "B", workdir: str = None, **_) -> dict:
+    """DataQualityValidator over a whole universe: cold, fully cached, and with one ticker's tail revised."""
+    universe = synthetic_universe(n_tickers, n_bars=n_bars, freq=freq)
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        validator = DataQualityValidator(cache_path=os.path.join(tmp, "quality.json"))
+        reports, cold = _measure(lambda: validator.validate_panel(universe), memory=False)
+        _, warm = _measure(lambda: validator.validate_panel(universe), memory=False)
+        first = next(iter(universe))
+        revised = universe[first].copy()
+        revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.01
+        universe[first] = revised
+        _, one_changed = _measure(lambda: validator.validate_panel(universe), memory=False)
+    return {
+        "benchmark": "quality",
+        "tickers": n_tickers,
+        "bars": n_bars,
+        "cold": cold,
+        "cached": warm,
+        "one_changed": one_changed,
+        "min_score": min(r["quality_score"] for r in reports.values()),
+    }
+
+
+def bench_screen(n_tickers: int = 500, n_bars: int = 1260, freq: str = "B", workdir: str = None, **_) -> dict:
+    """Latest-bar scan of a warm-cache universe: tail-window Screener vs the full Pipeline scan
+    (whole-history signals plus a backtest per ticker)."""
+    universe = synthetic_universe(n_tickers, n_bars=n_bars, freq=freq)
+    tickers = list(universe)
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        store = MarketDataStore(os.path.join(tmp, "store"))
+        for t, df in universe.items():
+            store.write(t, df, flush=False)
+        store.flush()
+
+        def fetcher():
+            return DataFetcher(tickers, period="max", store=store, provider=SyntheticProvider(universe),
+                               max_workers=8)
+
+        screener = Screener(tickers, fetcher=fetcher())
+        result, screen = _measure(screener.run, memory=False)
+        _, full = _measure(lambda: Pipeline(tickers, period="max", fetcher=fetcher(), state_path=None)
+                           .run(["scan"]), memory=False)
+    return {
+        "benchmark": "screen",
+        "tickers": n_tickers,
+        "bars": n_bars,
+        "lookback": screener.lookback,
+        "hits": len(result["hits"]),
+        "screener": screen,
+        "full_scan": full,
+        "speedup": full["seconds"] / screen["seconds"] if screen["seconds"] else None,
+    }
+
+
+# module -> (cumulative import budget in seconds, heavy packages it must not import)
+IMPORT_BUDGETS = {
+    "cli": (0.05, ("pandas", "numpy", "sklearn", "yfinance", "gspread", "ta")),
+    "orchestration": (1.0, ("sklearn", "yfinance", "gspread", "ta")),
+    "scan_service": (1.0, ("sklearn", "yfinance", "gspread", "ta")),
+}
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def import_profile(module: str) -> dict:
+    """`python -X importtime -c "import <module>"` in a fresh interpreter from the repo directory.
+
+    Returns the module's cumulative import time, every package it imported, and the ten
+    slowest of those by cumulative time.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True,
+                          text=True, cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(2)) / 1e6, (len(m.group(3)) - 1) // 2))
+    # rows are printed children first, so everything after the previous top-level row belongs to `module`
+    end = max(i for i, (name, _, level) in enumerate(rows) if name == module and level == 0)
+    begin = max((i + 1 for i, (_, _, level) in enumerate(rows[:end]) if level == 0), default=0)
+    imported = rows[begin:end]
+    slowest = sorted(((name, s) for name, s, _ in imported), key=lambda kv: -kv[1])[:10]
+    return {"cumulative_s": rows[end][1], "modules": [name for name, _, _ in imported],
+            "slowest": [{"module": name, "cumulative_s": s} for name, s in slowest]}
+
+
+def bench_imports(repeat: int = 5, budgets: Dict[str, tuple] = None, **_) -> dict:
+    """Import time of the CLI's entry modules, best of `repeat` fresh interpreters, against IMPORT_BUDGETS.
+
+    `over_budget` lists modules slower than their budget or importing a package they
+    should leave to the mode that needs it; `main` exits non-zero when it is not empty.
+    """
+    budgets = budgets or IMPORT_BUDGETS
+    modules = {}
+    over_budget = []
+    for module, (budget, forbidden) in budgets.items():
+        runs = [import_profile(module) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["cumulative_s"])
+        loaded = {name.split(".")[0] for name in best["modules"]}
+        eager = sorted(loaded.intersection(forbidden))
+        modules[module] = {"import_s": best["cumulative_s"], "budget_s": budget, "eager_imports": eager,
+                           "slowest": best["slowest"]}
+        if best["cumulative_s"] > budget:
+            over_budget.append(f"{module}: {best['cumulative_s']:.3f}s > {budget:.3f}s budget")
+        if eager:
+            over_budget.append(f"{module}: imports {', '.join(eager)} at load time")
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "cli.py", "--help"], capture_output=True, check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    return {"benchmark": "imports", "repeat": repeat, "modules": modules,
+            "cli_help_wall_s": time.perf_counter() - start, "over_budget": over_budget}
+
+
+BENCHMARKS = {
+    "stages": bench_stages,
+    "store": bench_store,
+    "fetch": bench_fetch,
+    "imports": bench_imports,
+    "ml": bench_ml,
+    "quality": bench_quality,
+    "screen": bench_screen,
+}
+
+
+def _timings(report, path: str = "") -> Dict[str, float]:
+    """Flatten every timing in a report ("seconds" or "*_s" keys) to {dotted.path: seconds}."""
+    out = {}
+    if isinstance(report, dict):
+        items = report.items()
+    elif isinstance(report, list):
+        items = ((str(i), v) for i, v in enumerate(report))
+    else:
+        return out
+    for key, value in items:
+        name = f"{path}.{key}" if path else key
+        if isinstance(value, (dict, list)):
+            out.update(_timings(value, name))
+        elif isinstance(value, (int, float)) and (key == "seconds" or key.endswith("_s")):
+            out[name] = float(value)
+    return out
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float = 0.25, min_seconds: float = 0.01) -> List[str]:
+    """Timings that got more than `tolerance` (fractional) slower than the baseline.
+
+    Timings under `min_seconds` in the baseline are ignored; they are too noisy to gate on.
+    """
+    current = _timings(report)
+    regressions = []
+    for name, before in _timings(baseline).items():
+        after = current.get(name)
+        if after is None or before < min_seconds:
+            continue
+        if after > before * (1 + tolerance):
+            regressions.append(f"{name}: {before:.4f}s -> {after:.4f}s ({after / before - 1:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=1260)
+    parser.add_argument("--freq", default="B", help='Bar frequency of the synthetic data, e.g. "B" or "min"')
+    parser.add_argument("--json", help="Write the report to this file as well as stdout")
+    parser.add_argument("--baseline", help="Earlier --json report; exit 1 if any timing regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    # per-trade INFO logging would dominate the timings
+    LOG.setLevel("WARNING")
+    report = BENCHMARKS[args.name](n_tickers=args.tickers, n_bars=args.bars, freq=args.freq)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(text)
+    if report.get("over_budget"):
+        print("OVER BUDGET:", *report["over_budget"], sep="\n  ", file=sys.stderr)
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"REGRESSION vs {args.baseline}:", *regressions, sep="\n  ", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
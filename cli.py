@@ -1,44 +1,201 @@
 import argparse
-from config import DEFAULT_TICKERS, LOG
-from data_fetcher import DataFetcher
-from logging import GSheetsLogger, GSHEETS_AVAILABLE
-from ml_model import run_ml_for_ticker
-from orchestration import run_backtest_for_tickers, scan_and_log
+from config import DAEMON_STATUS_PORT, DEFAULT_TICKERS, LOG
 import os 
+
+# Subsystems (pandas, yfinance, scikit-learn, gspread) are imported inside cli() once a
+# mode needs them, so --help and no-op invocations from cron start in milliseconds.
+
+
 def cli():
     parser = argparse.ArgumentParser(description="Mini algo-trading prototype CLI")
     parser.add_argument("--tickers", nargs="*", default=DEFAULT_TICKERS, help="Tickers list")
     parser.add_argument("--run-backtest", action="store_true")
     parser.add_argument("--scan", action="store_true", help="Run a fresh scan and optionally log to Google Sheets")
+    parser.add_argument("--screen", action="store_true",
+                        help="Update the cache, then rank latest-bar BUY/SELL signals from tail windows "
+                             "(add --run-backtest to backtest hits)")
     parser.add_argument("--ml", action="store_true", help="Run ML model for each ticker")
+    parser.add_argument("--ml-pooled", action="store_true",
+                        help="Train one ML model across all tickers and predict every ticker's next bar")
+    parser.add_argument("--ml-search", action="store_true",
+                        help="Time-series CV hyperparameter search per ticker; results go to the results store")
+    parser.add_argument("--predict", action="store_true",
+                        help="Predict the next bar for each ticker from its registered model (no training)")
+    parser.add_argument("--walk-forward", type=int, metavar="N",
+                        help="With --ml, also report out-of-sample accuracy over N walk-forward windows")
+    parser.add_argument("--refit", action="store_true", help="Ignore registered models and retrain with --ml")
+    parser.add_argument("--validate", action="store_true", help="Report a data-quality score per ticker")
+    parser.add_argument("--min-quality", type=float,
+                        help="Drop tickers whose data-quality score is below this before any other stage")
     parser.add_argument("--use-gsheets", action="store_true", help="Push logs to Google Sheets (requires creds)")
+    parser.add_argument("--daemon", action="store_true", help="Stay resident and scan on --schedule")
+    parser.add_argument("--schedule", default="close",
+                        help='Daemon schedule: "close", a daily "HH:MM", or an interval such as "15m"')
+    parser.add_argument("--interval", default="1d", help="Bar interval the daemon scans, e.g. 1d or 15m")
+    parser.add_argument("--status-port", type=int, default=DAEMON_STATUS_PORT,
+                        help="Local port for the daemon's /health and /status endpoints (0 picks a free port)")
+    parser.add_argument("--profile", action="store_true", help="Log a per-stage/per-ticker timing breakdown at the end")
+    parser.add_argument("--profile-out", help="Also run under cProfile and write pstats to this file")
+    parser.add_argument("--metrics-json", help="Write timers/counters/histograms as JSON to this file")
     args = parser.parse_args()
+    if args.walk_forward is not None and (not args.ml or args.walk_forward < 1):
+        parser.error("--walk-forward needs --ml and at least 1 window")
+
+    stages = []
+    if args.run_backtest:
+        stages.append("backtest")
+    if args.ml:
+        stages.append("ml")
+    if args.ml_pooled:
+        stages.append("ml_pooled")
+    if args.ml_search:
+        stages.append("signals")
+    if args.predict:
+        stages.append("predict")
+    if args.validate:
+        stages.append("validate")
+    if args.scan:
+        stages.append("scan")
+    # --daemon and --screen are modes of their own rather than pipeline stages
+    requested = [flag for flag, on in (
+        ("--run-backtest", args.run_backtest), ("--ml", args.ml), ("--ml-pooled", args.ml_pooled),
+        ("--ml-search", args.ml_search), ("--predict", args.predict), ("--validate", args.validate),
+        ("--scan", args.scan), ("--min-quality", args.min_quality is not None)) if on]
+    if args.daemon:
+        clashes = requested + (["--screen"] if args.screen else [])
+        if clashes:
+            parser.error(f"--daemon cannot be combined with {', '.join(clashes)}")
+    if args.screen:
+        # --run-backtest backtests the screener's hits
+        clashes = [flag for flag in requested if flag != "--run-backtest"]
+        clashes += ["--use-gsheets"] if args.use_gsheets else []
+        if clashes:
+            parser.error(f"--screen cannot be combined with {', '.join(clashes)}")
+    if not stages and not (args.daemon or args.screen):
+        return
+
+    from metrics import METRICS, profiled
+
+    gsheet = None
+    if (args.scan or args.daemon) and args.use_gsheets:
+        from gsheets_logger import GSheetsLogger, GSHEETS_AVAILABLE
+
+        if not GSHEETS_AVAILABLE:
+            LOG.error("gspread not installed or not configured. Install gspread and google-auth.")
+        else:
+            gsheet = GSheetsLogger(cred_json=os.environ.get("GSHEET_CRED_JSON"), spreadsheet_name=os.environ.get("GSHEET_SPREADSHEET_NAME"))
+
+    if args.daemon:
+        from scan_service import ScanSchedule, ScanService
+
+        if args.profile or args.metrics_json:
+            METRICS.enable()
+        service = ScanService(args.tickers, ScanSchedule.parse(args.schedule), interval=args.interval,
+                              gsheet=gsheet, status_port=args.status_port)
+        try:
+            service.run_forever()
+        except KeyboardInterrupt:
+            pass  # run_forever has already shut the service down
+        finally:
+            if gsheet is not None:
+                gsheet.close()
+        if args.profile:
+            LOG.info(f"Profile:\n{METRICS.report()}")
+        if args.metrics_json:
+            METRICS.to_json(args.metrics_json)
+        return
+
+    if args.screen:
+        from screener import Screener
+
+        if args.profile or args.metrics_json:
+            METRICS.enable()
+        with profiled(args.profile_out):
+            result = Screener(args.tickers).run(backtest=args.run_backtest)
+        LOG.info(f"Screener hits:\n{result['hits'].to_string()}")
+        for t, summary in result["backtest"].items():
+            LOG.info(f"{t} => summary: {summary}")
+        if args.profile:
+            LOG.info(f"Profile:\n{METRICS.report()}")
+        if args.metrics_json:
+            METRICS.to_json(args.metrics_json)
+        return
+
+    from orchestration import Pipeline
+
+    # one fetch and one set of indicators/signals shared by every requested mode
+    LOG.info(f"Running pipeline: {', '.join(stages)}")
+    if args.profile or args.metrics_json:
+        METRICS.enable()
+    feature_cache = None
+    registry = None
+    if args.ml:
+        from feature_cache import FeatureCache
+
+        feature_cache = FeatureCache()
+    if args.ml or args.predict:
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry(refit=args.refit)
+    pipeline = Pipeline(args.tickers, period="6mo", feature_cache=feature_cache, gsheet=gsheet,
+                        model_registry=registry, min_quality=args.min_quality, walk_forward=args.walk_forward)
+    with profiled(args.profile_out):
+        results = pipeline.run(stages)
+
+    if args.validate:
+        from data_quality import summary
+
+        LOG.info(f"Data quality:\n{summary(pipeline.quality).to_string()}")
 
     if args.run_backtest:
-        LOG.info("Running backtest...")
-        results = run_backtest_for_tickers(args.tickers)
-        for t, res in results.items():
-            LOG.info(f"{t} => summary: {res['summary']}")
+        for t, done in results.items():
+            res = done.get("backtest", {})
+            LOG.info(f"{t} => summary: {res.get('summary', res)}")
 
     if args.ml:
-        LOG.info("Running ML models... (this may take a little while)")
-        fetcher = DataFetcher(tickers=args.tickers, period="6mo")
-        all_data = fetcher.fetch()
-        for t, df in all_data.items():
-            ml_res = run_ml_for_ticker(df, model_type="tree")
-            LOG.info(f"{t} => ML: {ml_res}")
+        for t, done in results.items():
+            LOG.info(f"{t} => ML: {done.get('ml')}")
+
+    if args.ml_pooled:
+        pooled = pipeline.pooled
+        if pooled.get("success"):
+            LOG.info(f"Pooled ML accuracy: {pooled['accuracy']:.4f}\n{pooled['predictions'].to_string()}")
+        else:
+            LOG.info(f"Pooled ML: {pooled}")
+
+    if args.ml_search:
+        import pandas as pd
+        from csv_logger import CSVSLogger
+        from ml_search import search_tickers
+
+        signals = {t: done["signals"] for t, done in results.items() if isinstance(done.get("signals"), pd.DataFrame)}
+        csv_log = CSVSLogger()
+        try:
+            # one worker pool for all tickers; a ticker that fails is logged and skipped
+            for t, ml_results in search_tickers(signals).items():
+                if ml_results.get("success", True):
+                    csv_log.log_ml_results(ml_results, ticker=t)
+                LOG.info(f"{t} => ML search: {ml_results}")
+        finally:
+            csv_log.close()
+
+    if args.predict:
+        for t, done in results.items():
+            LOG.info(f"{t} => prediction: {done.get('predict')}")
 
     if args.scan:
-        LOG.info("Running scan...")
-        gsheet = None
-        if args.use_gsheets:
-            if not GSHEETS_AVAILABLE:
-                LOG.error("gspread not installed or not configured. Install gspread and google-auth.")
-            else:
-                gsheet = GSheetsLogger(cred_json=os.environ.get("GSHEET_CRED_JSON"), spreadsheet_name=os.environ.get("GSHEET_SPREADSHEET_NAME"))
-        trades, summary = scan_and_log(args.tickers, gsheet=gsheet)
+        trades, summary = pipeline.scan_results()
         LOG.info(f"Scan results: {summary}")
 
+    if gsheet is not None:
+        # flush queued sheet writes before exiting
+        gsheet.close()
+
+    if args.profile:
+        LOG.info(f"Profile:\n{METRICS.report()}")
+    if args.metrics_json:
+        METRICS.to_json(args.metrics_json)
+        LOG.info(f"Metrics written to {args.metrics_json}")
 
 if __name__ == "__main__":
     cli()
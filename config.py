@@ -12,5 +12,19 @@ LOG.addHandler(ch)
 
 DEFAULT_TICKERS = ["RELIANCE.NS", "TCS.NS", "INFY.NS"]  # examples from NIFTY 50
 DATA_DIR = "./data"
+STORE_DIR = os.path.join(DATA_DIR, "store")
+SCAN_STATE_PATH = os.path.join(DATA_DIR, "scan_state.json")
+FEATURE_CACHE_DIR = os.path.join(DATA_DIR, "features")
+MODEL_DIR = os.path.join(DATA_DIR, "models")
+QUALITY_CACHE_PATH = os.path.join(DATA_DIR, "quality.json")
 GSHEET_CRED_JSON = os.environ.get("GSHEET_CRED_JSON", "gcp_service_account.json")
-GSHEET_SPREADSHEET_NAME = os.environ.get("GSHEET_SPREADSHEET_NAME", "algo_trading_log")
\ No newline at end of file
+GSHEET_SPREADSHEET_NAME = os.environ.get("GSHEET_SPREADSHEET_NAME", "algo_trading_log")
+
+# NSE session; the daemon's "close" schedule scans shortly after the closing bell
+MARKET_TZ = "Asia/Kolkata"
+MARKET_OPEN = "09:15"
+MARKET_CLOSE = "15:30"
+DAEMON_STATUS_PORT = int(os.environ.get("ALGO_DAEMON_PORT", "8765"))
+
+# tickers scoring below this in DataQualityValidator are reported as low quality
+QUALITY_MIN_SCORE = 70
@@ -4,24 +4,51 @@ import csv
 from datetime import datetime
 import logging
 from typing import Dict, List, Optional
+from metrics import timed
+from results_store import ResultsStore
+from tradelog import TradeLog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class CSVSLogger:
-    """CSV logger for algo trading results"""
+    """Logger for algo trading results.
+
+    By default everything logged through one instance goes into a single run-scoped
+    ResultsStore (one SQLite file per run under `output_dir`/runs), written in the
+    background; pass `ticker=` to tag per-ticker artifacts and call `close()` at the end
+    of the run. `use_store=False` keeps the old one-timestamped-CSV-per-call output.
+    """
     
-    def __init__(self, output_dir: str = "results"):
+    def __init__(self, output_dir: str = "results", use_store: bool = True, run_id: Optional[str] = None):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
-        logger.info(f"CSV Logger initialized. Output directory: {output_dir}")
+        self.store = ResultsStore(output_dir, run_id=run_id) if use_store else None
+        if self.store is not None:
+            logger.info(f"Results logger initialized. Run {self.store.run_id} -> {self.store.path}")
+        else:
+            logger.info(f"CSV Logger initialized. Output directory: {output_dir}")
+
+    def flush(self):
+        if self.store is not None:
+            self.store.flush()
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
     
-    def log_trades(self, trades_df: pd.DataFrame, filename: str = "trades"):
-        """Log comprehensive trade data to CSV"""
+    @timed("csv.log_trades")
+    def log_trades(self, trades_df: pd.DataFrame, filename: str = "trades", ticker: Optional[str] = None):
+        """Log comprehensive trade data to CSV (a TradeLog is converted with to_frame)"""
+        if isinstance(trades_df, TradeLog):
+            trades_df = trades_df.to_frame()
         if trades_df.empty:
             logger.warning("No trades to log")
             return
+        if self.store is not None:
+            self.store.write_frame(filename, trades_df, ticker=ticker)
+            return
         
         try:
             filepath = os.path.join(self.output_dir, f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
@@ -32,8 +59,12 @@ class CSVSLogger:
             logger.error(f"Failed to log trades to CSV: {e}")
             raise
     
-    def log_performance_metrics(self, metrics: Dict, filename: str = "performance"):
+    @timed("csv.log_performance_metrics")
+    def log_performance_metrics(self, metrics: Dict, filename: str = "performance", ticker: Optional[str] = None):
         """Log performance metrics to CSV"""
+        if self.store is not None:
+            self.store.write_metrics(filename, metrics, ticker=ticker)
+            return
         try:
             filepath = os.path.join(self.output_dir, f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
             
@@ -50,8 +81,13 @@ class CSVSLogger:
             logger.error(f"Failed to log performance metrics to CSV: {e}")
             raise
     
-    def log_ml_results(self, ml_results: Dict, filename: str = "ml_results"):
+    @timed("csv.log_ml_results")
+    def log_ml_results(self, ml_results: Dict, filename: str = "ml_results", ticker: Optional[str] = None):
         """Log ML model results to CSV"""
+        if self.store is not None:
+            self.store.write_metrics(filename, {model: result for model, result in ml_results.items()
+                                                if isinstance(result, dict) and 'accuracy' in result}, ticker=ticker)
+            return
         try:
             filepath = os.path.join(self.output_dir, f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
             
@@ -82,11 +118,15 @@ class CSVSLogger:
             logger.error(f"Failed to log ML results to CSV: {e}")
             raise
     
-    def log_feature_importance(self, feature_importance_df: pd.DataFrame, filename: str = "feature_importance"):
+    @timed("csv.log_feature_importance")
+    def log_feature_importance(self, feature_importance_df: pd.DataFrame, filename: str = "feature_importance", ticker: Optional[str] = None):
         """Log feature importance from ML model to CSV"""
         if feature_importance_df.empty:
             logger.warning("No feature importance data to log")
             return
+        if self.store is not None:
+            self.store.write_frame(filename, feature_importance_df, ticker=ticker)
+            return
         
         try:
             filepath = os.path.join(self.output_dir, f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
@@ -101,11 +141,16 @@ class CSVSLogger:
             logger.error(f"Failed to log feature importance to CSV: {e}")
             raise
     
-    def log_equity_curve(self, equity_curve: List[Dict], filename: str = "equity_curve"):
+    @timed("csv.log_equity_curve")
+    def log_equity_curve(self, equity_curve: List[Dict], filename: str = "equity_curve", ticker: Optional[str] = None):
         """Log equity curve data to CSV"""
         if not equity_curve:
             logger.warning("No equity curve data to log")
             return
+        if self.store is not None:
+            # the run already records when it happened; no per-row Timestamp column
+            self.store.write_frame(filename, pd.DataFrame(equity_curve), ticker=ticker)
+            return
         
         try:
             filepath = os.path.join(self.output_dir, f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
@@ -121,8 +166,12 @@ class CSVSLogger:
             logger.error(f"Failed to log equity curve to CSV: {e}")
             raise
     
-    def log_summary_report(self, summary_data: Dict, filename: str = "summary_report"):
+    @timed("csv.log_summary_report")
+    def log_summary_report(self, summary_data: Dict, filename: str = "summary_report", ticker: Optional[str] = None):
         """Log comprehensive summary report to CSV"""
+        if self.store is not None:
+            self.store.write_metrics(filename, summary_data, ticker=ticker)
+            return
         try:
             filepath = os.path.join(self.output_dir, f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
             
@@ -178,10 +227,13 @@ def log_trade(symbol, action, price, qty, file_path="results/trades.csv"):
 def log_trades_to_csv(trades, filename):
     """Legacy function for backward compatibility"""
     logger = CSVSLogger()
-    if isinstance(trades, pd.DataFrame):
-        logger.log_trades(trades, filename)
-    else:
-        logger.log_trades(pd.DataFrame(trades), filename)
+    try:
+        if isinstance(trades, pd.DataFrame):
+            logger.log_trades(trades, filename)
+        else:
+            logger.log_trades(pd.DataFrame(trades), filename)
+    finally:
+        logger.close()
 
 # Example usage
 if __name__ == "__main__":
@@ -207,6 +259,7 @@ if __name__ == "__main__":
         }
         
         logger.log_performance_metrics(sample_metrics, "Test_Performance")
+        logger.close()
         
         print("Test logging completed successfully!")
         
@@ -1,4 +1,4 @@
-import yfinance as yf
+import numpy as np
 import pandas as pd
 from typing import List, Optional, Dict
 import logging
@@ -8,40 +8,240 @@ warnings.filterwarnings('ignore')
 from utils import ensure_data_dir
 from config import DATA_DIR
 from config import LOG
-import os 
+from metrics import METRICS
+from market_store import MarketDataStore, legacy_csv_path
+from providers import DataProvider, YFinanceProvider, interval_to_timedelta, period_to_offset
+from resample import resample_ohlcv
+from data_quality import DataQualityValidator
+from rate_limit import TokenBucket, retry_with_backoff
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import os
+
+# Relative tolerance when comparing re-downloaded overlap bars against the cache.
+ADJUSTMENT_TOLERANCE = 1e-6
+
 
 # Configure logging
 class DataFetcher:
-    """Fetches daily data for tickers using yfinance. Saves to CSV cache.
+    """Fetches OHLCV data for tickers from a DataProvider (yfinance by default).
+
+    Bars are cached in a columnar MarketDataStore. Once a ticker is cached only the
+    bars after the cached tail are downloaded and merged in; the full `period` is
+    re-downloaded only when the provider reports a split/dividend or the overlapping
+    bars no longer match (i.e. the history was back-adjusted). Legacy per-ticker CSV
+    caches found in DATA_DIR are imported the first time the ticker is requested.
+
+    Intraday intervals are cached separately (store key "<ticker>@<interval>"). When the
+    provider caps how much history one request may cover (`max_request_span`), longer
+    ranges are downloaded as consecutive chunks and stitched together. `resampled()`
+    derives coarser bars (e.g. 5m/1h/1d from 1m) from the cache without downloading.
+
+    With max_workers > 1 tickers are fetched on a bounded thread pool. All requests
+    share one token bucket (`rate_limit` requests/second, unlimited if None) and each
+    is retried up to `retries` times with exponential backoff starting at `backoff`
+    seconds. Tickers that still fail are left out of the result and reported in
+    `self.failures`.
     """
 
-    def __init__(self, tickers: List[str], period: str = "6mo", interval: str = "1d"):
+    def __init__(self, tickers: List[str], period: str = "6mo", interval: str = "1d",
+                 store: Optional[MarketDataStore] = None, provider: Optional[DataProvider] = None,
+                 max_workers: int = 1, rate_limit: Optional[float] = None, retries: int = 3,
+                 backoff: float = 0.5):
         self.tickers = tickers
         self.period = period
         self.interval = interval
         ensure_data_dir()
+        self.store = store or MarketDataStore()
+        self.provider = provider or YFinanceProvider()
+        self.max_workers = max_workers
+        # no burst allowance: requests are spread evenly at `rate_limit` per second
+        self.limiter = TokenBucket(rate_limit, capacity=1) if rate_limit else None
+        self.retries = retries
+        self.backoff = backoff
+        self.rows_downloaded: Dict[str, int] = {}
+        self.failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._validator: Optional[DataQualityValidator] = None
+
+    def store_key(self, ticker: str) -> str:
+        # daily bars keep the plain ticker key used before intraday support
+        return ticker if self.interval == "1d" else f"{ticker}@{self.interval}"
 
-    def fetch(self, force_refresh: bool = False) -> dict:
-        result = {}
-        for t in self.tickers:
-            path = os.path.join(DATA_DIR, f"{t.replace('.', '_')}.csv")
-            if (not force_refresh) and os.path.exists(path):
-                try:
-                    df = pd.read_csv(path, index_col=0, parse_dates=True)
-                    # if last date is recent enough, keep cached
-                    if (datetime.datetime.now() - df.index[-1].to_pydatetime()).days < 2:
-                        LOG.info(f"Loaded cached data for {t} from {path}")
-                        result[t] = df
-                        continue
-                except Exception:
-                    LOG.exception("Failed to load cache, refetching")
-
-            LOG.info(f"Fetching {t} from yfinance")
-            yf_ticker = yf.Ticker(t)
-            df = yf_ticker.history(period=self.period, interval=self.interval, auto_adjust=False)
-            if df.empty:
-                LOG.warning(f"No data for {t}")
+    def _load_cached(self, ticker: str) -> Optional[pd.DataFrame]:
+        key = self.store_key(ticker)
+        if key not in self.store:
+            if key != ticker:
+                return None
+            path = legacy_csv_path(DATA_DIR, ticker)
+            if not os.path.exists(path):
+                return None
+            LOG.info(f"Migrating legacy CSV cache for {ticker} from {path}")
+            self.store.import_csv(ticker, path, flush=False)
+        return self.store.load(key)
+
+    def _is_fresh(self, df: pd.DataFrame) -> bool:
+        """True when no newer bar can exist yet, so the provider need not be asked."""
+        last = df.index[-1]
+        return pd.Timestamp.now(tz=last.tz) - last < interval_to_timedelta(self.interval)
+
+    @staticmethod
+    def _needs_full_refresh(cached: pd.DataFrame, delta: pd.DataFrame) -> bool:
+        # The newest cached bar may have been a partial (in-progress) bar, so only the
+        # bars before it are expected to be unchanged.
+        settled = cached.index[:-1]
+        fresh = delta.loc[~delta.index.isin(settled)]
+        for col in ("Stock Splits", "Dividends"):
+            if col in fresh and (fresh[col].fillna(0) != 0).any():
+                return True
+        overlap = delta.index.intersection(settled)
+        for col in ("Close", "Adj Close"):
+            if col not in delta or col not in cached or overlap.empty:
                 continue
-            df.to_csv(path)
-            result[t] = df
+            old = cached.loc[overlap, col].to_numpy(dtype=float)
+            new = delta.loc[overlap, col].to_numpy(dtype=float)
+            if not np.allclose(old, new, rtol=ADJUSTMENT_TOLERANCE, atol=0.0, equal_nan=True):
+                return True
+        return False
+
+    def _download(self, ticker: str, **kwargs) -> pd.DataFrame:
+        def attempt():
+            if self.limiter is not None:
+                self.limiter.acquire()
+            return self.provider.history(ticker, interval=self.interval, **kwargs)
+
+        df = retry_with_backoff(attempt, retries=self.retries, base_delay=self.backoff,
+                                description=f"Download of {ticker}")
+        with self._lock:
+            self.rows_downloaded[ticker] = self.rows_downloaded.get(ticker, 0) + len(df)
+        METRICS.incr("fetch.requests")
+        METRICS.incr("fetch.rows_downloaded", len(df))
+        return df
+
+    def _download_range(self, ticker: str, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """History from `start` (or the whole `period`) to now, in chunks if the provider caps request spans."""
+        span = self.provider.max_request_span.get(self.interval)
+        if span is None:
+            if start is None:
+                return self._download(ticker, period=self.period)
+            return self._download(ticker, start=start)
+
+        now = pd.Timestamp.now(tz="UTC")
+        if start is None:
+            offset = period_to_offset(self.period)
+            start = now - offset if offset is not None else None
+            limit = self.provider.max_history.get(self.interval)
+            if limit is not None and (start is None or start < now - limit):
+                start = now - limit
+            if start is None:
+                return self._download(ticker, period=self.period)
+        start = pd.Timestamp(start)
+        if start.tz is None:
+            start = start.tz_localize("UTC")
+        chunks = []
+        while start < now:
+            end = min(start + span, now)
+            chunks.append(self._download(ticker, start=start, end=end))
+            start = end
+        chunks = [c for c in chunks if not c.empty]
+        if not chunks:
+            return pd.DataFrame()
+        df = pd.concat(chunks)
+        return df[~df.index.duplicated(keep="last")].sort_index()
+
+    def _fetch_one(self, t: str, force_refresh: bool = False,
+                   cached: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        if force_refresh:
+            cached = None
+        elif cached is None:
+            try:
+                cached = self._load_cached(t)
+            except Exception:
+                LOG.exception("Failed to load cache, refetching")
+        if cached is not None and not cached.empty:
+            if self._is_fresh(cached):
+                METRICS.incr("fetch.cache_fresh")
+                LOG.info(f"Loaded cached data for {t} from {self.store.root}")
+                return cached
+            # overlap the last two cached bars to detect back-adjusted history
+            delta = self._download_range(t, start=cached.index[max(len(cached) - 2, 0)])
+            if delta.empty:
+                LOG.info(f"No new bars for {t}, using cache")
+                return cached
+            if not self._needs_full_refresh(cached, delta):
+                merged = pd.concat([cached, delta])
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                LOG.info(f"Fetched {len(merged) - len(cached)} new bars for {t}")
+                self.store.write(self.store_key(t), merged, flush=False)
+                return merged
+            METRICS.incr("fetch.full_refresh")
+            LOG.info(f"Split/adjustment detected for {t}, re-downloading history")
+
+        LOG.info(f"Fetching {t} from {type(self.provider).__name__}")
+        df = self._download_range(t)
+        if df.empty:
+            LOG.warning(f"No data for {t}")
+            return None
+        self.store.write(self.store_key(t), df, flush=False)
+        return df
+
+    def _fetch_safe(self, t: str, force_refresh: bool,
+                    cached: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        try:
+            with METRICS.timer("fetch.ticker", t):
+                return self._fetch_one(t, force_refresh=force_refresh, cached=cached)
+        except Exception as e:
+            METRICS.incr("fetch.failures")
+            LOG.error(f"Failed to fetch {t}: {e!r}")
+            with self._lock:
+                self.failures[t] = repr(e)
+            return None
+
+    def fetch(self, force_refresh: bool = False, frames: Optional[Dict[str, pd.DataFrame]] = None) -> dict:
+        """{ticker: frame} for every ticker that could be fetched.
+
+        `frames` are frames the caller already holds (e.g. from the previous fetch);
+        they stand in for the store cache, so only bars after their tail are downloaded.
+        A ticker whose refresh fails keeps its frame from `frames`.
+        """
+        self.failures = {}
+        frames = frames or {}
+        if self.max_workers > 1 and len(self.tickers) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                fetched = list(pool.map(lambda t: self._fetch_safe(t, force_refresh, frames.get(t)), self.tickers))
+        else:
+            fetched = [self._fetch_safe(t, force_refresh, frames.get(t)) for t in self.tickers]
+        # the manifest is written once per fetch rather than once per ticker
+        self.store.flush()
+        fetched = [df if df is not None else frames.get(t) for t, df in zip(self.tickers, fetched)]
+        result = {t: df for t, df in zip(self.tickers, fetched) if df is not None}
+        if self.failures:
+            LOG.warning(f"Fetched {len(result)}/{len(self.tickers)} tickers; failed: {sorted(self.failures)}")
         return result
+
+    @property
+    def validator(self) -> DataQualityValidator:
+        if self._validator is None:
+            self._validator = DataQualityValidator()
+        return self._validator
+
+    def validate_data_quality(self, df: pd.DataFrame, ticker: str = "") -> dict:
+        """{"quality_score" (0-100), "issues": [...], ...} for one fetched frame."""
+        return self.validator.validate(df, ticker)
+
+    def validate_universe(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, dict]:
+        """Quality reports for every ticker in `frames`, checked together in one vectorized pass."""
+        with METRICS.timer("fetch.validate"):
+            return self.validator.validate_panel(frames)
+
+    def resampled(self, interval: str, tickers: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Bars at a coarser `interval` built from the cached bars of this fetcher's interval.
+
+        Nothing is downloaded; tickers without cached data are skipped.
+        """
+        frames = {}
+        for t in tickers or self.tickers:
+            key = self.store_key(t)
+            if key in self.store:
+                frames[t] = resample_ohlcv(self.store.load(key), interval)
+        return frames
@@ -0,0 +1,273 @@
+"""Vectorized OHLCV data-quality checks for one frame or a whole universe.
+
+All checks run on (time x tickers) wide frames at once, so validating a panel of
+thousands of tickers costs a handful of array operations rather than a Python loop
+per ticker and bar. Reports are cached by a hash of each ticker's OHLCV data, so
+unchanged tickers are not re-checked on the next run.
+
+Checks (counts are bars, except `duplicates`):
+
+    duplicates          repeated timestamps
+    nan_close           bars without a close
+    zero_volume         bars with zero (or negative) volume
+    ohlc_inconsistent   High below Open/Close/Low, Low above Open/Close, or a price <= 0
+    missing_sessions    exchange sessions between the first and last bar without a bar
+    price_jumps         close-to-close moves larger than `jump_threshold` (log return)
+    unadjusted_splits   jumps whose ratio matches a common split ratio, with no split recorded
+    stale_prices        bars in runs of at least `stale_run` identical closes
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import LOG, QUALITY_CACHE_PATH, QUALITY_MIN_SCORE
+from feature_cache import OHLCV_COLUMNS, frame_hash
+
+# score penalty per unit fraction of affected bars; the score is 100 * (1 - sum), floored at 0
+PENALTIES = {
+    "duplicates": 2.0,
+    "nan_close": 2.0,
+    "zero_volume": 1.0,
+    "ohlc_inconsistent": 2.0,
+    "missing_sessions": 1.0,
+    "price_jumps": 5.0,
+    "unadjusted_splits": 20.0,
+    "stale_prices": 1.0,
+}
+ISSUE_TEXT = {
+    "duplicates": "duplicate timestamps",
+    "nan_close": "bars without a close",
+    "zero_volume": "bars with zero volume",
+    "ohlc_inconsistent": "bars with inconsistent OHLC",
+    "missing_sessions": "missing sessions",
+    "price_jumps": "price jumps",
+    "unadjusted_splits": "possible unadjusted splits",
+    "stale_prices": "bars with stale prices",
+}
+SPLIT_RATIOS = (2.0, 3.0, 4.0, 5.0, 10.0, 1.5)
+SPLIT_TOLERANCE = 0.03
+EXAMPLES = 3
+HASH_COLUMNS = OHLCV_COLUMNS + ("Stock Splits",)
+
+
+PANEL_COLUMNS = ("Open", "High", "Low", "Close", "Volume", "Stock Splits")
+
+
+def _union_index(frames: Dict[str, pd.DataFrame]) -> pd.DatetimeIndex:
+    """Sorted union of the frames' timestamps; frames sharing one calendar are unioned once."""
+    distinct: list = []
+    for df in frames.values():
+        if not any(df.index.equals(idx) for idx in distinct[-4:]):
+            distinct.append(df.index)
+    if not distinct:
+        return pd.DatetimeIndex([])
+    index = distinct[0]
+    for other in distinct[1:]:
+        index = index.union(other)
+    return pd.DatetimeIndex(index).sort_values()
+
+
+def _panel(frames: Dict[str, pd.DataFrame], index: pd.DatetimeIndex) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """(time x tickers) float arrays per PANEL_COLUMNS column (NaN where absent) and the
+    boolean mask of bars each ticker actually has."""
+    shape = (len(index), len(frames))
+    arrays = {col: np.full(shape, np.nan) for col in PANEL_COLUMNS}
+    present = np.zeros(shape, dtype=bool)
+    for j, df in enumerate(frames.values()):
+        rows = slice(None) if df.index.equals(index) else index.get_indexer(df.index)
+        for col in PANEL_COLUMNS:
+            if col in df:
+                arrays[col][rows, j] = df[col].to_numpy(dtype=float)
+        present[rows, j] = True
+    return arrays, present
+
+
+def _session_days(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """Local calendar day of each bar, tz-naive."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+class DataQualityValidator:
+    """Scores OHLCV frames 0-100 and lists their issues.
+
+    `calendar` is the exchange's session dates. Without one, the expected sessions are
+    the days on which any of the validated frames has a bar, so exchange holidays never
+    count as missing; a single frame validated alone then has no missing sessions.
+    """
+
+    def __init__(self, jump_threshold: float = 0.25, stale_run: int = 5,
+                 calendar: Optional[pd.DatetimeIndex] = None, cache_path: Optional[str] = QUALITY_CACHE_PATH):
+        self.jump_threshold = jump_threshold
+        self.stale_run = stale_run
+        self.calendar = _session_days(calendar) if calendar is not None else None
+        self.cache_path = cache_path
+        self._cache: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def params(self) -> dict:
+        return {"jump_threshold": self.jump_threshold, "stale_run": self.stale_run,
+                "calendar": None if self.calendar is None else frame_hash(pd.DataFrame(index=self.calendar))}
+
+    def key(self, df: pd.DataFrame, sessions: Optional[pd.DatetimeIndex] = None) -> str:
+        """Cache key of `df`'s report: its data, the parameters and the expected sessions
+        inside its own date span (other tickers' dates change those when no calendar is set)."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(frame_hash(df, columns=HASH_COLUMNS).encode())
+        h.update(json.dumps(self.params, sort_keys=True).encode())
+        if sessions is not None and len(df):
+            days = _session_days(df.index)
+            lo = sessions.searchsorted(days.min())
+            hi = sessions.searchsorted(days.max(), side="right")
+            h.update(np.ascontiguousarray(sessions[lo:hi].as_unit("ns").asi8).tobytes())
+        return h.hexdigest()
+
+    def _load_cache(self) -> Dict[str, dict]:
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path and os.path.exists(self.cache_path):
+                with open(self.cache_path) as f:
+                    self._cache = json.load(f)
+        return self._cache
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp, self.cache_path)
+
+    def validate(self, df: pd.DataFrame, ticker: str = "") -> dict:
+        """Report for one frame: {"quality_score", "issues", "counts", "rows"}.
+
+        Reports are cached per ticker, so without a `ticker` the frame is always checked.
+        """
+        if ticker:
+            return self.validate_panel({ticker: df})[ticker]
+        return self._check({ticker: df}, self._sessions({ticker: df}))[ticker]
+
+    def validate_panel(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, dict]:
+        """Reports for every ticker; tickers whose data hash is cached are not re-checked."""
+        with self._lock:
+            cache = self._load_cache()
+            # sessions come from every frame passed in, not just the ones re-checked
+            sessions = self._sessions(frames)
+            keys = {t: self.key(df, sessions) for t, df in frames.items()}
+            reports = {t: cache[t]["report"] for t, k in keys.items() if t in cache and cache[t]["key"] == k}
+            todo = {t: df for t, df in frames.items() if t not in reports}
+            if todo:
+                fresh = self._check(todo, sessions)
+                for t, report in fresh.items():
+                    cache[t] = {"key": keys[t], "report": report}
+                reports.update(fresh)
+                self._save_cache()
+        low = sorted(t for t, r in reports.items() if r["quality_score"] < QUALITY_MIN_SCORE)
+        if low:
+            LOG.warning(f"Low data quality for {low}")
+        LOG.info(f"Validated {len(frames)} tickers ({len(todo)} checked, {len(frames) - len(todo)} cached)")
+        return {t: reports[t] for t in frames}
+
+    def _sessions(self, frames: Dict[str, pd.DataFrame]) -> pd.DatetimeIndex:
+        """Expected session dates: the explicit calendar, else every day any frame traded."""
+        if self.calendar is not None:
+            return self.calendar
+        return _session_days(_union_index(frames)).unique().sort_values()
+
+    def _check(self, frames: Dict[str, pd.DataFrame], sessions: pd.DatetimeIndex) -> Dict[str, dict]:
+        tickers = list(frames)
+        counts: Dict[str, pd.Series] = {}
+        counts["duplicates"] = pd.Series({t: int(df.index.duplicated().sum()) for t, df in frames.items()})
+        frames = {t: df[~df.index.duplicated(keep="last")].sort_index() for t, df in frames.items()}
+        rows = pd.Series({t: len(df) for t, df in frames.items()}, dtype=float)
+
+        index = _union_index(frames)
+        arrays, present = _panel(frames, index)
+        o, h, lo, c, v = (arrays[col] for col in ("Open", "High", "Low", "Close", "Volume"))
+        splits = np.nan_to_num(arrays["Stock Splits"])
+        masks: Dict[str, np.ndarray] = {}
+
+        masks["nan_close"] = present & np.isnan(c)
+        masks["zero_volume"] = present & (v <= 0)
+        with np.errstate(invalid="ignore"):
+            top = np.fmax(np.fmax(o, c), lo)
+            bottom = np.fmin(o, c)
+            masks["ohlc_inconsistent"] = present & ((h < top) | (lo > bottom) | (c <= 0) | (lo <= 0))
+
+            # returns between each ticker's consecutive closes, skipping other tickers' dates
+            filled = pd.DataFrame(c).ffill().to_numpy()
+            prev = np.full_like(filled, np.nan)
+            prev[1:] = filled[:-1]
+            ratio = c / prev
+            log_ret = np.abs(np.log(ratio))
+        jumps = present & (log_ret > self.jump_threshold)
+        near_split = np.zeros_like(jumps)
+        for r in SPLIT_RATIOS:
+            for target in (r, 1.0 / r):
+                near_split |= np.abs(ratio / target - 1) < SPLIT_TOLERANCE
+        masks["unadjusted_splits"] = jumps & near_split & (splits == 0)
+        masks["price_jumps"] = jumps & ~masks["unadjusted_splits"]
+
+        # run length of identical closes, via the cumulative-sum reset trick
+        same = present & (filled == prev)
+        run = np.cumsum(same, axis=0)
+        reset = np.maximum.accumulate(np.where(same, 0, run), axis=0)
+        run_end = (run - reset) >= self.stale_run - 1
+        # a bar is stale if one of the next stale_run - 1 bars ends a long enough run
+        stale = run_end.copy()
+        for k in range(1, self.stale_run):
+            stale[:-k] |= run_end[k:]
+        masks["stale_prices"] = stale & present
+
+        for name, mask in masks.items():
+            counts[name] = pd.Series(mask.sum(axis=0), index=tickers)
+
+        # sessions: group bars by local day, compare with the calendar inside each ticker's span
+        days = _session_days(index)
+        by_day = pd.DataFrame(present, index=days, columns=tickers).groupby(level=0).any()
+        on_day = by_day.reindex(sessions, fill_value=False).to_numpy()
+        first = np.where(on_day.any(axis=0), on_day.argmax(axis=0), len(sessions))
+        last = np.where(on_day.any(axis=0), len(sessions) - 1 - on_day[::-1].argmax(axis=0), -1)
+        pos = np.arange(len(sessions))[:, None]
+        missing = (pos >= first) & (pos <= last) & ~on_day
+        counts["missing_sessions"] = pd.Series(missing.sum(axis=0), index=tickers)
+
+        table = pd.DataFrame(counts).reindex(columns=list(PENALTIES)).fillna(0).astype(int)
+        fractions = table.div(rows.where(rows > 0), axis=0)
+        penalty = (fractions * pd.Series(PENALTIES)).sum(axis=1)
+        score = (100 * (1 - penalty)).clip(lower=0).where(rows > 0, 0.0)
+
+        reports = {}
+        for j, t in enumerate(tickers):
+            issues = []
+            for name in PENALTIES:
+                n = int(table.at[t, name])
+                if not n:
+                    continue
+                text = f"{n} {ISSUE_TEXT[name]}"
+                if name in masks:
+                    when = index[masks[name][:, j]][:EXAMPLES]
+                    text += f" (e.g. {', '.join(str(ts) for ts in when)})"
+                elif name == "missing_sessions":
+                    text += f" (e.g. {', '.join(str(d.date()) for d in sessions[missing[:, j]][:EXAMPLES])})"
+                issues.append(text)
+            if not rows[t]:
+                issues.append("no data")
+            reports[t] = {"quality_score": round(float(score[t]), 2), "issues": issues,
+                          "counts": {k: int(v) for k, v in table.loc[t].items()}, "rows": int(rows[t])}
+        return reports
+
+
+def summary(reports: Dict[str, dict]) -> pd.DataFrame:
+    """One row per ticker: score, rows and the count of each check."""
+    return pd.DataFrame({t: {"quality_score": r["quality_score"], "rows": r["rows"], **r["counts"]}
+                         for t, r in reports.items()}).T.sort_values("quality_score")
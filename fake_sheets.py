@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class FakeAPIError(Exception):
+    """Stand-in for gspread.exceptions.APIError; `code` is the HTTP status."""
+
+    def __init__(self, code: int, message: str = ""):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+class FakeNotFoundError(Exception):
+    pass
+
+
+def _cell(a1: str):
+    """'B7' -> (row 7, col 2), both 1-based; a bare column ('B') means row 1."""
+    letters = "".join(c for c in a1 if c.isalpha())
+    digits = "".join(c for c in a1 if c.isdigit())
+    col = 0
+    for c in letters.upper():
+        col = col * 26 + ord(c) - ord("A") + 1
+    return (int(digits) if digits else 1), col
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet: "FakeSpreadsheet", title: str, rows: int = 1000, cols: int = 26):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.row_count = int(rows)
+        self.col_count = int(cols)
+        self.cells: List[List] = []
+
+    def _call(self, name: str):
+        self.spreadsheet.client._call(f"{name}:{self.title}")
+
+    def get_all_values(self) -> List[List]:
+        self._call("get_all_values")
+        return [list(r) for r in self.cells]
+
+    def row_values(self, row: int) -> List:
+        self._call("row_values")
+        return list(self.cells[row - 1]) if row <= len(self.cells) else []
+
+    def update(self, values=None, range_name: Optional[str] = None, **kwargs):
+        self._call("update")
+        row, col = _cell((range_name or "A1").split(":")[0])
+        for r, values_row in enumerate(values or []):
+            target = row - 1 + r
+            while len(self.cells) <= target:
+                self.cells.append([])
+            line = self.cells[target]
+            while len(line) < col - 1 + len(values_row):
+                line.append("")
+            line[col - 1:col - 1 + len(values_row)] = list(values_row)
+        self.row_count = max(self.row_count, len(self.cells))
+
+    def append_rows(self, values, **kwargs):
+        self._call("append_rows")
+        self.cells.extend(list(r) for r in values)
+        self.row_count = max(self.row_count, len(self.cells))
+
+    def batch_clear(self, ranges: List[str]):
+        self._call("batch_clear")
+        for rng in ranges:
+            start = _cell(rng.split(":")[0])[0]
+            for r in range(start - 1, len(self.cells)):
+                self.cells[r] = []
+        while self.cells and not self.cells[-1]:
+            self.cells.pop()
+
+    def clear(self):
+        self._call("clear")
+        self.cells = []
+
+
+class FakeSpreadsheet:
+    def __init__(self, client: "FakeSheetsClient", title: str):
+        self.client = client
+        self.title = title
+        self.worksheets: Dict[str, FakeWorksheet] = {}
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self.client._call(f"worksheet:{title}")
+        if title not in self.worksheets:
+            raise FakeNotFoundError(title)
+        return self.worksheets[title]
+
+    def add_worksheet(self, title: str, rows="1000", cols="26") -> FakeWorksheet:
+        self.client._call(f"add_worksheet:{title}")
+        ws = FakeWorksheet(self, title, int(rows), int(cols))
+        self.worksheets[title] = ws
+        return ws
+
+
+class FakeSheetsClient:
+    """In-memory stand-in for an authorized gspread client, for exercising GSheetsLogger offline.
+
+    Every API call is recorded in `calls`. `fail_next(n, code)` makes the next n calls
+    raise FakeAPIError(code), e.g. 429 to simulate quota exhaustion. `latency` adds a
+    sleep per call to stand in for the network round trip.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.spreadsheets: Dict[str, FakeSpreadsheet] = {}
+        self.calls: List[str] = []
+        self._failures: List[int] = []
+        self._lock = threading.Lock()
+
+    def fail_next(self, n: int = 1, code: int = 429):
+        with self._lock:
+            self._failures.extend([code] * n)
+
+    def _call(self, name: str):
+        with self._lock:
+            self.calls.append(name)
+            code = self._failures.pop(0) if self._failures else None
+        if self.latency:
+            time.sleep(self.latency)
+        if code is not None:
+            raise FakeAPIError(code, f"injected failure on {name}")
+
+    def open(self, title: str) -> FakeSpreadsheet:
+        self._call(f"open:{title}")
+        if title not in self.spreadsheets:
+            raise FakeNotFoundError(title)
+        return self.spreadsheets[title]
+
+    def create(self, title: str) -> FakeSpreadsheet:
+        self._call(f"create:{title}")
+        sh = FakeSpreadsheet(self, title)
+        self.spreadsheets[title] = sh
+        return sh
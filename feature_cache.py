@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import FEATURE_CACHE_DIR, LOG
+
+OHLCV_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+INDEX_NAME = "index.json"
+
+
+def frame_hash(df: pd.DataFrame, columns=OHLCV_COLUMNS) -> str:
+    """Content hash of a frame's timestamps and OHLCV values.
+
+    Any new, removed or revised bar changes the hash, so keys built from it go stale
+    on their own when the data moves on.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC")
+    h.update(np.ascontiguousarray(index.as_unit("ns").asi8).tobytes())
+    for col in columns:
+        if col in df:
+            h.update(col.encode())
+            h.update(np.ascontiguousarray(df[col].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+class FeatureCache:
+    """On-disk LRU cache of (X, y) feature matrices keyed by data hash + parameters.
+
+    Entries are uncompressed .npz files; recency is tracked through file mtimes, and
+    the least recently used entries are evicted once the cache holds more than
+    `max_entries` files or `max_bytes` bytes. Passing a `tag` (the ticker) to `put`
+    also drops the tag's previous entry, since that data has been superseded.
+    """
+
+    def __init__(self, cache_dir: str = FEATURE_CACHE_DIR, max_entries: int = 512,
+                 max_bytes: int = 256 * 2**20):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(df: pd.DataFrame, params: dict) -> str:
+        blob = frame_hash(df) + json.dumps(params, sort_keys=True, default=str)
+        return hashlib.blake2b(blob.encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _read_index(self) -> Dict[str, str]:
+        if not os.path.exists(self._index_path):
+            return {}
+        with open(self._index_path) as f:
+            return json.load(f)
+
+    def _write_index(self, index: Dict[str, str]):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, self._index_path)
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, pd.Series]]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                index = pd.DatetimeIndex(data["index"].view("M8[ns]"))
+                tz = str(data["tz"])
+                if tz:
+                    index = index.tz_localize("UTC").tz_convert(tz)
+                X = pd.DataFrame(data["X"], index=index, columns=[str(c) for c in data["columns"]])
+                y = pd.Series(data["y"], index=index, name=str(data["y_name"]) or None)
+        except (FileNotFoundError, KeyError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            try:
+                os.utime(path)  # mark as recently used
+            except FileNotFoundError:
+                # evicted by another thread after the load; the entry is gone, so count a miss
+                self.misses += 1
+                return None
+            self.hits += 1
+        return X, y
+
+    def put(self, key: str, X: pd.DataFrame, y: pd.Series, tag: Optional[str] = None):
+        index = pd.DatetimeIndex(X.index)
+        tz = str(index.tz) if index.tz is not None else ""
+        utc = index.tz_convert("UTC").tz_localize(None) if tz else index
+        path = self._path(key)
+        tmp = path[:-4] + ".tmp.npz"
+        np.savez(tmp, X=X.to_numpy(dtype=float), columns=np.array(X.columns, dtype=str),
+                 index=utc.as_unit("ns").asi8, tz=np.array(tz), y=y.to_numpy(), y_name=np.array(y.name or ""))
+        os.replace(tmp, path)
+        with self._lock:
+            if tag is not None:
+                index_map = self._read_index()
+                previous = index_map.get(tag)
+                if previous and previous != key and os.path.exists(self._path(previous)):
+                    os.remove(self._path(previous))
+                index_map[tag] = key
+                self._write_index(index_map)
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz") and not name.endswith(".tmp.npz"):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, name = entries.pop(0)
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+            LOG.info(f"Evicted feature cache entry {name}")
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
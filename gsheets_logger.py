@@ -0,0 +1,211 @@
+import importlib.util
+import queue
+import threading
+from typing import Dict, List, Optional, Union
+from strategy import Trade
+from tradelog import TradeLog
+from config import GSHEET_CRED_JSON, GSHEET_SPREADSHEET_NAME, LOG
+from metrics import METRICS, timed
+from rate_limit import retry_with_backoff
+
+
+def _installed(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# gspread/google-auth are only imported when a logger actually authenticates
+GSHEETS_AVAILABLE = _installed("gspread") and _installed("google.oauth2")
+
+TRADE_HEADER = ["ticker", "entry_date", "entry_price", "exit_date", "exit_price", "size", "pnl"]
+
+
+def _is_transient(e: BaseException) -> bool:
+    """Quota (429) and server-side (5xx) API errors, or a dropped connection, are worth retrying."""
+    code = getattr(e, "code", None)
+    if code is None:
+        code = getattr(getattr(e, "response", None), "status_code", None)
+    if isinstance(code, int):
+        return code == 429 or code >= 500
+    return isinstance(e, (ConnectionError, TimeoutError))
+
+
+class GSheetsLogger:
+    """Writes trade logs and summaries to Google Sheets from a background thread.
+
+    `write_trade_log` and `write_summary` only enqueue and return immediately. The writer
+    thread coalesces whatever is queued into one `append_rows` per trade tab and one
+    range update per summary tab (only the newest summary per tab is written). Worksheet
+    handles are looked up once and cached. Quota and 5xx errors are retried with
+    exponential backoff; batches that still fail are logged and kept in `failed`.
+
+    Nothing is flushed implicitly: call `flush()` to wait for queued writes, or `close()`
+    on shutdown. Pass `client` (e.g. fake_sheets.FakeSheetsClient) to skip the Google auth.
+    """
+
+    def __init__(self, cred_json: str = GSHEET_CRED_JSON, spreadsheet_name: str = GSHEET_SPREADSHEET_NAME,
+                 client=None, retries: int = 5, backoff: float = 1.0, max_batch_rows: int = 5000):
+        if client is None and not GSHEETS_AVAILABLE:
+            raise ImportError("gspread/google oauth not installed or available")
+        self.cred_json = cred_json
+        self.spreadsheet_name = spreadsheet_name
+        self.retries = retries
+        self.backoff = backoff
+        self.max_batch_rows = max_batch_rows
+        self.client = client if client is not None else self._auth()
+        self.sheet = self._call(self._open, "open spreadsheet")
+        self.failed: List[tuple] = []
+        self._worksheets: Dict[str, object] = {}
+        # rows last written to each summary tab, so a shorter summary can clear the leftovers
+        self._summary_rows: Dict[str, int] = {}
+        self._has_header: set = set()
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="gsheets-writer", daemon=True)
+        self._thread.start()
+
+    def _auth(self):
+        import gspread
+        from google.oauth2.service_account import Credentials
+
+        scopes = [
+            "https://www.googleapis.com/auth/spreadsheets",
+            "https://www.googleapis.com/auth/drive",
+        ]
+        creds = Credentials.from_service_account_file(self.cred_json, scopes=scopes)
+        client = gspread.authorize(creds)
+        return client
+
+    def _open(self):
+        try:
+            sh = self.client.open(self.spreadsheet_name)
+        except Exception as e:
+            if _is_transient(e):
+                raise
+            sh = self.client.create(self.spreadsheet_name)
+        return sh
+
+    def _call(self, fn, description: str):
+        return retry_with_backoff(fn, retries=self.retries, base_delay=self.backoff, retry_if=_is_transient,
+                                  description=f"Google Sheets {description}")
+
+    def _worksheet(self, tab_name: str, rows: int, cols: int):
+        """Cached worksheet handle; the bool is True when the tab had to be created."""
+        ws = self._worksheets.get(tab_name)
+        if ws is not None:
+            return ws, False
+        created = False
+        try:
+            ws = self._call(lambda: self.sheet.worksheet(tab_name), f"lookup of {tab_name}")
+        except Exception as e:
+            if _is_transient(e):
+                raise
+            ws = self._call(lambda: self.sheet.add_worksheet(title=tab_name, rows=str(rows), cols=str(cols)),
+                            f"creation of {tab_name}")
+            created = True
+        self._worksheets[tab_name] = ws
+        return ws, created
+
+    @timed("gsheets.write_trade_log")
+    def write_trade_log(self, trades: Union[List[Trade], TradeLog], tab_name: str = "trade_log"):
+        """Queue `trades` to be appended below the existing rows of `tab_name`."""
+        rows = [[t.ticker, str(t.entry_date), t.entry_price, str(t.exit_date), t.exit_price, t.size, t.pnl()]
+                for t in trades]
+        if rows:
+            self._put(("append", tab_name, rows))
+
+    @timed("gsheets.write_summary")
+    def write_summary(self, summary: dict, tab_name: str = "summary"):
+        """Queue `summary` to replace the contents of `tab_name`."""
+        self._put(("replace", tab_name, [[k, v] for k, v in summary.items()]))
+
+    def _put(self, item):
+        if self._closed:
+            raise RuntimeError("GSheetsLogger is closed")
+        self._queue.put(item)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been written (or given up on).
+
+        After `close()` everything has already been written, so this returns True at once.
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(("flush", done, None))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush and stop the writer thread; further writes raise."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _writer(self):
+        while True:
+            batch = [self._queue.get()]
+            # coalesce everything already waiting into this batch
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch: list) -> bool:
+        appends: Dict[str, list] = {}
+        replaces: Dict[str, list] = {}
+        events = []
+        stop = False
+        for item in batch:
+            if item is None:
+                stop = True
+                continue
+            kind, tab_name, rows = item
+            if kind == "append":
+                appends.setdefault(tab_name, []).extend(rows)
+            elif kind == "replace":
+                replaces[tab_name] = rows
+            else:
+                events.append(tab_name)
+        for tab_name, rows in appends.items():
+            for start in range(0, len(rows), self.max_batch_rows):
+                self._safe_write(self._append, tab_name, rows[start:start + self.max_batch_rows])
+        for tab_name, rows in replaces.items():
+            self._safe_write(self._replace, tab_name, rows)
+        for event in events:
+            event.set()
+        return stop
+
+    def _safe_write(self, fn, tab_name: str, rows: list):
+        try:
+            with METRICS.timer("gsheets.api_write"):
+                fn(tab_name, rows)
+            METRICS.incr("gsheets.rows_written", len(rows))
+        except Exception as e:
+            LOG.error(f"Giving up writing {len(rows)} rows to sheet tab {tab_name}: {e!r}")
+            METRICS.incr("gsheets.failed_batches")
+            self.failed.append((tab_name, rows, repr(e)))
+
+    def _append(self, tab_name: str, rows: list):
+        ws, created = self._worksheet(tab_name, rows=1000, cols=20)
+        if tab_name not in self._has_header:
+            if created or not self._call(lambda: ws.row_values(1), f"header check of {tab_name}"):
+                rows = [TRADE_HEADER] + rows
+        self._call(lambda: ws.append_rows(rows, value_input_option="RAW"), f"append to {tab_name}")
+        self._has_header.add(tab_name)
+
+    def _replace(self, tab_name: str, rows: list):
+        ws, _ = self._worksheet(tab_name, rows=100, cols=10)
+        self._call(lambda: ws.update(values=rows, range_name="A1"), f"update of {tab_name}")
+        previous = self._summary_rows.get(tab_name)
+        if previous is None or previous > len(rows):
+            # first write in this process: we don't know what was there, so clear below
+            self._call(lambda: ws.batch_clear([f"A{len(rows) + 1}:Z"]), f"clear of {tab_name}")
+        self._summary_rows[tab_name] = len(rows)
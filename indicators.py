@@ -1,3 +1,6 @@
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 
 
@@ -28,4 +31,133 @@ class Indicators:
         macd_line = fast_ema - slow_ema
         signal_line = macd_line.ewm(span=signal, adjust=False).mean()
         hist = macd_line - signal_line
-        return pd.DataFrame({"macd": macd_line, "signal": signal_line, "hist": hist})
\ No newline at end of file
+        return pd.DataFrame({"macd": macd_line, "signal": signal_line, "hist": hist})
+
+class PanelIndicators:
+    """Indicators for a whole universe at once: a (time x tickers) wide frame or 2-D array.
+
+    Missing bars (NaN) are skipped rather than treated as zero: each column is packed
+    down to its own valid observations before computing, so every column gets exactly
+    what `Indicators` would produce on that ticker's own series (up to rounding), and
+    NaN is returned at the missing positions. Different listing dates are just leading
+    NaNs.
+    """
+
+    @staticmethod
+    def _pack(values: np.ndarray):
+        """Move each column's valid values to the top; returns packed values and the row order."""
+        invalid = np.isnan(values)
+        if not invalid.any():
+            return values, None, invalid
+        order = np.argsort(invalid, axis=0, kind="stable")
+        packed = np.take_along_axis(values, order, axis=0)
+        return packed, order, invalid
+
+    @staticmethod
+    def _unpack(packed: np.ndarray, order: Optional[np.ndarray], invalid: np.ndarray) -> np.ndarray:
+        if order is None:
+            return packed
+        out = np.empty_like(packed)
+        np.put_along_axis(out, order, packed, axis=0)
+        out[invalid] = np.nan
+        return out
+
+    @staticmethod
+    def _rolling_sum(x: np.ndarray, window: int):
+        """Rolling sum and count of non-NaN values over `window` rows, via cumulative sums."""
+        valid = ~np.isnan(x)
+        csum = np.cumsum(np.where(valid, x, 0.0), axis=0)
+        ccount = np.cumsum(valid, axis=0)
+        total = csum.copy()
+        count = ccount.copy()
+        total[window:] -= csum[:-window]
+        count[window:] -= ccount[:-window]
+        return total, count
+
+    @staticmethod
+    def _sma(x: np.ndarray, window: int) -> np.ndarray:
+        total, count = PanelIndicators._rolling_sum(x, window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(count >= 1, total / count, np.nan)
+
+    @staticmethod
+    def _ema(x: np.ndarray, window: int) -> np.ndarray:
+        # y[t] = y[t-1] + a * (x[t] - y[t-1]), started at y[0] = x[0] (ewm adjust=False);
+        # the recurrence runs over time, vectorized across the tickers of each row
+        alpha = 2.0 / (window + 1)
+        y = np.array(x, dtype=float)
+        for t in range(1, len(y)):
+            prev = y[t - 1]
+            y[t] -= prev
+            y[t] *= alpha
+            y[t] += prev
+        return y
+
+    @staticmethod
+    def _rsi(x: np.ndarray, window: int) -> np.ndarray:
+        delta = np.full_like(x, np.nan)
+        delta[1:] = x[1:] - x[:-1]
+        up = np.where(np.isnan(delta), np.nan, np.clip(delta, 0, None))
+        down = np.where(np.isnan(delta), np.nan, -np.clip(delta, None, 0))
+        up_sum, count = PanelIndicators._rolling_sum(up, window)
+        down_sum, _ = PanelIndicators._rolling_sum(down, window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rs = up_sum / down_sum
+            rsi = 100 - (100 / (1 + rs))
+        return np.where(count >= window, rsi, np.nan)
+
+    @staticmethod
+    def _macd(x: np.ndarray, fast: int, slow: int, signal: int):
+        line = PanelIndicators._ema(x, fast) - PanelIndicators._ema(x, slow)
+        sig = PanelIndicators._ema(line, signal)
+        return line, sig, line - sig
+
+    @staticmethod
+    def _apply(panel, fn, *args):
+        values = np.asarray(panel, dtype=float)
+        packed, order, invalid = PanelIndicators._pack(values)
+        out = PanelIndicators._unpack(fn(packed, *args), order, invalid)
+        if isinstance(panel, pd.DataFrame):
+            return pd.DataFrame(out, index=panel.index, columns=panel.columns)
+        return out
+
+    @staticmethod
+    def sma(panel, window: int):
+        return PanelIndicators._apply(panel, PanelIndicators._sma, window)
+
+    @staticmethod
+    def ema(panel, window: int):
+        return PanelIndicators._apply(panel, PanelIndicators._ema, window)
+
+    @staticmethod
+    def rsi(panel, window: int = 14):
+        return PanelIndicators._apply(panel, PanelIndicators._rsi, window)
+
+    @staticmethod
+    def macd(panel, fast: int = 12, slow: int = 26, signal: int = 9) -> dict:
+        result = PanelIndicators.compute(panel, rsi_window=None, sma_windows=(), macd=(fast, slow, signal))
+        return {k: result[k] for k in ("macd", "signal", "hist")}
+
+    @staticmethod
+    def compute(closes, rsi_window: Optional[int] = 14, sma_windows: Sequence[int] = (20, 50),
+                macd: Optional[Tuple[int, int, int]] = (12, 26, 9)) -> Dict[str, object]:
+        """Every indicator Strategy uses, for all columns, packing the panel only once.
+
+        Keys follow Strategy's column names: "rsi", "sma<window>", "macd", "signal", "hist".
+        """
+        values = np.asarray(closes, dtype=float)
+        packed, order, invalid = PanelIndicators._pack(values)
+        raw = {}
+        if rsi_window:
+            raw["rsi"] = PanelIndicators._rsi(packed, rsi_window)
+        for w in sma_windows:
+            raw[f"sma{w}"] = PanelIndicators._sma(packed, w)
+        if macd:
+            raw["macd"], raw["signal"], raw["hist"] = PanelIndicators._macd(packed, *macd)
+        result = {}
+        for name, arr in raw.items():
+            out = PanelIndicators._unpack(arr, order, invalid)
+            if isinstance(closes, pd.DataFrame):
+                out = pd.DataFrame(out, index=closes.index, columns=closes.columns)
+            result[name] = out
+        return result
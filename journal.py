@@ -0,0 +1,140 @@
+"""Structured trade-event journal for the backtester.
+
+The backtest loop only appends plain tuples to a TradeJournal: no string formatting and
+no I/O. `publish()` hands the new events to a queue in one call. A QueueListener thread
+turns them into LogRecords for `config.LOG`'s handlers, and the message is only
+formatted there, when a handler emits it. The recorded events are enough to rebuild the
+trade tape (`trades()`, `to_frame()`).
+"""
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueListener
+from typing import List, NamedTuple, Optional
+
+import pandas as pd
+
+from config import LOG
+from strategy import Trade, bar_time
+
+BUY = "BUY"
+SELL = "SELL"
+# position force-closed at the last bar; part of the tape but not an actual signal
+CLOSE = "CLOSE"
+
+
+class TradeEvent(NamedTuple):
+    kind: str
+    ticker: str
+    timestamp: object
+    price: float
+    size: float
+    bar: int
+
+
+class _EventListener(QueueListener):
+    """Expands queued event batches into LogRecords for the target logger's handlers."""
+
+    def __init__(self, q: queue.Queue, logger: logging.Logger):
+        super().__init__(q, respect_handler_level=True)
+        self.logger = logger
+
+    def handle(self, batch):
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        for event in batch:
+            if event.kind == CLOSE:
+                continue
+            record = self.logger.makeRecord(self.logger.name, logging.INFO, __file__, 0,
+                                            "%s %s on %s @ %s size=%s",
+                                            (event.ticker, event.kind, bar_time(event.timestamp), event.price, event.size), None)
+            for handler in self.logger.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+
+_queue: queue.Queue = queue.Queue()
+_listener: Optional[_EventListener] = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener():
+    global _listener
+    if _listener is None:
+        with _listener_lock:
+            if _listener is None:
+                _listener = _EventListener(_queue, LOG)
+                _listener.start()
+                atexit.register(stop_listener)
+
+
+def stop_listener():
+    """Drain anything still queued and stop the listener thread."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def drain():
+    """Block until every published event has been handed to the log handlers."""
+    if _listener is not None:
+        _queue.join()
+
+
+class TradeJournal:
+    """Per-run buffer of trade events.
+
+    With `enabled=False` nothing is recorded or logged, which is the cheapest setting
+    for sweeps. With `log=False` events are kept for the tape but never sent to the log.
+    """
+
+    def __init__(self, enabled: bool = True, log: bool = True):
+        self.enabled = enabled
+        self.log = log
+        self.events: List[TradeEvent] = []
+        self._published = 0
+
+    def record(self, kind: str, ticker: str, timestamp, price: float, size: float, bar: int = -1):
+        if self.enabled:
+            self.events.append(TradeEvent(kind, ticker, timestamp, price, size, bar))
+
+    def publish(self):
+        """Queue events recorded since the last publish for logging; never blocks."""
+        if not self.enabled or not self.log or self._published == len(self.events):
+            return
+        batch = self.events[self._published:]
+        self._published = len(self.events)
+        if LOG.isEnabledFor(logging.INFO):
+            _ensure_listener()
+            _queue.put(batch)
+
+    def clear(self):
+        self.events = []
+        self._published = 0
+
+    def trades(self, ticker: Optional[str] = None) -> List[Trade]:
+        """Rebuild the trade list from the events (entries paired with the next exit)."""
+        trades: List[Trade] = []
+        open_trades = {}
+        for e in self.events:
+            if ticker is not None and e.ticker != ticker:
+                continue
+            when = bar_time(e.timestamp)
+            if e.kind == BUY:
+                open_trades[e.ticker] = Trade(ticker=e.ticker, entry_date=when, entry_price=e.price, size=e.size)
+            elif e.ticker in open_trades:
+                trade = open_trades.pop(e.ticker)
+                trade.exit_date = when
+                trade.exit_price = e.price
+                trades.append(trade)
+        return trades
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.events, columns=TradeEvent._fields)
+
+
+# shared disabled journal, e.g. for parameter sweeps
+NULL_JOURNAL = TradeJournal(enabled=False)
@@ -26,7 +26,7 @@ TRADE_QTY = int(os.getenv("TRADE_QTY", 100))
 INITIAL_CAPITAL = float(os.getenv("INITIAL_CAPITAL", 100000))
 RISK_PER_TRADE = float(os.getenv("RISK_PER_TRADE", 2.0))
 
-def run_single_stock_analysis(symbol: str, period: str = "1y", interval: str = "1d"):
+def run_single_stock_analysis(symbol: str, period: str = "1y", interval: str = "1d", csv_logger: CSVSLogger = None):
     """Run complete analysis for a single stock"""
     logger = logging.getLogger(__name__)
     
@@ -84,32 +84,38 @@ def run_single_stock_analysis(symbol: str, period: str = "1y", interval: str = "
         
         # 6. Log Results to CSV Files
         logger.info("Step 6: Logging results to CSV files...")
+        own_logger = csv_logger is None
         try:
-            csv_logger = CSVSLogger()
+            if own_logger:
+                csv_logger = CSVSLogger()
             
             # Log trades
             if not trades_df.empty:
-                csv_logger.log_trades(trades_df, f"{symbol}_Trades")
+                csv_logger.log_trades(trades_df, ticker=symbol)
             
             # Log performance metrics
-            csv_logger.log_performance_metrics(performance_metrics, f"{symbol}_Performance")
+            csv_logger.log_performance_metrics(performance_metrics, ticker=symbol)
             
             # Log ML results
             if ml_results:
-                csv_logger.log_ml_results(ml_results, f"{symbol}_ML_Results")
+                csv_logger.log_ml_results(ml_results, ticker=symbol)
             
             # Log feature importance
             if not feature_importance.empty:
-                csv_logger.log_feature_importance(feature_importance, f"{symbol}_Feature_Importance")
+                csv_logger.log_feature_importance(feature_importance, ticker=symbol)
             
             # Log equity curve
             if backtester.equity_curve:
-                csv_logger.log_equity_curve(backtester.equity_curve, f"{symbol}_Equity_Curve")
+                csv_logger.log_equity_curve(backtester.equity_curve, ticker=symbol)
             
             logger.info("Successfully logged all results to CSV files")
             
         except Exception as e:
             logger.error(f"Failed to log to CSV files: {e}")
+        finally:
+            # stops the store's writer thread even when logging failed part-way
+            if own_logger and csv_logger is not None:
+                csv_logger.close()
         
         # 7. Print Summary
         logger.info("=" * 50)
@@ -152,10 +158,12 @@ def run_portfolio_analysis(tickers: list, period: str = "1y", interval: str = "1
     
     results = {}
     successful_analyses = 0
+    # one results store for the whole portfolio run
+    csv_logger = CSVSLogger()
     
     for ticker in tickers:
         try:
-            result = run_single_stock_analysis(ticker, period, interval)
+            result = run_single_stock_analysis(ticker, period, interval, csv_logger=csv_logger)
             if result:
                 results[ticker] = result
                 successful_analyses += 1
@@ -168,14 +176,16 @@ def run_portfolio_analysis(tickers: list, period: str = "1y", interval: str = "1
         
         # Log portfolio summary to CSV
         try:
-            csv_logger = CSVSLogger()
-            csv_logger.log_summary_report(portfolio_summary, "Portfolio_Summary")
-            logger.info("Portfolio summary logged to CSV")
+            csv_logger.log_summary_report(portfolio_summary, "portfolio_summary")
+            logger.info("Portfolio summary logged")
         except Exception as e:
             logger.error(f"Failed to log portfolio summary: {e}")
+        finally:
+            csv_logger.close()
         
         return results, portfolio_summary
     
+    csv_logger.close()
     return results, {}
 
 def generate_portfolio_summary(results: dict) -> dict:
@@ -0,0 +1,206 @@
+import glob
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import LOG, STORE_DIR
+
+MANIFEST_NAME = "manifest.json"
+ALIGN = 8
+
+
+class MarketDataStore:
+    """Columnar on-disk cache of OHLCV frames.
+
+    Layout under `root`::
+
+        manifest.json     ticker -> file, rows, first/last bar, tz, column dtypes/offsets
+        <ticker>.bin      int64 UTC-nanosecond index followed by one contiguous,
+                          8-byte aligned segment per column in its own dtype
+
+    A load maps each ticker file once with ``np.memmap`` and hands out typed views of
+    the column segments, so nothing is parsed and pages are only read when touched.
+    """
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.manifest: Dict[str, dict] = self._read_manifest()
+        # DataFetcher may write several tickers concurrently
+        self._lock = threading.Lock()
+
+    def _read_manifest(self) -> Dict[str, dict]:
+        if not os.path.exists(self._manifest_path):
+            return {}
+        with open(self._manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        with self._lock:
+            tmp = self._manifest_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.manifest, f, indent=1, sort_keys=True)
+            os.replace(tmp, self._manifest_path)
+
+    @staticmethod
+    def _filename(ticker: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_-]", "_", ticker) + ".bin"
+
+    def tickers(self) -> List[str]:
+        return sorted(self.manifest)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.manifest
+
+    def date_range(self, ticker: str) -> Optional[tuple]:
+        entry = self.manifest.get(ticker)
+        if entry is None:
+            return None
+        return pd.Timestamp(entry["start"]), pd.Timestamp(entry["end"])
+
+    def write(self, ticker: str, df: pd.DataFrame, flush: bool = True):
+        """Replace the stored frame for `ticker`; numeric columns keep their dtype.
+
+        Bulk writers pass flush=False and call `flush()` once at the end.
+        """
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        utc = index.tz_convert("UTC").tz_localize(None) if tz else index
+        segments = [utc.as_unit("ns").asi8]
+        columns = []
+        offset = segments[0].nbytes
+        for col in df.columns:
+            values = df[col].to_numpy()
+            if values.dtype == object or values.dtype.kind not in "biufM":
+                values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+            values = np.ascontiguousarray(values)
+            offset += -offset % ALIGN
+            columns.append({"name": str(col), "dtype": values.dtype.str, "offset": offset})
+            segments.append(values)
+            offset += values.nbytes
+
+        fname = self._filename(ticker)
+        path = os.path.join(self.root, fname)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            for seg in segments:
+                f.write(b"\0" * (-f.tell() % ALIGN))
+                f.write(seg.tobytes())
+        os.replace(tmp, path)
+        entry = {
+            "file": fname,
+            "columns": columns,
+            "index_name": index.name,
+            "rows": int(len(df)),
+            "start": index[0].isoformat() if len(df) else None,
+            "end": index[-1].isoformat() if len(df) else None,
+            "tz": tz,
+        }
+        with self._lock:
+            self.manifest[ticker] = entry
+        if flush:
+            self.flush()
+
+    def flush(self):
+        self._write_manifest()
+
+    def load(self, ticker: str, columns: Optional[Iterable[str]] = None, mmap: bool = True,
+             tail: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Stored frame for `ticker` (None if absent); `tail` keeps only the last `tail` bars,
+        so with `mmap` only the pages holding them are read."""
+        entry = self.manifest.get(ticker)
+        if entry is None:
+            return None
+        rows = entry["rows"]
+        path = os.path.join(self.root, entry["file"])
+        if rows == 0:
+            return pd.DataFrame(columns=[c["name"] for c in entry["columns"]], index=pd.DatetimeIndex([]))
+        skip = max(rows - tail, 0) if tail is not None else 0
+        # asarray drops the memmap subclass (the mapping stays alive as the view's base)
+        raw = np.asarray(np.memmap(path, dtype=np.uint8, mode="r")) if mmap else np.fromfile(path, dtype=np.uint8)
+        index = pd.DatetimeIndex(raw[skip * 8: rows * 8].view("M8[ns]"), name=entry.get("index_name"))
+        if entry.get("tz"):
+            index = index.tz_localize("UTC").tz_convert(entry["tz"])
+        wanted = None if columns is None else set(columns)
+        data = {}
+        for col in entry["columns"]:
+            if wanted is not None and col["name"] not in wanted:
+                continue
+            dtype = np.dtype(col["dtype"])
+            start = col["offset"]
+            data[col["name"]] = raw[start + skip * dtype.itemsize : start + rows * dtype.itemsize].view(dtype)
+        # copy=False keeps the mapped column views as the frame's backing storage
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def load_many(self, tickers: Iterable[str], **kwargs) -> Dict[str, pd.DataFrame]:
+        result = {}
+        for t in tickers:
+            df = self.load(t, **kwargs)
+            if df is not None:
+                result[t] = df
+        return result
+
+    def delete(self, ticker: str):
+        with self._lock:
+            entry = self.manifest.pop(ticker, None)
+        if entry is None:
+            return
+        path = os.path.join(self.root, entry["file"])
+        if os.path.exists(path):
+            os.remove(path)
+        self._write_manifest()
+
+    def import_csv(self, ticker: str, path: str, flush: bool = True) -> pd.DataFrame:
+        df = read_legacy_csv(path)
+        self.write(ticker, df, flush=flush)
+        return df
+
+    def import_csv_cache(self, csv_dir: str, overwrite: bool = False) -> List[str]:
+        """Migrate a directory of legacy `<TICKER>.csv` caches into the store.
+
+        Legacy files name the ticker with '.' replaced by '_' (RELIANCE_NS.csv), so
+        the last '_' is turned back into '.'.
+        """
+        imported = []
+        for path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            ticker = legacy_csv_ticker(stem)
+            if ticker in self.manifest and not overwrite:
+                continue
+            try:
+                self.import_csv(ticker, path, flush=False)
+                imported.append(ticker)
+            except Exception:
+                LOG.exception(f"Failed to import legacy cache {path}")
+        self.flush()
+        LOG.info(f"Imported {len(imported)} CSV caches from {csv_dir} into {self.root}")
+        return imported
+
+
+def legacy_csv_path(csv_dir: str, ticker: str) -> str:
+    return os.path.join(csv_dir, f"{ticker.replace('.', '_')}.csv")
+
+
+def legacy_csv_ticker(stem: str) -> str:
+    head, sep, tail = stem.rpartition("_")
+    return f"{head}.{tail}" if sep else stem
+
+
+def read_legacy_csv(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path, index_col=0)
+    # yfinance writes tz-aware timestamps; parse through UTC and restore the original offset
+    index = pd.to_datetime(df.index, utc=True)
+    raw = str(df.index[0]) if len(df) else ""
+    if re.search(r"[+-]\d\d:\d\d$", raw):
+        offset = pd.Timestamp(raw).tz
+        df.index = index.tz_convert(offset)
+    else:
+        df.index = index.tz_localize(None)
+    df.index.name = df.index.name or "Date"
+    return df
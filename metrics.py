@@ -0,0 +1,181 @@
+"""Process-wide timers, counters and histograms for finding where a run spends its time.
+
+Instrumented code calls `METRICS.timer(...)`, `METRICS.incr(...)` and
+`METRICS.observe(...)` (or decorates with `timed`). The registry starts disabled. In
+that state each call is a single attribute check and returns a shared no-op context,
+so the hooks can stay in hot paths. `METRICS.enable()` (the CLI's `--profile`)
+switches recording on. `report()` gives a per-stage / per-ticker table, and
+`to_json()` exports everything for scraping.
+"""
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import LOG
+
+_NULL = contextlib.nullcontext()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "ticker", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, ticker: Optional[str]):
+        self.registry = registry
+        self.name = name
+        self.ticker = ticker
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.record_time(self.name, time.perf_counter() - self.start, self.ticker)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            # name -> [count, total, min, max]; name -> ticker -> total seconds
+            self.timers: Dict[str, list] = {}
+            self.timers_by_ticker: Dict[str, Dict[str, float]] = {}
+            self.counters: Dict[str, float] = {}
+            self.histograms: Dict[str, list] = {}
+
+    def timer(self, name: str, ticker: Optional[str] = None):
+        """Context manager timing its block under `name` (and per `ticker` when given)."""
+        if not self.enabled:
+            return _NULL
+        return _Timer(self, name, ticker)
+
+    def record_time(self, name: str, seconds: float, ticker: Optional[str] = None):
+        with self._lock:
+            stat = self.timers.get(name)
+            if stat is None:
+                self.timers[name] = [1, seconds, seconds, seconds]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                stat[2] = min(stat[2], seconds)
+                stat[3] = max(stat[3], seconds)
+            if ticker is not None:
+                per = self.timers_by_ticker.setdefault(name, {})
+                per[ticker] = per.get(ticker, 0.0) + seconds
+
+    def incr(self, name: str, value: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """Add one sample to histogram `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.histograms.setdefault(name, []).append(float(value))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            timers = {
+                name: {"count": c, "total_s": total, "mean_s": total / c, "min_s": lo, "max_s": hi,
+                       "by_ticker": dict(self.timers_by_ticker.get(name, {}))}
+                for name, (c, total, lo, hi) in self.timers.items()
+            }
+            histograms = {}
+            for name, values in self.histograms.items():
+                arr = np.asarray(values)
+                p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+                histograms[name] = {"count": len(arr), "mean": float(arr.mean()), "min": float(arr.min()),
+                                    "max": float(arr.max()), "p50": float(p50), "p95": float(p95),
+                                    "p99": float(p99)}
+            return {"timers": timers, "counters": dict(self.counters), "histograms": histograms}
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        text = json.dumps(self.snapshot(), indent=2)
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def by_ticker(self) -> pd.DataFrame:
+        """Seconds per (ticker x timer) for the timers that were given a ticker."""
+        with self._lock:
+            return pd.DataFrame(self.timers_by_ticker).fillna(0.0).sort_index()
+
+    def report(self) -> str:
+        snap = self.snapshot()
+        lines = ["Timers:"]
+        for name, t in sorted(snap["timers"].items(), key=lambda kv: -kv[1]["total_s"]):
+            lines.append(f"  {name:<28} total={t['total_s']:.4f}s count={t['count']} "
+                         f"mean={t['mean_s'] * 1000:.2f}ms max={t['max_s'] * 1000:.2f}ms")
+        if snap["counters"]:
+            lines.append("Counters:")
+            lines.extend(f"  {name:<28} {value:g}" for name, value in sorted(snap["counters"].items()))
+        if snap["histograms"]:
+            lines.append("Histograms:")
+            for name, h in sorted(snap["histograms"].items()):
+                lines.append(f"  {name:<28} n={h['count']} mean={h['mean']:.3g} p50={h['p50']:.3g} "
+                             f"p95={h['p95']:.3g} max={h['max']:.3g}")
+        per_ticker = self.by_ticker()
+        if not per_ticker.empty:
+            lines.append("Seconds per ticker:")
+            lines.append(per_ticker.round(4).to_string())
+        return "\n".join(lines)
+
+
+METRICS = MetricsRegistry()
+
+
+def timed(name: str):
+    """Decorator form of METRICS.timer for whole functions/methods."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            with METRICS.timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def profiled(path: Optional[str] = None, top: int = 25):
+    """Run the block under cProfile, dump pstats to `path` and log the top functions by cumulative time.
+
+    With `path=None` this does nothing, so callers can wrap unconditionally.
+    """
+    if path is None:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        LOG.info(f"cProfile stats written to {path}\n{out.getvalue()}")
@@ -1,33 +1,311 @@
 from config import LOG
-from typing import  Tuple
+from metrics import timed
+from strategy import STRATEGY_DEFAULTS
+from typing import List, Optional, Tuple
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import accuracy_score, classification_report
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+BASE_FEATURES = ["rsi", "macd", "signal", "hist", "Volume"]
+
+
+def feature_columns(sma_short: int = 20, sma_long: int = 50, **_) -> List[str]:
+    """Model inputs for signals built with these Strategy parameters: the SMA columns follow
+    the configured windows (Strategy names them `sma{window}`)."""
+    return BASE_FEATURES + list(dict.fromkeys([f"sma{sma_short}", f"sma{sma_long}"]))
+
+
+FEATURES = feature_columns(**STRATEGY_DEFAULTS)
+
+
+def latest_features(signals: pd.DataFrame, features: Optional[List[str]] = None) -> pd.DataFrame:
+    """Feature row of the newest complete bar, the input for a next-bar prediction."""
+    return signals[features or FEATURES].dropna().iloc[-1:]
+
+
+def make_model(model_type: str = "tree", **params):
+    """Estimator for `model_type` with the repo defaults, overridden by `params` (e.g. from ml_search).
+
+    "sgd" is a StandardScaler + SGDClassifier pipeline: SGD is not scale invariant, and
+    raw Volume would otherwise swamp the indicator features. `params` go to the classifier.
+    """
+    if model_type == "tree":
+        model = DecisionTreeClassifier(max_depth=5)
+    elif model_type == "sgd":
+        model = make_pipeline(StandardScaler(), SGDClassifier(loss="log_loss", random_state=0))
+        if params:
+            model[-1].set_params(**params)
+        return model
+    else:
+        model = LogisticRegression(max_iter=500)
+    return model.set_params(**params) if params else model
+
+
+def _fit_window(model_type: str, X: np.ndarray, y: np.ndarray, train: Tuple[int, int], test: Tuple[int, int]):
+    """Fit one walk-forward window from scratch; module-level so it can run in a worker process."""
+    model = make_model(model_type)
+    model.fit(X[train[0]:train[1]], y[train[0]:train[1]])
+    return model.predict(X[test[0]:test[1]])
+
 
 class MLModel:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, features: Optional[List[str]] = None):
+        self.source_index = df.index
         self.df = df.copy().dropna()
+        # column names from feature_columns(); FEATURES matches the default Strategy
+        self.features = list(features or FEATURES)
+        self._features: Optional[Tuple[pd.DataFrame, pd.Series]] = None
+
+    @classmethod
+    def from_features(cls, X: pd.DataFrame, y: pd.Series) -> "MLModel":
+        """Wrap an already prepared (X, y), e.g. from FeatureCache, skipping feature engineering."""
+        ml = cls.__new__(cls)
+        ml.source_index = X.index
+        ml.df = None
+        ml.features = list(X.columns)
+        ml._features = (X, y)
+        return ml
 
+    @timed("ml.features")
     def prepare_features(self) -> Tuple[pd.DataFrame, pd.Series]:
+        if self._features is not None:
+            return self._features
         d = self.df
-        # features: rsi, macd, macd_signal, hist, volume, sma20, sma50, returns
+        # features: rsi, macd, macd_signal, hist, volume, short and long sma, returns
         d["return_1d"] = d["Close"].pct_change().shift(-1)  # what we want to predict
         d = d.dropna()
-        X = d[["rsi", "macd", "signal", "hist", "Volume", "sma20", "sma50"]]
+        X = d[self.features]
         y = (d["return_1d"] > 0).astype(int)  # 1 if price goes up next day
+        self._features = (X, y)
         return X, y
 
-    def train(self, model_type: str = "tree") -> Tuple[object, float]:
+    @timed("ml.train")
+    def train(self, model_type: str = "tree", params: Optional[dict] = None) -> Tuple[object, float]:
         X, y = self.prepare_features()
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
-        if model_type == "tree":
-            model = DecisionTreeClassifier(max_depth=5)
-        else:
-            model = LogisticRegression(max_iter=500)
+        model = make_model(model_type, **(params or {}))
         model.fit(X_train, y_train)
         preds = model.predict(X_test)
         acc = accuracy_score(y_test, preds)
         LOG.info(f"ML model ({model_type}) accuracy: {acc:.4f}")
         return model, acc
+
+    @staticmethod
+    def walk_forward_windows(n: int, n_windows: int = 5, train_size: Optional[int] = None):
+        """[(train_start, train_end), (test_start, test_end)] row ranges, oldest first.
+
+        The rows are cut into n_windows equal test blocks at the end, preceded by the
+        initial training block. Training windows expand from row 0 unless `train_size`
+        fixes a rolling length.
+        """
+        test_size = n // (n_windows + 1)
+        if test_size < 1:
+            raise ValueError(f"Not enough rows ({n}) for {n_windows} walk-forward windows")
+        first_test = n - n_windows * test_size
+        windows = []
+        for k in range(n_windows):
+            test_start = first_test + k * test_size
+            train_start = 0 if train_size is None else max(0, test_start - train_size)
+            windows.append(((train_start, test_start), (test_start, test_start + test_size)))
+        return windows
+
+    @timed("ml.walk_forward")
+    def walk_forward(self, model_type: str = "tree", n_windows: int = 5, train_size: Optional[int] = None,
+                     max_workers: Optional[int] = None) -> dict:
+        """Out-of-sample evaluation over successive time windows.
+
+        - "sgd" with an expanding window is the only truly incremental model: each window
+          only feeds the rows added since the previous one to the scaler's and the
+          classifier's partial_fit, so the total cost is linear in the rows.
+        - "logistic" refits each window on its whole training block, warm-started from
+          the previous coefficients (fewer iterations, but still a full pass per window).
+        - "tree" (and sgd with a rolling `train_size`) fits every window independently,
+          spread over a process pool (`max_workers`; 1 runs in-process).
+
+        With expanding windows, logistic and tree fit every earlier row again in each
+        window, so their cost grows quadratically as windows are added; sgd's stays linear.
+
+        Returns {"windows": per-window DataFrame, "predictions": out-of-sample predictions
+        aligned to the signals index (NaN outside test blocks), "accuracy": mean accuracy}.
+        """
+        X_df, y_s = self.prepare_features()
+        X = X_df.to_numpy(dtype=float)
+        y = y_s.to_numpy()
+        windows = self.walk_forward_windows(len(X), n_windows, train_size)
+
+        preds = []
+        if model_type == "sgd" and train_size is None:
+            model = make_model(model_type)
+            scaler, clf = model[0], model[-1]
+            fed = 0
+            for (_, train_end), (test_start, test_end) in windows:
+                scaler.partial_fit(X[fed:train_end])
+                clf.partial_fit(scaler.transform(X[fed:train_end]), y[fed:train_end], classes=np.array([0, 1]))
+                fed = train_end
+                preds.append(clf.predict(scaler.transform(X[test_start:test_end])))
+        elif model_type not in ("tree", "sgd"):
+            model = make_model(model_type)
+            model.set_params(warm_start=True)
+            for (train_start, train_end), (test_start, test_end) in windows:
+                model.fit(X[train_start:train_end], y[train_start:train_end])
+                preds.append(model.predict(X[test_start:test_end]))
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            if workers == 1:
+                preds = [_fit_window(model_type, X, y, train, test) for train, test in windows]
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(windows))) as pool:
+                    futures = [pool.submit(_fit_window, model_type, X, y, train, test) for train, test in windows]
+                    preds = [f.result() for f in futures]
+
+        rows = []
+        predictions = pd.Series(np.nan, index=self.source_index, name="prediction")
+        for k, (((train_start, train_end), (test_start, test_end)), p) in enumerate(zip(windows, preds)):
+            test_index = X_df.index[test_start:test_end]
+            predictions.loc[test_index] = p
+            rows.append({
+                "window": k,
+                "train_start": X_df.index[train_start],
+                "train_end": X_df.index[train_end - 1],
+                "test_start": test_index[0],
+                "test_end": test_index[-1],
+                "n_train": train_end - train_start,
+                "n_test": test_end - test_start,
+                "accuracy": accuracy_score(y[test_start:test_end], p),
+            })
+        results = pd.DataFrame(rows)
+        acc = float(results["accuracy"].mean())
+        LOG.info(f"Walk-forward ({model_type}, {n_windows} windows) mean accuracy: {acc:.4f}")
+        return {"windows": results, "predictions": predictions, "accuracy": acc}
+
+
+def _utc_values(index: pd.Index) -> np.ndarray:
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").to_numpy()
+
+
+class PooledModel:
+    """One model trained on every ticker's features stacked into a single array.
+
+    Each ticker's features are z-scored with that ticker's own training-period mean and
+    std, so price- and volume-level differences between tickers disappear. The ticker
+    itself enters as one target-encoded column: its training-period share of up bars,
+    shrunk towards the pooled share by `smoothing` pseudo-bars (an arbitrary integer id
+    would impose a meaningless order, and one-hot columns grow with the universe). Rows
+    are split on one calendar cutoff shared by all tickers (the first `test_size` of
+    dates train, the rest test), so no ticker trains on a date another ticker is tested
+    on, and the encoding never sees test rows.
+
+    `predict_latest` scores the newest complete bar of every ticker in one `predict` call.
+    """
+
+    def __init__(self, model_type: str = "tree", test_size: float = 0.2, features: Optional[List[str]] = None,
+                 smoothing: float = 20.0):
+        self.model_type = model_type
+        self.test_size = test_size
+        self.features = list(features or FEATURES)
+        self.smoothing = smoothing
+        self.model = None
+        self.tickers: list = []
+        # per-ticker (mean, std) rows, shape (n_tickers, n_features), aligned with self.tickers
+        self.mean: Optional[np.ndarray] = None
+        self.std: Optional[np.ndarray] = None
+        # per-ticker smoothed training share of up bars, the ticker's encoding
+        self.up_rate: Optional[np.ndarray] = None
+        self.cutoff: Optional[pd.Timestamp] = None
+
+    def _normalize(self, ids: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """Z-score `X` rows with the stats of their ticker and append the ticker's encoding."""
+        out = np.empty((len(X), X.shape[1] + 1))
+        np.subtract(X, self.mean[ids], out=out[:, :-1])
+        out[:, :-1] /= self.std[ids]
+        out[:, -1] = self.up_rate[ids]
+        return out
+
+    @timed("ml.pooled_stack")
+    def stack(self, signals: dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(X, y, ticker ids, dates) for every ticker in `signals`, normalized, in one contiguous array."""
+        parts = {}
+        for t, df in signals.items():
+            X_t, y_t = MLModel(df, self.features).prepare_features()
+            if len(X_t):
+                parts[t] = (X_t, y_t)
+        self.tickers = list(parts)
+        # naive UTC datetime64 so tickers with different exchange time zones compare on one axis
+        stamps = [_utc_values(X_t.index) for X_t, _ in parts.values()]
+        dates = np.unique(np.concatenate(stamps))
+        self.cutoff = pd.Timestamp(dates[int(len(dates) * (1 - self.test_size))])
+
+        n_rows = sum(len(X_t) for X_t, _ in parts.values())
+        X = np.empty((n_rows, len(self.features)))
+        y = np.empty(n_rows, dtype=int)
+        ids = np.empty(n_rows, dtype=np.int64)
+        when = np.empty(n_rows, dtype="M8[ns]")
+        self.mean = np.zeros((len(parts), len(self.features)))
+        self.std = np.ones((len(parts), len(self.features)))
+        row = 0
+        for i, ((X_t, y_t), t_when) in enumerate(zip(parts.values(), stamps)):
+            n = len(X_t)
+            X[row:row + n] = X_t.to_numpy(dtype=float)
+            y[row:row + n] = y_t.to_numpy()
+            ids[row:row + n] = i
+            when[row:row + n] = t_when
+            train = X[row:row + n][t_when < self.cutoff.to_datetime64()]
+            if len(train):
+                self.mean[i] = train.mean(axis=0)
+                std = train.std(axis=0)
+                self.std[i] = np.where(std > 0, std, 1.0)
+            row += n
+        train = when < self.cutoff.to_datetime64()
+        pooled = y[train].mean() if train.any() else 0.5
+        ups = np.bincount(ids[train], weights=y[train], minlength=len(parts))
+        counts = np.bincount(ids[train], minlength=len(parts))
+        self.up_rate = (ups + self.smoothing * pooled) / (counts + self.smoothing)
+        return self._normalize(ids, X), y, ids, when
+
+    @timed("ml.pooled_train")
+    def fit(self, signals: dict) -> dict:
+        """Fit on the training dates of all tickers; returns overall and per-ticker test accuracy."""
+        X, y, ids, when = self.stack(signals)
+        train = when < self.cutoff.to_datetime64()
+        self.model = make_model(self.model_type)
+        self.model.fit(X[train], y[train])
+        test = ~train
+        preds = self.model.predict(X[test])
+        correct = preds == y[test]
+        counts = np.bincount(ids[test], minlength=len(self.tickers))
+        hits = np.bincount(ids[test], weights=correct, minlength=len(self.tickers))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            per_ticker = pd.Series(hits / counts, index=self.tickers, name="accuracy")
+        acc = float(correct.mean()) if len(correct) else float("nan")
+        LOG.info(f"Pooled ML model ({self.model_type}, {len(self.tickers)} tickers, {int(train.sum())} "
+                 f"training rows) accuracy: {acc:.4f}")
+        return {"accuracy": acc, "per_ticker": per_ticker, "n_train": int(train.sum()), "n_test": int(test.sum())}
+
+    @timed("ml.pooled_predict")
+    def predict_latest(self, signals: dict) -> pd.DataFrame:
+        """Next-bar prediction for the newest complete bar of each known ticker in `signals`."""
+        position = {t: i for i, t in enumerate(self.tickers)}
+        rows, ids, names, as_of = [], [], [], []
+        for t, df in signals.items():
+            if t not in position:
+                continue
+            latest = latest_features(df, self.features)
+            if len(latest):
+                rows.append(latest.to_numpy(dtype=float)[0])
+                ids.append(position[t])
+                names.append(t)
+                as_of.append(latest.index[-1])
+        if not rows:
+            return pd.DataFrame(columns=["as_of", "prediction"])
+        X = self._normalize(np.asarray(ids), np.vstack(rows))
+        return pd.DataFrame({"as_of": as_of, "prediction": self.model.predict(X)}, index=pd.Index(names, name="ticker"))
@@ -0,0 +1,178 @@
+"""Time-series hyperparameter search for MLModel.
+
+Configurations are scored with TimeSeriesSplit folds (every fold trains strictly on
+rows before its test block) and pruned by successive halving: each round scores the
+surviving configurations on `factor` times more folds than the last, then keeps the
+best 1/`factor`. Folds are added newest first, so early rounds judge configurations
+on the most recent market regime. Scores are cached per (configuration, fold), so a
+fold is never refit for the same configuration.
+
+The feature matrix and fold boundaries are computed once. A pool created here
+receives the arrays once, through its initializer, and each task only names a fold;
+a caller searching many tickers passes one `executor` in instead, and its tasks carry
+the arrays.
+"""
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import TimeSeriesSplit
+
+from config import LOG
+from metrics import timed
+from ml_model import MLModel, make_model
+
+DEFAULT_SPACE: Dict[str, Dict[str, List]] = {
+    "tree": {"max_depth": [2, 3, 5, 8, None], "min_samples_leaf": [1, 5, 20]},
+    "logistic": {"C": [0.01, 0.1, 1.0, 10.0], "max_iter": [500, 2000]},
+}
+
+# arrays shared with worker processes by the pool initializer
+_X: Optional[np.ndarray] = None
+_y: Optional[np.ndarray] = None
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray):
+    global _X, _y
+    _X, _y = X, y
+
+
+def _fit_score(X: np.ndarray, y: np.ndarray, model_type: str, params: dict,
+               train_end: int, test: Tuple[int, int]) -> Tuple[float, float]:
+    """Fit on rows [0, train_end) and return (accuracy, AUC) on the `test` row range."""
+    model = make_model(model_type, **params)
+    model.fit(X[:train_end], y[:train_end])
+    X_test, y_test = X[test[0]:test[1]], y[test[0]:test[1]]
+    acc = accuracy_score(y_test, model.predict(X_test))
+    auc = float("nan")
+    if len(np.unique(y_test)) == 2 and len(model.classes_) == 2:
+        auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+    return acc, auc
+
+
+def _score_task(model_type: str, params: dict, train_end: int, test: Tuple[int, int]) -> Tuple[float, float]:
+    return _fit_score(_X, _y, model_type, params, train_end, test)
+
+
+def search_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Process pool to share across search_hyperparameters calls (e.g. one per ticker)."""
+    return ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+
+
+def expand_space(space: Dict[str, List]) -> List[dict]:
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def time_series_folds(n: int, n_splits: int = 5) -> List[Tuple[int, Tuple[int, int]]]:
+    """[(train_end, (test_start, test_end))] for TimeSeriesSplit over n rows, newest fold first."""
+    folds = []
+    for train_idx, test_idx in TimeSeriesSplit(n_splits=n_splits).split(np.empty((n, 1))):
+        folds.append((int(train_idx[-1]) + 1, (int(test_idx[0]), int(test_idx[-1]) + 1)))
+    return folds[::-1]
+
+
+@timed("ml.search")
+def search_hyperparameters(signals: pd.DataFrame, model_types: Sequence[str] = ("tree", "logistic"),
+                           space: Optional[Dict[str, Dict[str, List]]] = None, n_splits: int = 5,
+                           factor: int = 3, min_folds: int = 1, holdout: float = 0.2,
+                           max_workers: Optional[int] = None, features: Optional[List[str]] = None,
+                           executor: Optional[ProcessPoolExecutor] = None) -> Tuple[Dict[str, dict], pd.DataFrame]:
+    """Successive-halving search over each model family's grid on one ticker's signals.
+
+    The last `holdout` fraction of rows is kept out of the search; the best configuration
+    of each family is refit on all earlier rows and scored there. `features` defaults to
+    FEATURES; pass ml_model.feature_columns(**strategy_params) for non-default SMA windows.
+    With an `executor` (see search_executor) no pool is created and the caller shuts it down.
+
+    Raises ValueError when there are too few rows for `n_splits` folds.
+
+    Returns `(ml_results, table)`. `ml_results` maps each family to its best config's
+    {"accuracy", "auc" (holdout), "cv_mean", "cv_std" (across all folds), "params"}, the
+    shape CSVSLogger.log_ml_results takes. `table` has one row per configuration and
+    round with the folds scored so far.
+    """
+    space = {**DEFAULT_SPACE, **(space or {})}
+    X_df, y_s = MLModel(signals, features).prepare_features()
+    X = np.ascontiguousarray(X_df.to_numpy(dtype=float))
+    y = y_s.to_numpy()
+    cv_end = int(len(X) * (1 - holdout))
+    folds = time_series_folds(cv_end, n_splits)
+
+    workers = max_workers or os.cpu_count() or 1
+    pool = None
+    if executor is None and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X[:cv_end], y[:cv_end]))
+
+    def run(tasks):
+        if executor is not None:
+            futures = [executor.submit(_fit_score, X[:cv_end], y[:cv_end], *task) for task in tasks]
+            return [f.result() for f in futures]
+        if pool is None:
+            return [_fit_score(X[:cv_end], y[:cv_end], *task) for task in tasks]
+        futures = [pool.submit(_score_task, *task) for task in tasks]
+        return [f.result() for f in futures]
+
+    rows = []
+    ml_results: Dict[str, dict] = {}
+    try:
+        for model_type in model_types:
+            configs = expand_space(space.get(model_type, {}))
+            scores: Dict[int, List[Tuple[float, float]]] = {i: [] for i in range(len(configs))}
+            survivors = list(range(len(configs)))
+            used = 0
+            budget = min_folds
+            for rnd in itertools.count():
+                upto = min(len(folds), budget)
+                tasks = [(i, f) for i in survivors for f in range(used, upto)]
+                results = run([(model_type, configs[i], *folds[f]) for i, f in tasks])
+                for (i, _), score in zip(tasks, results):
+                    scores[i].append(score)
+                used = upto
+                mean = {i: float(np.mean([a for a, _ in scores[i]])) for i in survivors}
+                ranked = sorted(survivors, key=lambda i: -mean[i])
+                keep = ranked if used == len(folds) else ranked[:max(1, math.ceil(len(ranked) / factor))]
+                for i in ranked:
+                    accs = [a for a, _ in scores[i]]
+                    rows.append({"model": model_type, "params": json.dumps(configs[i], sort_keys=True),
+                                 "round": rnd, "folds": used, "cv_mean": mean[i], "cv_std": float(np.std(accs)),
+                                 "survived": i in keep})
+                survivors = keep
+                if used == len(folds):
+                    break
+                budget *= factor
+
+            best = survivors[0]
+            accs = [a for a, _ in scores[best]]
+            acc, auc = _fit_score(X, y, model_type, configs[best], cv_end, (cv_end, len(X)))
+            ml_results[model_type] = {"accuracy": acc, "auc": auc, "cv_mean": float(np.mean(accs)),
+                                      "cv_std": float(np.std(accs)), "params": configs[best]}
+            LOG.info(f"Best {model_type}: {configs[best]} cv_mean={np.mean(accs):.4f} holdout accuracy={acc:.4f}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return ml_results, pd.DataFrame(rows)
+
+
+def search_tickers(signals: Dict[str, pd.DataFrame], max_workers: Optional[int] = None,
+                   **kwargs) -> Dict[str, dict]:
+    """search_hyperparameters for every ticker on one shared process pool.
+
+    Returns {ticker: ml_results}; a ticker whose search fails (e.g. too short a history
+    for the folds) is logged and maps to {"success": False, "error": ...} instead.
+    """
+    results: Dict[str, dict] = {}
+    with search_executor(max_workers) as executor:
+        for t, sig in signals.items():
+            try:
+                results[t], _ = search_hyperparameters(sig, executor=executor, **kwargs)
+            except Exception as e:
+                LOG.exception(f"ML search failed for {t}")
+                results[t] = {"success": False, "error": str(e)}
+    return results
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import LOG, MODEL_DIR
+from feature_cache import frame_hash
+
+INDEX_NAME = "index.json"
+
+
+class ModelRegistry:
+    """On-disk store of fitted models, so MLModel is refit only when its inputs change.
+
+    Models are joblib files keyed by ticker, model type, model/feature parameters and
+    the training window (first and last row, row count and a hash of the training
+    matrix). New bars or a revised history change the window part of the key, and new
+    hyperparameters or indicator settings change the parameter part, so a stale model
+    is simply never looked up again. Each (ticker, model type) keeps only its newest
+    entry; `latest` returns it without needing the data, e.g. for prediction.
+
+    Loads are lazy and memory-map the model's numpy arrays (`mmap_mode="r"`); up to
+    `max_loaded` loaded models are kept in memory. With `refit=True`, `get` always
+    misses, so every model is retrained (and replaces the stored one).
+    """
+
+    def __init__(self, root: str = MODEL_DIR, max_loaded: int = 1024, refit: bool = False):
+        self.root = root
+        self.max_loaded = max_loaded
+        self.refit = refit
+        os.makedirs(root, exist_ok=True)
+        self._index_path = os.path.join(root, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._loaded: "OrderedDict[str, object]" = OrderedDict()
+        self.index: Dict[str, dict] = self._read_index()
+        # key -> metadata, so `get` is one lookup; kept in step with `index` under `_lock`
+        self._by_key: Dict[str, dict] = {m["key"]: m for m in self.index.values()}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(ticker: str, model_type: str, X: pd.DataFrame, y: pd.Series, params: dict) -> str:
+        window = ModelRegistry.window(X)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(json.dumps({"ticker": ticker, "model_type": model_type, "params": params, **window},
+                            sort_keys=True, default=str).encode())
+        h.update(frame_hash(X, columns=list(X.columns)).encode())
+        h.update(np.ascontiguousarray(y.to_numpy(dtype=float)).tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    def window(X: pd.DataFrame) -> dict:
+        return {"train_start": str(X.index[0]) if len(X) else None,
+                "train_end": str(X.index[-1]) if len(X) else None,
+                "rows": int(len(X))}
+
+    @staticmethod
+    def _slot(ticker: str, model_type: str) -> str:
+        return f"{ticker}|{model_type}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.joblib")
+
+    def _read_index(self) -> Dict[str, dict]:
+        if not os.path.exists(self._index_path):
+            return {}
+        with open(self._index_path) as f:
+            return json.load(f)
+
+    def _write_index(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(tmp, self._index_path)
+
+    def _load(self, key: str):
+        import joblib
+
+        with self._lock:
+            model = self._loaded.get(key)
+            if model is not None:
+                self._loaded.move_to_end(key)
+                return model
+        try:
+            model = joblib.load(self._path(key), mmap_mode="r")
+        except (FileNotFoundError, EOFError):
+            return None
+        with self._lock:
+            self._loaded[key] = model
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return model
+
+    def get(self, key: str) -> Optional[Tuple[object, dict]]:
+        """(model, metadata) stored under `key`, or None."""
+        meta = None
+        if not self.refit:
+            with self._lock:
+                meta = self._by_key.get(key)
+        model = self._load(key) if meta is not None else None
+        with self._lock:
+            if model is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return model, meta
+
+    def latest(self, ticker: str, model_type: str) -> Optional[Tuple[object, dict]]:
+        """Newest (model, metadata) for the ticker and model type, whatever data it was trained on."""
+        with self._lock:
+            meta = self.index.get(self._slot(ticker, model_type))
+        if meta is None:
+            return None
+        model = self._load(meta["key"])
+        return (model, meta) if model is not None else None
+
+    def put(self, key: str, model, ticker: str, model_type: str, **meta):
+        """Store `model` under `key` and make it the latest for (ticker, model_type)."""
+        import joblib
+
+        path = self._path(key)
+        tmp = path + ".tmp"
+        joblib.dump(model, tmp)
+        os.replace(tmp, path)
+        entry = {"key": key, "ticker": ticker, "model_type": model_type,
+                 "created": pd.Timestamp.now(tz="UTC").isoformat(), **meta}
+        slot = self._slot(ticker, model_type)
+        with self._lock:
+            previous = self.index.get(slot)
+            self.index[slot] = entry
+            if previous:
+                self._by_key.pop(previous["key"], None)
+            self._by_key[key] = entry
+            self._loaded[key] = model
+            self._write_index()
+            if previous and previous["key"] != key:
+                self._loaded.pop(previous["key"], None)
+                if os.path.exists(self._path(previous["key"])):
+                    os.remove(self._path(previous["key"]))
+                LOG.info(f"Replaced model for {ticker} ({model_type})")
+
+    def clear(self):
+        with self._lock:
+            for name in os.listdir(self.root):
+                os.remove(os.path.join(self.root, name))
+            self.index = {}
+            self._by_key = {}
+            self._loaded.clear()
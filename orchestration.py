@@ -1,58 +1,330 @@
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
 from data_fetcher import DataFetcher
-from config import LOG
-from strategy import Strategy, Trade
+from config import LOG, SCAN_STATE_PATH
+from strategy import STRATEGY_DEFAULTS, Strategy, Trade, bar_time
 from backtester import Backtester
+from indicators import PanelIndicators
 import pandas as pd
-from ml_model import MLModel
-from logging import GSheetsLogger, GSHEETS_AVAILABLE
+from metrics import METRICS
+from streaming import SignalState, load_signal_states, save_signal_states
 
-def run_backtest_for_tickers(tickers: List[str], period: str = "6mo") -> dict:
-    fetcher = DataFetcher(tickers=tickers, period=period)
-    all_data = fetcher.fetch()
-    results = {}
-    for t, df in all_data.items():
+if TYPE_CHECKING:
+    # annotations only; ml_model (scikit-learn) is imported by the ML stage itself
+    from feature_cache import FeatureCache
+    from gsheets_logger import GSheetsLogger
+    from model_registry import ModelRegistry
+
+# stage -> stages it needs; "fetch", "indicators" and "ml_pooled" run once for the whole
+# universe, the rest once per ticker
+STAGE_DEPS = {
+    "fetch": (),
+    "validate": ("fetch",),
+    "indicators": ("fetch",),
+    "signals": ("indicators",),
+    "backtest": ("signals",),
+    "ml": ("signals",),
+    "predict": ("signals",),
+    "ml_pooled": ("signals",),
+    "scan": ("backtest",),
+}
+TICKER_STAGES = ("signals", "backtest", "ml", "predict", "scan")
+
+
+class Pipeline:
+    """Runs fetch -> indicators -> signals -> backtest / ML / scan -> log once per invocation.
+
+    Each stage runs at most once per ticker and its output is shared by every stage that
+    depends on it, so e.g. backtest, ML and scan all reuse one fetch and one set of
+    signals. Per-ticker stages for different tickers run concurrently on a thread pool.
+    Results are kept in `self.data`, `self.panel` and `self.results[ticker][stage]`.
+
+    The optional "validate" stage (also run whenever `min_quality` is set) scores the
+    fetched data for the whole universe in one pass before indicators are computed
+    (`self.quality[ticker]`); tickers scoring below `min_quality` are dropped from
+    `self.data`.
+    """
+
+    def __init__(self, tickers: List[str], period: str = "6mo", model_type: str = "tree",
+                 fetcher: Optional[DataFetcher] = None, feature_cache: Optional["FeatureCache"] = None,
+                 gsheet: Optional["GSheetsLogger"] = None, state_path: Optional[str] = SCAN_STATE_PATH,
+                 max_workers: Optional[int] = None, model_registry: Optional["ModelRegistry"] = None,
+                 min_quality: Optional[float] = None, walk_forward: Optional[int] = None):
+        self.tickers = tickers
+        self.period = period
+        self.model_type = model_type
+        self.fetcher = fetcher or DataFetcher(tickers=tickers, period=period)
+        self.feature_cache = feature_cache
+        self.model_registry = model_registry
+        self.gsheet = gsheet
+        self.state_path = state_path
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.min_quality = min_quality
+        self.walk_forward = walk_forward
+        self.quality: Dict[str, dict] = {}
+        self.data: Dict[str, pd.DataFrame] = {}
+        self.panel: Dict[str, pd.DataFrame] = {}
+        self.results: Dict[str, Dict[str, object]] = {}
+        self.pooled: Optional[dict] = None
+        self._states: Dict[str, SignalState] = {}
+
+    @staticmethod
+    def plan(stages: Iterable[str]) -> List[str]:
+        """Requested stages plus everything they depend on, in execution order."""
+        ordered: List[str] = []
+
+        def visit(stage: str):
+            if stage not in STAGE_DEPS:
+                raise ValueError(f"Unknown pipeline stage {stage!r}")
+            for dep in STAGE_DEPS[stage]:
+                visit(dep)
+            if stage not in ordered:
+                ordered.append(stage)
+
+        for stage in stages:
+            visit(stage)
+        return ordered
+
+    def run(self, stages: Iterable[str]) -> Dict[str, Dict[str, object]]:
+        plan = self.plan(stages)
+        if "fetch" in plan and not self.data:
+            with METRICS.timer("stage.fetch"):
+                self.data = self.fetcher.fetch()
+        validate = "validate" in plan or self.min_quality is not None
+        if validate and not self.quality and self.data:
+            with METRICS.timer("stage.validate"):
+                self.quality = self.fetcher.validate_universe(self.data)
+            if self.min_quality is not None:
+                dropped = sorted(t for t, r in self.quality.items() if r["quality_score"] < self.min_quality)
+                if dropped:
+                    LOG.warning(f"Dropping {dropped}: data quality below {self.min_quality}")
+                self.data = {t: df for t, df in self.data.items() if t not in dropped}
+        if "indicators" in plan and not self.panel and self.data:
+            # indicators for the whole universe in one pass over a (dates x tickers) panel
+            with METRICS.timer("stage.indicators"):
+                closes = pd.concat({t: df["Close"] for t, df in self.data.items()}, axis=1, sort=True)
+                self.panel = PanelIndicators.compute(closes)
+        if "scan" in plan and self.state_path and not self._states:
+            self._states = load_signal_states(self.state_path)
+        for t in self.data:
+            self._states.setdefault(t, SignalState())
+
+        ticker_plan = [s for s in plan if s in TICKER_STAGES]
+        if ticker_plan and self.data:
+            if self.max_workers > 1 and len(self.data) > 1:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    list(pool.map(lambda t: self._run_ticker(t, ticker_plan), self.data))
+            else:
+                for t in self.data:
+                    self._run_ticker(t, ticker_plan)
+
+        if "ml_pooled" in plan and self.pooled is None:
+            with METRICS.timer("stage.ml_pooled"):
+                self.pooled = self._stage_ml_pooled()
+        if "scan" in plan:
+            with METRICS.timer("stage.log"):
+                self._log_scan()
+        return self.results
+
+    def _run_ticker(self, t: str, stages: List[str]):
+        done = self.results.setdefault(t, {})
+        for stage in stages:
+            if stage in done:
+                continue
+            try:
+                with METRICS.timer(f"stage.{stage}", t):
+                    done[stage] = getattr(self, f"_stage_{stage}")(t, done)
+            except Exception as e:
+                LOG.exception(f"Stage {stage} failed for {t}")
+                done[stage] = {"success": False, "error": str(e)}
+                return
+
+    def _stage_signals(self, t: str, done: dict) -> pd.DataFrame:
         LOG.info(f"Preparing signals for {t}")
-        strat = Strategy(df)
-        signals = strat.generate_signals()
-        bt = Backtester(signals_df=signals, ticker=t)
+        return Strategy.from_panel(self.data[t], self.panel, t).generate_signals()
+
+    def _stage_backtest(self, t: str, done: dict) -> dict:
+        bt = Backtester(signals_df=done["signals"], ticker=t)
         trades, final_value = bt.run()
-        summary = bt.summary()
-        results[t] = {"trades": trades, "final_value": final_value, "summary": summary}
-    return results
+        return {"trades": trades, "final_value": final_value, "summary": bt.summary(),
+                "metrics": bt.get_performance_metrics()}
+
+    def _stage_ml(self, t: str, done: dict) -> dict:
+        return run_ml_for_ticker(self.data[t], model_type=self.model_type, cache=self.feature_cache,
+                                 ticker=t, signals=done["signals"], registry=self.model_registry,
+                                 walk_forward=self.walk_forward)
+
+    def _stage_predict(self, t: str, done: dict) -> dict:
+        # a registry load and one predict call; the model is only fitted by the "ml" stage
+        if self.model_registry is None:
+            raise ValueError("The predict stage needs a model_registry")
+        if "ml" in done:
+            return {k: done["ml"][k] for k in ("success", "prediction", "as_of") if k in done["ml"]}
+        return predict_latest(self.model_registry, t, done["signals"], self.model_type)
 
+    def _stage_ml_pooled(self) -> dict:
+        """One model over every ticker's stacked features, then one batched predict for all latest bars."""
+        from ml_model import PooledModel
 
-def run_ml_for_ticker(df: pd.DataFrame, model_type: str = "tree") -> dict:
-    strat = Strategy(df)
-    signals = strat.generate_signals()
-    df_signals = signals
-    ml = MLModel(df_signals)
+        signals = {t: done["signals"] for t, done in self.results.items()
+                   if isinstance(done.get("signals"), pd.DataFrame)}
+        if not signals:
+            return {"success": False, "error": "No signals to train on"}
+        pooled = PooledModel(model_type=self.model_type)
+        try:
+            result = pooled.fit(signals)
+        except Exception as e:
+            LOG.exception("Pooled ML training failed")
+            return {"success": False, "error": str(e)}
+        return {"success": True, **result, "predictions": pooled.predict_latest(signals), "model": pooled}
+
+    def _stage_scan(self, t: str, done: dict) -> dict:
+        latest = self._states[t].catch_up(self.data[t])
+        trade = None
+        if latest["buy_signal"]:
+            when = bar_time(latest["timestamp"])
+            LOG.info(f"{t}: BUY signal detected on {when}")
+            trade = Trade(ticker=t, entry_date=when, entry_price=latest["close"])
+        return {"latest": latest, "trade": trade}
+
+    def scan_results(self):
+        trades = []
+        summary = {}
+        for t, done in self.results.items():
+            scan = done.get("scan")
+            if not isinstance(scan, dict) or "latest" not in scan:
+                continue
+            if scan["trade"] is not None:
+                trades.append(scan["trade"])
+            # For the purpose of logging, the per-ticker summary comes from the backtest
+            summary[t] = done["backtest"]["summary"]
+        return trades, summary
+
+    def _log_scan(self):
+        if self.state_path:
+            save_signal_states(self._states, self.state_path)
+        if self.gsheet is not None:
+            trades, summary = self.scan_results()
+            # queued for the background writer; the caller flushes/closes the logger
+            self.gsheet.write_trade_log(trades, tab_name="trade_log")
+            self.gsheet.write_summary({k: str(v) for k, v in summary.items()}, tab_name="summary")
+
+
+def run_backtest_for_tickers(tickers: List[str], period: str = "6mo") -> dict:
+    results = Pipeline(tickers, period=period).run(["backtest"])
+    return {t: done["backtest"] for t, done in results.items() if "summary" in done.get("backtest", {})}
+
+
+def run_ml_for_ticker(df: pd.DataFrame, model_type: str = "tree", cache: Optional["FeatureCache"] = None,
+                      ticker: Optional[str] = None, strategy_params: Optional[dict] = None,
+                      signals: Optional[pd.DataFrame] = None, registry: Optional["ModelRegistry"] = None,
+                      walk_forward: Optional[int] = None) -> dict:
+    """Train the ML model on one ticker's OHLCV frame.
+
+    With a FeatureCache, the feature matrix is looked up by a hash of the OHLCV data and
+    the indicator parameters, so unchanged data skips Strategy and feature engineering.
+    `signals` lets a caller that already ran Strategy on `df` pass its output in.
+    With a ModelRegistry (and `ticker`), a model already fitted on the same training
+    window and parameters is loaded instead of refit, and the result includes the
+    next-bar prediction for the latest bar. `walk_forward` (a number of windows) adds the
+    MLModel.walk_forward out-of-sample accuracy as "walk_forward_accuracy".
+    """
+    from ml_model import MLModel, feature_columns, latest_features, make_model
+
+    params = {**STRATEGY_DEFAULTS, **(strategy_params or {})}
+    features = feature_columns(**params)
+    ml = None
+    key = None
+    if cache is not None:
+        key = cache.key(df, {"strategy": params, "features": features})
+        hit = cache.get(key)
+        if hit is not None:
+            ml = MLModel.from_features(*hit)
+    if ml is None:
+        if signals is None:
+            strat = Strategy(df, **(strategy_params or {}))
+            signals = strat.generate_signals()
+        df_signals = signals
+        ml = MLModel(df_signals, features)
+        if cache is not None:
+            try:
+                X, y = ml.prepare_features()
+                cache.put(key, X, y, tag=ticker)
+            except Exception:
+                LOG.exception("Failed to cache ML features")
     try:
-        model, acc = ml.train(model_type=model_type)
+        model = None
+        if registry is not None and ticker is not None:
+            X, y = ml.prepare_features()
+            model_params = {"strategy": params, "features": features, "model": make_model(model_type).get_params()}
+            model_key = registry.key(ticker, model_type, X, y, model_params)
+            hit = registry.get(model_key)
+            if hit is not None:
+                model, meta = hit
+                acc = meta["accuracy"]
+                LOG.info(f"Loaded {model_type} model for {ticker} trained through {meta['train_end']}")
+        if model is None:
+            model, acc = ml.train(model_type=model_type)
+            if registry is not None and ticker is not None:
+                registry.put(model_key, model, ticker, model_type, accuracy=acc, features=features,
+                             **registry.window(X))
+        if walk_forward:
+            wf_acc = ml.walk_forward(model_type, n_windows=walk_forward, max_workers=1)["accuracy"]
     except Exception as e:
         LOG.exception("ML training failed")
         return {"success": False, "error": str(e)}
-    return {"success": True, "accuracy": acc}
-
-
-def scan_and_log(tickers: List[str], gsheet: Optional[GSheetsLogger] = None):
-    fetcher = DataFetcher(tickers=tickers, period="6mo")
-    all_data = fetcher.fetch(force_refresh=True)
-    aggregated_trades = []
-    aggregated_summary = {}
-    for t, df in all_data.items():
-        strat = Strategy(df)
-        signals = strat.generate_signals()
-        latest = signals.iloc[-1]
-        if latest.get("buy_signal", False):
-            LOG.info(f"{t}: BUY signal detected on {signals.index[-1].date()}")
-            aggregated_trades.append(Trade(ticker=t, entry_date=signals.index[-1].date(), entry_price=latest["Close"]))
-        # For the purpose of logging, create a per-ticker summary
-        bt = Backtester(signals_df=signals, ticker=t)
-        trades, final_val = bt.run()
-        aggregated_summary[t] = bt.summary()
-    if gsheet and GSHEETS_AVAILABLE:
-        # flatten trades into single list and push
-        gsheet.write_trade_log(aggregated_trades, tab_name="trade_log")
-        gsheet.write_summary({k: str(v) for k, v in aggregated_summary.items()}, tab_name="summary")
-    return aggregated_trades, aggregated_summary
+    result = {"success": True, "accuracy": acc}
+    if walk_forward:
+        result["walk_forward_accuracy"] = wf_acc
+    if registry is not None and signals is not None:
+        latest = latest_features(signals, features)
+        if len(latest):
+            result["prediction"] = int(model.predict(latest)[0])
+            result["as_of"] = latest.index[-1]
+    return result
+
+
+def predict_latest(registry: "ModelRegistry", ticker: str, signals: pd.DataFrame, model_type: str = "tree") -> dict:
+    """Next-bar prediction for the latest bar from the ticker's newest registered model (no fitting)."""
+    from ml_model import FEATURES, latest_features
+
+    hit = registry.latest(ticker, model_type)
+    if hit is None:
+        return {"success": False, "error": f"No {model_type} model registered for {ticker}"}
+    model, meta = hit
+    # the model's own feature columns; entries registered before they were recorded used FEATURES
+    latest = latest_features(signals, meta.get("features", FEATURES))
+    if not len(latest):
+        return {"success": False, "error": "No complete feature row to predict from"}
+    return {"success": True, "prediction": int(model.predict(latest)[0]), "as_of": latest.index[-1],
+            "trained_through": meta["train_end"]}
+
+
+def scan_and_log(tickers: List[str], gsheet: Optional["GSheetsLogger"] = None, state_path: Optional[str] = SCAN_STATE_PATH,
+                 screener: bool = False, backtest: bool = True):
+    """Check the latest bar of each ticker for a BUY signal and log a per-ticker summary.
+
+    The latest-bar signal comes from a streaming SignalState persisted at `state_path`,
+    so only bars that arrived since the previous scan are processed (pass None to
+    rebuild from history every time).
+
+    With `screener=True` the store is brought up to date incrementally and the universe is
+    screened from the look-back tail instead (see screener.Screener; `state_path` is not used). The summary is then each hit's
+    backtest summary, or with `backtest=False` its screener row, and nothing is backtested.
+    """
+    if screener:
+        from screener import Screener
+
+        result = Screener(tickers).run(backtest=backtest)
+        hits = result["hits"]
+        trades = [Trade(ticker=t, entry_date=bar_time(row["as_of"]), entry_price=row["close"])
+                  for t, row in hits[hits["signal"] == "BUY"].iterrows()]
+        summary = result["backtest"] if backtest else hits.drop(columns="as_of").to_dict("index")
+        if gsheet is not None:
+            gsheet.write_trade_log(trades, tab_name="trade_log")
+            gsheet.write_summary({k: str(v) for k, v in summary.items()}, tab_name="summary")
+        return trades, summary
+    pipeline = Pipeline(tickers, period="6mo", gsheet=gsheet, state_path=state_path)
+    pipeline.run(["scan"])
+    return pipeline.scan_results()
@@ -0,0 +1,114 @@
+"""Performance metrics from per-bar equity arrays.
+
+Everything works along axis 0, so `equity` can be one curve (shape (n_bars,)) or a
+panel of curves side by side (shape (n_bars, n_series)), e.g. every parameter combo
+of a sweep for one ticker, and the whole panel is scored in one pass.
+"""
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+METRIC_NAMES = ("total_return", "cagr", "volatility", "sharpe", "sortino", "max_drawdown",
+                "max_drawdown_duration", "exposure", "turnover")
+
+
+def periods_per_year(index) -> float:
+    """Bars per year implied by a DatetimeIndex (about 252 for daily bars, more for intraday)."""
+    index = pd.DatetimeIndex(index)
+    if len(index) < 2:
+        return float(TRADING_DAYS)
+    years = (index[-1] - index[0]) / pd.Timedelta(days=365.25)
+    if years <= 0:
+        return float(TRADING_DAYS)
+    return (len(index) - 1) / years
+
+
+def drawdown(equity: np.ndarray):
+    """(drawdown from the running peak as a fraction <= 0, bars spent below that peak)."""
+    equity = np.asarray(equity, dtype=float)
+    peak = np.maximum.accumulate(equity, axis=0)
+    bars = np.arange(len(equity)).reshape((-1,) + (1,) * (equity.ndim - 1))
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, bars, 0), axis=0)
+    return equity / peak - 1.0, bars - last_peak
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    # 0 rather than inf/nan for curves that never move (e.g. no trades)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / den, 0.0)
+
+
+def compute_metrics(equity, positions=None, prices=None, periods: float = TRADING_DAYS,
+                    risk_free: float = 0.0) -> Dict[str, Union[float, np.ndarray]]:
+    """Score one equity curve or a panel of them.
+
+    `positions` (shares held at each bar's close, same shape as `equity`) and `prices`
+    (per bar, shape (n_bars,) or same as `equity`) are needed for exposure and turnover;
+    without them both are NaN. `periods` is bars per year and `risk_free` an annual rate.
+
+    Returns fractions, not percentages: total_return, cagr, volatility (annualized),
+    sharpe and sortino (annualized), max_drawdown (<= 0), max_drawdown_duration (bars),
+    exposure (share of bars holding a position) and turnover (traded notional over mean
+    equity, per year). 1-D input gives floats, 2-D input gives one value per column.
+    """
+    equity = np.asarray(equity, dtype=float)
+    one = equity.ndim == 1
+    if one:
+        equity = equity[:, None]
+    n = len(equity)
+    width = equity.shape[1]
+    nan = np.full(width, np.nan)
+
+    if n < 2:
+        out = {name: nan.copy() for name in METRIC_NAMES}
+    else:
+        returns = equity[1:] / equity[:-1] - 1.0
+        excess = returns - risk_free / periods
+        mean = excess.mean(axis=0)
+        std = returns.std(axis=0, ddof=1)
+        downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=0))
+        growth = equity[-1] / equity[0]
+        dd, duration = drawdown(equity)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cagr = np.where(growth > 0, growth ** (periods / (n - 1)) - 1.0, -1.0)
+        out = {
+            "total_return": growth - 1.0,
+            "cagr": cagr,
+            "volatility": std * np.sqrt(periods),
+            "sharpe": _ratio(mean, std) * np.sqrt(periods),
+            "sortino": _ratio(mean, downside) * np.sqrt(periods),
+            "max_drawdown": dd.min(axis=0),
+            "max_drawdown_duration": duration.max(axis=0).astype(float),
+            "exposure": nan.copy(),
+            "turnover": nan.copy(),
+        }
+        if positions is not None:
+            held = np.asarray(positions, dtype=float).reshape(equity.shape)
+            out["exposure"] = np.count_nonzero(held, axis=0) / n
+            if prices is not None:
+                prices = np.asarray(prices, dtype=float)
+                prices = prices.reshape(n, -1) if prices.ndim == 1 else prices
+                traded = np.abs(np.diff(held, axis=0, prepend=0.0)) * prices
+                out["turnover"] = _ratio(traded.sum(axis=0), equity.mean(axis=0)) * periods / n
+
+    if one:
+        return {name: float(v[0]) for name, v in out.items()}
+    return out
+
+
+def metrics_frame(equity: pd.DataFrame, positions: Optional[pd.DataFrame] = None, prices=None,
+                  periods: Optional[float] = None, risk_free: float = 0.0) -> pd.DataFrame:
+    """compute_metrics over the columns of an equity panel; one row per column.
+
+    `periods` defaults to the bar frequency of the panel's index.
+    """
+    if periods is None:
+        periods = periods_per_year(equity.index)
+    held = None if positions is None else positions.reindex_like(equity).to_numpy(dtype=float)
+    if isinstance(prices, (pd.Series, pd.DataFrame)):
+        prices = prices.reindex(equity.index).to_numpy(dtype=float)
+    metrics = compute_metrics(equity.to_numpy(dtype=float), held, prices, periods, risk_free)
+    return pd.DataFrame(metrics, index=equity.columns)
@@ -0,0 +1,83 @@
+import re
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+class ProviderError(Exception):
+    """A provider failed to return data for a ticker."""
+
+
+class RateLimitError(ProviderError):
+    """The provider throttled the request; callers should back off and retry."""
+
+
+class DataProvider:
+    """Source of OHLCV history. DataFetcher only talks to providers through `history`.
+
+    Either `period` (yfinance-style, e.g. "6mo") or `start`/`end` is given; `start` is
+    inclusive. Implementations return an empty frame when there is no data.
+
+    `max_request_span` caps how much history one request may cover per interval (the
+    fetcher splits longer ranges into chunks); `max_history` is how far back an
+    interval is available at all.
+    """
+
+    max_request_span: Dict[str, pd.Timedelta] = {}
+    max_history: Dict[str, pd.Timedelta] = {}
+
+    def history(self, ticker: str, interval: str = "1d", period: Optional[str] = None,
+                start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceProvider(DataProvider):
+    # Yahoo serves 1m bars for the last 30 days in requests of at most 7 days, other
+    # sub-hourly intervals for 60 days, and hourly bars for 730 days.
+    max_request_span = {
+        "1m": pd.Timedelta(days=7),
+        **{i: pd.Timedelta(days=60) for i in ("2m", "5m", "15m", "30m", "90m")},
+        **{i: pd.Timedelta(days=730) for i in ("60m", "1h")},
+    }
+    max_history = {
+        "1m": pd.Timedelta(days=30),
+        **{i: pd.Timedelta(days=60) for i in ("2m", "5m", "15m", "30m", "90m")},
+        **{i: pd.Timedelta(days=730) for i in ("60m", "1h")},
+    }
+
+    def history(self, ticker: str, interval: str = "1d", period: Optional[str] = None,
+                start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        import yfinance as yf
+
+        yf_ticker = yf.Ticker(ticker)
+        if start is None and end is None:
+            return yf_ticker.history(period=period, interval=interval, auto_adjust=False)
+        return yf_ticker.history(start=start, end=end, interval=interval, auto_adjust=False)
+
+
+_PERIOD_UNITS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+_INTERVAL_UNITS = {"m": "min", "h": "h", "d": "D", "wk": "W"}
+
+
+def period_to_offset(period: str) -> Optional[pd.DateOffset]:
+    """'6mo' -> DateOffset(months=6); 'max' -> None (no lower bound)."""
+    if period in (None, "max"):
+        return None
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        raise ValueError(f"Unsupported period {period!r}")
+    return pd.DateOffset(**{_PERIOD_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def is_intraday(interval: str) -> bool:
+    return interval_to_timedelta(interval) < pd.Timedelta(days=1)
+
+
+def interval_to_timedelta(interval: str) -> pd.Timedelta:
+    """'1d' -> 1 day, '15m' -> 15 minutes. Monthly bars are approximated as 31 days."""
+    if interval.endswith("mo"):
+        return pd.Timedelta(days=31 * int(interval[:-2] or 1))
+    match = re.fullmatch(r"(\d+)(m|h|d|wk)", interval)
+    if not match:
+        raise ValueError(f"Unsupported interval {interval!r}")
+    return pd.Timedelta(int(match.group(1)), unit=_INTERVAL_UNITS[match.group(2)])
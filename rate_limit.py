@@ -0,0 +1,81 @@
+import random
+import threading
+import time
+from typing import Callable, Optional, Tuple, Type, TypeVar
+
+from config import LOG
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`.
+
+    `clock` and `sleep` default to time.monotonic/time.sleep; tests substitute fakes.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available. Sleeping happens outside the lock."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+def retry_with_backoff(fn: Callable[[], T], retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                       retry_on: Tuple[Type[BaseException], ...] = (Exception,), jitter: bool = True,
+                       description: str = "call",
+                       retry_if: Optional[Callable[[BaseException], bool]] = None,
+                       sleep: Callable[[float], None] = time.sleep) -> T:
+    """Call `fn`, retrying up to `retries` times with exponential backoff on `retry_on` errors.
+
+    `retry_if` narrows that further (e.g. to quota/5xx responses); errors it rejects
+    are re-raised immediately.
+
+    The delay doubles each attempt (capped at `max_delay`); with `jitter` it is drawn
+    uniformly from [delay/2, delay] so concurrent callers don't retry in lockstep.
+    The last exception is re-raised once retries are exhausted. `sleep` is injectable
+    for tests.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except retry_on as e:
+            if attempt >= retries or (retry_if is not None and not retry_if(e)):
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt)
+            if jitter:
+                delay = random.uniform(delay / 2, delay)
+            attempt += 1
+            LOG.warning(f"{description} failed ({e!r}), retry {attempt}/{retries} in {delay:.2f}s")
+            sleep(delay)
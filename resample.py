@@ -0,0 +1,71 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from providers import interval_to_timedelta
+
+# how each yfinance column aggregates into a coarser bar; other columns take the last value
+OHLCV_AGG = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum",
+    "Dividends": "sum",
+    "Stock Splits": "max",
+}
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Aggregate sorted OHLCV bars into `interval` bars (e.g. "5m", "15m", "1h", "1d").
+
+    Bins are fixed-width and aligned to midnight of the bars' own (exchange) time zone,
+    so daily bars follow the local calendar day. Bars are labelled by the bin start,
+    like `DataFrame.resample(...).agg(OHLCV_AGG)` with empty bins dropped, but the
+    aggregation is a single `ufunc.reduceat` per column over contiguous bin runs.
+    High/Low ignore NaN; Volume treats NaN as 0. Weekly/monthly bins are not supported.
+    """
+    step = interval_to_timedelta(interval)
+    if step > pd.Timedelta(days=1) or interval.endswith("mo"):
+        raise ValueError(f"resample_ohlcv supports intervals up to 1d, got {interval!r}")
+    if df.empty:
+        return df.copy()
+    index = pd.DatetimeIndex(df.index)
+    if not index.is_monotonic_increasing:
+        raise ValueError("resample_ohlcv needs bars sorted by time")
+
+    # work in the index's own resolution; converting a long index to ns is costly
+    unit = index.unit
+    step_ticks = step.value // pd.Timedelta(1, unit=unit).value
+    # wall-clock ticks, so bins line up with local midnight rather than UTC
+    local = (index.tz_localize(None) if index.tz is not None else index).asi8
+    bins = local - local % step_ticks
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    ends = np.r_[starts[1:], len(bins)] - 1
+
+    out = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        how = OHLCV_AGG.get(col, "last")
+        if how == "first":
+            out[col] = values[starts]
+        elif how == "last":
+            out[col] = values[ends]
+        elif how == "max":
+            out[col] = np.fmax.reduceat(np.asarray(values, dtype=float), starts)
+        elif how == "min":
+            out[col] = np.fmin.reduceat(np.asarray(values, dtype=float), starts)
+        else:
+            out[col] = np.add.reduceat(np.nan_to_num(np.asarray(values, dtype=float)), starts)
+
+    # bin start = first bar's instant minus its offset into the bin (exact across DST changes)
+    first = index[starts]
+    labels = first - pd.to_timedelta(local[starts] - bins[starts], unit=unit)
+    labels = pd.DatetimeIndex(labels, name=df.index.name)
+    return pd.DataFrame(out, index=labels)
+
+
+def resample_universe(frames: Dict[str, pd.DataFrame], interval: str) -> Dict[str, pd.DataFrame]:
+    return {t: resample_ohlcv(df, interval) for t, df in frames.items()}
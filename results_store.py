@@ -0,0 +1,293 @@
+"""Run-scoped results storage: one SQLite file per run instead of one CSV per artifact.
+
+Layout under `root` (default "results"):
+
+    runs/<run_id>.sqlite   tabular artifacts, one table per artifact (trades, equity_curve, ...)
+                           with a `ticker` column, plus a long-format `metrics` table
+    runs/index.sqlite      one row per run: run_id, started_at, finished_at, path
+
+Writes are queued and applied by a background thread in bulk (one transaction per
+batch of queued items), so callers never wait on disk. Reads open their own connection
+and can run while a run is still being written (WAL mode).
+"""
+import contextlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import LOG
+
+RUNS_DIR = "runs"
+INDEX_NAME = "index.sqlite"
+METRICS_TABLE = "metrics"
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _sql_values(df: pd.DataFrame) -> List[list]:
+    """Column-wise conversion to Python scalars sqlite3 accepts (timestamps as ISO text)."""
+    columns = []
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            values = [None if pd.isna(v) else v.isoformat() for v in s]
+        elif pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+            values = [None if pd.isna(v) else v for v in s.to_numpy(dtype=object).tolist()]
+        else:
+            values = [None if v is None or (isinstance(v, float) and np.isnan(v)) else str(v) for v in s.tolist()]
+        columns.append(values)
+    return [list(row) for row in zip(*columns)]
+
+
+def _flatten_metrics(metrics: dict) -> List[tuple]:
+    """{"cat": {"m": v}, "m2": v2} -> [("cat", "m", v), ("", "m2", v2)]."""
+    rows = []
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            rows.extend((str(key), str(k), v) for k, v in value.items())
+        else:
+            rows.append(("", str(key), value))
+    return rows
+
+
+def _metric_value(value):
+    """(REAL value or None, TEXT value or None)."""
+    if isinstance(value, (bool, np.bool_)):
+        return float(value), None
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        value = float(value)
+        return (None if np.isnan(value) else value), None
+    if value is None:
+        return None, None
+    return None, value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+class ResultsStore:
+    """Writer for one run, plus class-level queries across runs.
+
+    `write_frame(artifact, df, ticker)` appends rows to the artifact's table (new columns
+    are added as they appear); `write_metrics(artifact, dict, ticker)` appends key/value
+    rows to `metrics`. Call `flush()` to wait for queued writes and `close()` at the end
+    of the run.
+    """
+
+    def __init__(self, root: str = "results", run_id: Optional[str] = None):
+        self.root = root
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        os.makedirs(os.path.join(root, RUNS_DIR), exist_ok=True)
+        self.path = os.path.join(root, RUNS_DIR, f"{self.run_id}.sqlite")
+        self._columns: Dict[str, List[str]] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._register()
+        self._thread = threading.Thread(target=self._writer, name=f"results-{self.run_id}", daemon=True)
+        self._thread.start()
+
+    # ---- writing -------------------------------------------------------------------
+
+    def _register(self):
+        with contextlib.closing(sqlite3.connect(self.index_path(self.root))) as con, con:
+            con.execute("CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, started_at TEXT, "
+                        "finished_at TEXT, path TEXT)")
+            con.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, NULL, ?)",
+                        (self.run_id, datetime.now().isoformat(timespec="seconds"),
+                         os.path.relpath(self.path, self.root)))
+
+    def write_frame(self, artifact: str, df: pd.DataFrame, ticker: Optional[str] = None):
+        if df is None or df.empty:
+            return
+        self._put(("frame", artifact, ticker, df.copy()))
+
+    def write_metrics(self, artifact: str, metrics: dict, ticker: Optional[str] = None):
+        if metrics:
+            self._put(("metrics", artifact, ticker, _flatten_metrics(metrics)))
+
+    def _put(self, item):
+        if self._closed:
+            raise RuntimeError(f"Results store for run {self.run_id} is closed")
+        self._queue.put(item)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        # after close() the writer has drained the queue and exited
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(("flush", done, None, None))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        with contextlib.closing(sqlite3.connect(self.index_path(self.root))) as con, con:
+            con.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                        (datetime.now().isoformat(timespec="seconds"), self.run_id))
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _writer(self):
+        con = sqlite3.connect(self.path)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(f"CREATE TABLE IF NOT EXISTS {METRICS_TABLE} (artifact TEXT, ticker TEXT, category TEXT, "
+                    "metric TEXT, value REAL, text TEXT)")
+        con.execute(f"CREATE INDEX IF NOT EXISTS metrics_ticker ON {METRICS_TABLE} (ticker)")
+        con.execute(f"CREATE INDEX IF NOT EXISTS metrics_metric ON {METRICS_TABLE} (metric)")
+        con.commit()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                events = [item[1] for item in batch if item is not None and item[0] == "flush"]
+                try:
+                    with con:
+                        self._apply(con, [i for i in batch if i is not None and i[0] != "flush"])
+                except Exception:
+                    LOG.exception(f"Failed to write results batch for run {self.run_id}")
+                    # the batch was rolled back, so re-read table schemas next time
+                    self._columns.clear()
+                for event in events:
+                    event.set()
+                if any(item is None for item in batch):
+                    return
+        finally:
+            # back to a rollback journal so a finished run is a single self-contained file
+            con.execute("PRAGMA journal_mode=DELETE")
+            con.close()
+
+    def _apply(self, con: sqlite3.Connection, items: list):
+        frames: Dict[str, List[pd.DataFrame]] = {}
+        metric_rows = []
+        for kind, artifact, ticker, payload in items:
+            if kind == "frame":
+                df = payload.reset_index() if not isinstance(payload.index, pd.RangeIndex) else payload
+                if ticker is not None or "ticker" not in df:
+                    df = df.assign(ticker=ticker)
+                frames.setdefault(artifact, []).append(df)
+            else:
+                for category, metric, value in payload:
+                    real, text = _metric_value(value)
+                    metric_rows.append((artifact, ticker, category, metric, real, text))
+        for artifact, parts in frames.items():
+            df = pd.concat(parts, ignore_index=True)
+            self._ensure_table(con, artifact, df)
+            cols = ", ".join(_quote(c) for c in df.columns)
+            marks = ", ".join("?" for _ in df.columns)
+            con.executemany(f"INSERT INTO {_quote(artifact)} ({cols}) VALUES ({marks})", _sql_values(df))
+        if metric_rows:
+            con.executemany(f"INSERT INTO {METRICS_TABLE} VALUES (?, ?, ?, ?, ?, ?)", metric_rows)
+
+    def _ensure_table(self, con: sqlite3.Connection, artifact: str, df: pd.DataFrame):
+        known = self._columns.get(artifact)
+        if known is None:
+            con.execute(f"CREATE TABLE IF NOT EXISTS {_quote(artifact)} (ticker TEXT)")
+            con.execute(f"CREATE INDEX IF NOT EXISTS {_quote(artifact + '_ticker')} ON {_quote(artifact)} (ticker)")
+            known = [row[1] for row in con.execute(f"PRAGMA table_info({_quote(artifact)})")]
+            self._columns[artifact] = known
+        for col in df.columns:
+            if col not in known:
+                con.execute(f"ALTER TABLE {_quote(artifact)} ADD COLUMN {_quote(col)} {_sql_type(df[col].dtype)}")
+                known.append(col)
+
+    # ---- reading -------------------------------------------------------------------
+
+    @staticmethod
+    def index_path(root: str = "results") -> str:
+        return os.path.join(root, RUNS_DIR, INDEX_NAME)
+
+    @classmethod
+    def runs(cls, root: str = "results") -> pd.DataFrame:
+        path = cls.index_path(root)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=["run_id", "started_at", "finished_at", "path"])
+        with contextlib.closing(sqlite3.connect(path)) as con:
+            return pd.read_sql_query("SELECT * FROM runs ORDER BY started_at, run_id", con)
+
+    @classmethod
+    def load(cls, artifact: str, ticker: Optional[str] = None, runs: Optional[Iterable[str]] = None,
+             root: str = "results") -> pd.DataFrame:
+        """Rows of one artifact (optionally one ticker) across runs, with a `run_id` column.
+
+        Only the selected runs' files are opened, and the ticker filter uses the index.
+        """
+        table = METRICS_TABLE if artifact == METRICS_TABLE else artifact
+        frames = []
+        for run_id, path in cls._run_paths(root, runs):
+            with contextlib.closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as con:
+                exists = con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+                if not exists:
+                    continue
+                sql = f"SELECT * FROM {_quote(table)}"
+                params: tuple = ()
+                if ticker is not None:
+                    sql += " WHERE ticker = ?"
+                    params = (ticker,)
+                df = pd.read_sql_query(sql, con, params=params)
+            if not df.empty:
+                frames.append(df.assign(run_id=run_id))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    @classmethod
+    def metric(cls, name: str, ticker: Optional[str] = None, artifact: Optional[str] = None,
+               runs: Optional[Iterable[str]] = None, root: str = "results") -> pd.DataFrame:
+        """One metric (e.g. "Sharpe_Ratio") across runs: run_id, ticker, artifact, category, value, text."""
+        frames = []
+        for run_id, path in cls._run_paths(root, runs):
+            sql = f"SELECT artifact, ticker, category, metric, value, text FROM {METRICS_TABLE} WHERE metric = ?"
+            params = [name]
+            if ticker is not None:
+                sql += " AND ticker = ?"
+                params.append(ticker)
+            if artifact is not None:
+                sql += " AND artifact = ?"
+                params.append(artifact)
+            with contextlib.closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as con:
+                try:
+                    df = pd.read_sql_query(sql, con, params=params)
+                except pd.errors.DatabaseError:
+                    continue
+            if not df.empty:
+                frames.append(df.assign(run_id=run_id))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    @classmethod
+    def _run_paths(cls, root: str, runs: Optional[Iterable[str]]):
+        index = cls.runs(root)
+        if runs is not None:
+            wanted = set(runs)
+            index = index[index["run_id"].isin(wanted)]
+        for run_id, rel in zip(index["run_id"], index["path"]):
+            path = os.path.join(root, rel)
+            if os.path.exists(path):
+                yield run_id, path
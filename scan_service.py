@@ -0,0 +1,297 @@
+"""Resident scan service: `cli.py --daemon`.
+
+A one-shot `--scan` pays interpreter start-up, heavy imports, a store load and a
+SignalState reload on every invocation. ScanService pays them once and then stays up:
+per-ticker frames and SignalStates live in memory, and each scheduled tick downloads
+only the bars after each frame's tail, feeds just those bars through the streaming
+indicators and emits BUY/SELL events to the trade journal (and Google Sheets).
+
+A small HTTP server on localhost reports health and last-scan latency:
+
+    GET /health   200 "ok" / 503 "unhealthy" (last tick failed, or a tick is overdue)
+    GET /status   JSON: ticks, last scan time and latency, next run, signals, positions
+"""
+import json
+import os
+import re
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config import DAEMON_STATUS_PORT, LOG, MARKET_CLOSE, MARKET_OPEN, MARKET_TZ, SCAN_STATE_PATH
+from data_fetcher import DataFetcher
+from journal import BUY, SELL, TradeEvent, TradeJournal, drain
+from metrics import METRICS
+from providers import interval_to_timedelta
+from strategy import Trade, bar_time
+from streaming import SignalState, load_signal_states, save_signal_states
+
+if TYPE_CHECKING:
+    from gsheets_logger import GSheetsLogger
+
+# "close" scans this long after the closing bell, once the provider has the final daily bar
+CLOSE_DELAY = pd.Timedelta(minutes=10)
+# /health reports unhealthy once a scheduled tick is this late (e.g. stuck on a download)
+HEALTH_GRACE = pd.Timedelta(minutes=5)
+
+
+def _clock(hhmm: str) -> pd.Timedelta:
+    hours, minutes = hhmm.split(":")
+    return pd.Timedelta(hours=int(hours), minutes=int(minutes))
+
+
+class ScanSchedule:
+    """When the daemon scans, in the exchange's time zone.
+
+    Either once a day at `at` ("HH:MM"), or every `every` (e.g. 15 minutes). With
+    `session_only`, interval runs are anchored at the session open and limited to the
+    session (the last run is one interval after the close, to pick up the closing bar).
+    Weekends are skipped unless `weekdays_only` is False; exchange holidays are not.
+    """
+
+    def __init__(self, every: Optional[pd.Timedelta] = None, at: Optional[str] = None, tz: str = MARKET_TZ,
+                 session_only: bool = True, weekdays_only: bool = True,
+                 session: Tuple[str, str] = (MARKET_OPEN, MARKET_CLOSE)):
+        if (every is None) == (at is None):
+            raise ValueError("Give exactly one of `every` or `at`")
+        if every is not None and every <= pd.Timedelta(0):
+            raise ValueError("`every` must be positive")
+        self.every = every
+        self.at = _clock(at) if at is not None else None
+        self.tz = tz
+        self.session_only = session_only
+        self.weekdays_only = weekdays_only
+        self.open, self.close = _clock(session[0]), _clock(session[1])
+
+    @classmethod
+    def parse(cls, spec: str, **kwargs) -> "ScanSchedule":
+        """"close" (shortly after MARKET_CLOSE), a daily "HH:MM", or an interval such as "15m" or "1h"."""
+        if spec == "close":
+            at = _clock(MARKET_CLOSE) + CLOSE_DELAY
+            return cls(at=f"{at.components.hours:02d}:{at.components.minutes:02d}", **kwargs)
+        if re.fullmatch(r"\d{1,2}:\d\d", spec):
+            return cls(at=spec, **kwargs)
+        return cls(every=interval_to_timedelta(spec), **kwargs)
+
+    def _trading_day(self, day: pd.Timestamp) -> bool:
+        return not self.weekdays_only or day.weekday() < 5
+
+    def next_run(self, now: Optional[pd.Timestamp] = None) -> pd.Timestamp:
+        """First run strictly after `now` (default: the current time)."""
+        now = pd.Timestamp.now(tz=self.tz) if now is None else pd.Timestamp(now).tz_convert(self.tz)
+        day = now.normalize()
+        if self.at is not None:
+            while True:
+                run = day + self.at
+                if run > now and self._trading_day(day):
+                    return run
+                day = (day + pd.DateOffset(days=1)).normalize()
+        if not self.session_only:
+            return day + ((now - day) // self.every + 1) * self.every
+        while True:
+            if self._trading_day(day):
+                first = day + self.open + self.every
+                last = day + self.close + self.every
+                if now < first:
+                    return first
+                if now < last:
+                    return min(last, day + self.open + ((now - day - self.open) // self.every + 1) * self.every)
+            day = (day + pd.DateOffset(days=1)).normalize()
+
+
+class ScanService:
+    """Keeps frames and streaming signal state warm and scans on a ScanSchedule.
+
+    Each `tick()` refreshes the in-memory frames through `DataFetcher.fetch(frames=...)`
+    (tail download only) and catches every ticker's SignalState up bar by bar. A BUY
+    signal opens a position when flat and a SELL signal closes an open one; both are
+    recorded in a TradeJournal (logged off-thread) and, with `gsheet`, appended to the
+    trade log tab. Positions are tracked from the service's start. SignalStates are
+    persisted to `state_path` after every tick, so a restart resumes without reseeding.
+    """
+
+    def __init__(self, tickers: List[str], schedule: ScanSchedule, period: str = "6mo", interval: str = "1d",
+                 fetcher: Optional[DataFetcher] = None, gsheet: Optional["GSheetsLogger"] = None,
+                 state_path: Optional[str] = SCAN_STATE_PATH, status_port: Optional[int] = DAEMON_STATUS_PORT,
+                 strategy_params: Optional[dict] = None, max_workers: int = 8):
+        self.tickers = tickers
+        self.schedule = schedule
+        self.fetcher = fetcher or DataFetcher(tickers=tickers, period=period, interval=interval,
+                                              max_workers=max_workers)
+        self.gsheet = gsheet
+        if state_path and self.fetcher.interval != "1d":
+            # intraday states must not clobber the daily scan's
+            root, ext = os.path.splitext(state_path)
+            state_path = f"{root}@{self.fetcher.interval}{ext}"
+        self.state_path = state_path
+        self.status_port = status_port
+        self.strategy_params = strategy_params or {}
+        self.data: Dict[str, pd.DataFrame] = {}
+        self.states: Dict[str, SignalState] = load_signal_states(state_path) if state_path else {}
+        self.journal = TradeJournal()
+        self.open_trades: Dict[str, Trade] = {}
+        self.started_at = pd.Timestamp.now(tz=schedule.tz)
+        self.ticks = 0
+        self.last_scan_at: Optional[pd.Timestamp] = None
+        self.last_latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.next_run_at: Optional[pd.Timestamp] = None
+        self.last_events: List[TradeEvent] = []
+        # snapshots taken at the end of each tick for /status
+        self.last_signals: Dict[str, dict] = {}
+        self.last_positions: Dict[str, dict] = {}
+        self._lock = threading.Lock()  # status fields are read from the HTTP thread
+        self._stop = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _on_bar(self, t: str, sig: dict, fills: List[Tuple[TradeEvent, Trade]]):
+        ts, price = sig["timestamp"], sig["close"]
+        if sig["buy_signal"] and t not in self.open_trades:
+            trade = Trade(ticker=t, entry_date=bar_time(ts), entry_price=price)
+            self.open_trades[t] = trade
+            fills.append((TradeEvent(BUY, t, ts, price, trade.size, -1), trade))
+        elif sig["sell_signal"] and t in self.open_trades:
+            trade = self.open_trades.pop(t)
+            trade.exit_date = bar_time(ts)
+            trade.exit_price = price
+            fills.append((TradeEvent(SELL, t, ts, price, trade.size, -1), trade))
+
+    def tick(self) -> dict:
+        """One scan: refresh frames, feed new bars, emit events. Never raises."""
+        start = time.perf_counter()
+        fills: List[Tuple[TradeEvent, Trade]] = []
+        error = None
+        try:
+            with METRICS.timer("daemon.tick"):
+                self.data = self.fetcher.fetch(frames=self.data)
+                for t, df in self.data.items():
+                    state = self.states.get(t)
+                    if state is None:
+                        state = self.states[t] = SignalState(**self.strategy_params)
+                    state.catch_up(df, on_bar=lambda sig, t=t: self._on_bar(t, sig, fills))
+                for event, _ in fills:
+                    self.journal.record(*event)
+                self.journal.publish()
+                self.journal.clear()
+                if self.gsheet is not None and fills:
+                    # rows are built when queued, so later exits don't rewrite the entry row
+                    self.gsheet.write_trade_log([trade for _, trade in fills], tab_name="trade_log")
+                if self.state_path:
+                    save_signal_states(self.states, self.state_path)
+        except Exception as e:
+            LOG.exception("Scan tick failed")
+            error = repr(e)
+        latency = time.perf_counter() - start
+        METRICS.observe("daemon.tick_latency_s", latency)
+        signals = {t: {k: state.signal[k] for k in ("timestamp", "close", "rsi", "buy_signal", "sell_signal")}
+                   for t, state in self.states.items() if state.last_ts is not None}
+        positions = {t: {"entry_date": trade.entry_date, "entry_price": trade.entry_price}
+                     for t, trade in self.open_trades.items()}
+        with self._lock:
+            self.last_signals = signals
+            self.last_positions = positions
+            self.ticks += 1
+            self.last_scan_at = pd.Timestamp.now(tz=self.schedule.tz)
+            self.last_latency = latency
+            self.last_error = error
+            self.last_events = [event for event, _ in fills]
+        LOG.info(f"Scan tick {self.ticks}: {len(self.data)} tickers, {len(fills)} events in {latency:.3f}s")
+        return {"events": self.last_events, "latency_s": latency, "error": error}
+
+    def healthy(self) -> bool:
+        with self._lock:
+            if self.last_error is not None:
+                return False
+            overdue = self.next_run_at is not None and \
+                pd.Timestamp.now(tz=self.schedule.tz) - self.next_run_at > HEALTH_GRACE
+            return not overdue
+
+    def status(self) -> dict:
+        healthy = self.healthy()
+        with self._lock:
+            return {
+                "healthy": healthy,
+                "started_at": self.started_at,
+                "tickers": len(self.tickers),
+                "ticks": self.ticks,
+                "last_scan_at": self.last_scan_at,
+                "last_scan_latency_s": self.last_latency,
+                "next_run_at": self.next_run_at,
+                "last_error": self.last_error,
+                "fetch_failures": dict(self.fetcher.failures),
+                "last_events": [e._asdict() for e in self.last_events],
+                "open_positions": dict(self.last_positions),
+                "signals": dict(self.last_signals),
+            }
+
+    def start_status_server(self):
+        """Serve /health and /status on localhost from a daemon thread (no-op without a port)."""
+        if self.status_port is None or self._server is not None:
+            return
+        handler = type("StatusHandler", (_StatusHandler,), {"service": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.status_port), handler)
+        threading.Thread(target=self._server.serve_forever, name="scan-status", daemon=True).start()
+        LOG.info(f"Scan status on http://127.0.0.1:{self._server.server_address[1]}/status")
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self, run_now: bool = True):
+        """Scan now (unless `run_now` is False), then on every scheduled run until `stop()` or SIGTERM."""
+        self.start_status_server()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        try:
+            if run_now:
+                self.tick()
+            while not self._stop.is_set():
+                now = pd.Timestamp.now(tz=self.schedule.tz)
+                nxt = self.schedule.next_run(now)
+                with self._lock:
+                    self.next_run_at = nxt
+                LOG.info(f"Next scan at {nxt}")
+                if self._stop.wait((nxt - now).total_seconds()):
+                    break
+                self.tick()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.state_path and self.states:
+            save_signal_states(self.states, self.state_path)
+        drain()
+        LOG.info("Scan service stopped")
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    service: ScanService = None
+
+    def _reply(self, code: int, body: str, content_type: str = "text/plain"):
+        data = body.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            ok = self.service.healthy()
+            self._reply(200 if ok else 503, "ok" if ok else "unhealthy")
+        elif path in ("", "/status"):
+            self._reply(200, json.dumps(self.service.status(), default=str), "application/json")
+        else:
+            self._reply(404, "not found")
+
+    def log_message(self, format, *args):
+        # health probes would otherwise flood stderr
+        pass
@@ -0,0 +1,129 @@
+"""Latest-bar screener over a whole universe, reading only the look-back the signals need.
+
+Strategy's entry/exit conditions on the newest bar depend on RSI (a simple rolling mean
+of `rsi_window` price changes) and on the short/long SMAs of the newest and previous
+bar. Exactly `max(sma_long, sma_short) + 1` closes (at least `rsi_window + 1`) therefore
+reproduce the full-history signal for the last bar, so only that tail is read from the
+MarketDataStore, and the indicators for every ticker are computed in one PanelIndicators
+pass over a (look-back x tickers) array.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import LOG
+from data_fetcher import DataFetcher
+from indicators import PanelIndicators
+from metrics import METRICS, timed
+from strategy import STRATEGY_DEFAULTS, signal_columns
+
+COLUMNS = ["as_of", "close", "rsi", "sma_short", "sma_long", "signal", "score"]
+
+
+def lookback(rsi_window: int = 14, sma_short: int = 20, sma_long: int = 50, **_) -> int:
+    """Bars per ticker needed to reproduce the newest bar's buy/sell signal."""
+    return max(sma_short + 1, sma_long + 1, rsi_window + 1)
+
+
+def latest_signals(closes: np.ndarray, rsi_window: int = 14, rsi_buy: float = 30, rsi_sell: float = 70,
+                   sma_short: int = 20, sma_long: int = 50, **_) -> Dict[str, np.ndarray]:
+    """Indicator values and signal flags of the last row of a (bars x tickers) close array.
+
+    Each column holds one ticker's newest closes, oldest first; tickers with a shorter
+    history are left-padded with NaN.
+    """
+    ind = PanelIndicators.compute(closes, rsi_window=rsi_window, sma_windows=sorted({sma_short, sma_long}),
+                                  macd=None)
+    rsi, short, long_ = ind["rsi"][-2:], ind[f"sma{sma_short}"][-2:], ind[f"sma{sma_long}"][-2:]
+    flags = signal_columns(rsi, short, long_, rsi_buy, rsi_sell)
+    return {"rsi": rsi[-1], "sma_short": short[-1], "sma_long": long_[-1],
+            **{name: values[-1] for name, values in flags.items()}}
+
+
+class Screener:
+    """Ranks a universe's BUY/SELL signals on the newest bar without building full Strategies.
+
+    Bars come from the fetcher's store. Before reading them every ticker is brought up to
+    date through DataFetcher's incremental path (only bars after the cached tail are
+    downloaded, nothing while the newest bar is still current); `refresh=True` re-downloads
+    full histories and `update=False` reads the store as is, fetching only tickers that
+    are not cached yet. BUY hits rank ahead of
+    SELL hits; within a side, `score` is how far RSI is past its threshold (`rsi_buy - rsi`
+    for buys, `rsi - rsi_sell` for sells, negative for SMA cross-down sells), highest
+    first. Backtests run only when asked, and only for the hits.
+    """
+
+    def __init__(self, tickers: List[str], period: str = "6mo", interval: str = "1d",
+                 fetcher: Optional[DataFetcher] = None, strategy_params: Optional[dict] = None):
+        self.tickers = tickers
+        self.fetcher = fetcher or DataFetcher(tickers=tickers, period=period, interval=interval)
+        self.params = {**STRATEGY_DEFAULTS, **(strategy_params or {})}
+        self.lookback = lookback(**self.params)
+
+    def _fetcher_for(self, tickers: List[str]) -> DataFetcher:
+        f = self.fetcher
+        return DataFetcher(tickers, period=f.period, interval=f.interval, store=f.store, provider=f.provider,
+                           max_workers=f.max_workers, retries=f.retries, backoff=f.backoff)
+
+    @timed("screen.load")
+    def load_tails(self, refresh: bool = False, update: bool = True) -> Dict[str, pd.DataFrame]:
+        """{ticker: last `lookback` bars (Close only)} from the store, after updating it."""
+        store = self.fetcher.store
+        stale = self.tickers if refresh or update else [t for t in self.tickers
+                                                         if self.fetcher.store_key(t) not in store]
+        if stale:
+            self._fetcher_for(stale).fetch(force_refresh=refresh)
+        tails = {}
+        for t in self.tickers:
+            df = store.load(self.fetcher.store_key(t), columns=["Close"], tail=self.lookback)
+            if df is not None and len(df):
+                tails[t] = df
+        return tails
+
+    @timed("screen.signals")
+    def screen(self, tails: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Latest-bar indicators and signal for every ticker in `tails`, hits ranked first."""
+        n = self.lookback
+        closes = np.full((n, len(tails)), np.nan)
+        for j, df in enumerate(tails.values()):
+            values = df["Close"].to_numpy(dtype=float)[-n:]
+            closes[n - len(values):, j] = values
+        latest = latest_signals(closes, **self.params)
+        buy, sell = latest["buy_signal"], latest["sell_signal"] & ~latest["buy_signal"]
+        signal = np.where(buy, "BUY", np.where(sell, "SELL", None))
+        score = np.where(buy, self.params["rsi_buy"] - latest["rsi"],
+                         np.where(latest["rsi_sell"], latest["rsi"] - self.params["rsi_sell"],
+                                  latest["rsi"] - 100.0))
+        table = pd.DataFrame({
+            "as_of": [df.index[-1] for df in tails.values()],
+            "close": closes[-1],
+            "rsi": latest["rsi"],
+            "sma_short": latest["sma_short"],
+            "sma_long": latest["sma_long"],
+            "signal": signal,
+            "score": np.where(buy | sell, score, np.nan),
+        }, index=pd.Index(list(tails), name="ticker"), columns=COLUMNS)
+        side = table["signal"].map({"BUY": 0, "SELL": 1}).fillna(2)
+        order = np.lexsort((-table["score"].fillna(0).to_numpy(), side.to_numpy()))
+        return table.iloc[order]
+
+    def run(self, refresh: bool = False, backtest: bool = False, update: bool = True) -> dict:
+        """{"latest": every ticker's row, "hits": BUY/SELL rows in rank order, "backtest": {ticker: summary}}."""
+        with METRICS.timer("screen.total"):
+            tails = self.load_tails(refresh, update)
+            latest = self.screen(tails) if tails else pd.DataFrame(columns=COLUMNS)
+        hits = latest[latest["signal"].notna()]
+        LOG.info(f"Screened {len(tails)} tickers: {int((hits['signal'] == 'BUY').sum())} BUY, "
+                 f"{int((hits['signal'] == 'SELL').sum())} SELL")
+        result = {"latest": latest, "hits": hits, "backtest": {}}
+        if backtest and len(hits):
+            from orchestration import Pipeline
+
+            tickers = list(hits.index)
+            pipeline = Pipeline(tickers, period=self.fetcher.period, fetcher=self._fetcher_for(tickers),
+                                state_path=None)
+            results = pipeline.run(["backtest"])
+            result["backtest"] = {t: done["backtest"].get("summary", done["backtest"])
+                                  for t, done in results.items() if "backtest" in done}
+        return result
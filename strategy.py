@@ -1,17 +1,27 @@
 import pandas as pd
-import ta
 import numpy as np
 import datetime
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from indicators import Indicators
+from metrics import timed
 
-@dataclass
+# a calendar date for daily bars, the full timestamp for intraday bars
+TradeTime = Union[datetime.date, datetime.datetime]
+
+
+def bar_time(ts) -> TradeTime:
+    """Trade time for a bar: its date if the bar is stamped at midnight, else the full timestamp."""
+    ts = pd.Timestamp(ts)
+    return ts.date() if ts == ts.normalize() else ts
+
+
+@dataclass(slots=True)
 class Trade:
     ticker: str
-    entry_date: datetime.date
+    entry_date: TradeTime
     entry_price: float
-    exit_date: Optional[datetime.date] = None
+    exit_date: Optional[TradeTime] = None
     exit_price: Optional[float] = None
     size: float = 1.0
 
@@ -21,27 +31,97 @@ class Trade:
         return (self.exit_price - self.entry_price) * self.size
 
 
+STRATEGY_DEFAULTS = {
+    "rsi_window": 14,
+    "rsi_buy": 30,
+    "rsi_sell": 70,
+    "sma_short": 20,
+    "sma_long": 50,
+    "macd_fast": 12,
+    "macd_slow": 26,
+    "macd_signal": 9,
+}
+
+
+def signal_columns(rsi: np.ndarray, sma_short: np.ndarray, sma_long: np.ndarray,
+                   rsi_buy: float = 30, rsi_sell: float = 70) -> Dict[str, np.ndarray]:
+    """Boolean entry/exit columns from indicator arrays; shared by Strategy and the parameter sweep."""
+    prev_short = np.empty_like(sma_short)
+    prev_long = np.empty_like(sma_long)
+    prev_short[:1] = np.nan
+    prev_long[:1] = np.nan
+    prev_short[1:] = sma_short[:-1]
+    prev_long[1:] = sma_long[:-1]
+    cols = {}
+    cols["rsi_buy"] = rsi < rsi_buy
+    # sma cross: today sma_short > sma_long and yesterday sma_short <= sma_long
+    cols["sma_cross"] = (sma_short > sma_long) & (prev_short <= prev_long)
+    cols["buy_signal"] = cols["rsi_buy"] & cols["sma_cross"]
+    # Sell rule (example): RSI > rsi_sell or sma_short crosses below sma_long
+    cols["rsi_sell"] = rsi > rsi_sell
+    cols["sma_cross_down"] = (sma_short < sma_long) & (prev_short >= prev_long)
+    cols["sell_signal"] = cols["rsi_sell"] | cols["sma_cross_down"]
+    return cols
+
+
 class Strategy:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, rsi_window: int = 14, rsi_buy: float = 30, rsi_sell: float = 70,
+                 sma_short: int = 20, sma_long: int = 50, macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 indicators: Optional[Dict[str, pd.Series]] = None):
         self.df = df.copy()
+        self.rsi_window = rsi_window
+        self.rsi_buy = rsi_buy
+        self.rsi_sell = rsi_sell
+        self.sma_short = sma_short
+        self.sma_long = sma_long
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        # precomputed indicator columns (e.g. from PanelIndicators) skip the per-series work
+        self._indicators = indicators
         self._prepare()
 
+    @classmethod
+    def from_panel(cls, df: pd.DataFrame, panel: Dict[str, pd.DataFrame], ticker: str, **params) -> "Strategy":
+        """Build a Strategy for `ticker` from the wide frames returned by PanelIndicators.compute."""
+        indicators = {name: frame[ticker].reindex(df.index) for name, frame in panel.items()}
+        return cls(df, indicators=indicators, **params)
+
+    @property
+    def params(self) -> dict:
+        return {k: getattr(self, k) for k in STRATEGY_DEFAULTS}
+
+    @property
+    def sma_short_col(self) -> str:
+        return f"sma{self.sma_short}"
+
+    @property
+    def sma_long_col(self) -> str:
+        return f"sma{self.sma_long}"
+
+    @timed("strategy.indicators")
     def _prepare(self):
         self.df["close"] = self.df["Close"]
-        self.df["rsi"] = Indicators.rsi(self.df["close"]) 
-        self.df["sma20"] = Indicators.sma(self.df["close"], 20)
-        self.df["sma50"] = Indicators.sma(self.df["close"], 50)
-        macd_df = Indicators.macd(self.df["close"]) 
+        if self._indicators is not None:
+            for name in ("rsi", self.sma_short_col, self.sma_long_col, "macd", "signal", "hist"):
+                self.df[name] = self._indicators[name]
+            return
+        self.df["rsi"] = Indicators.rsi(self.df["close"], self.rsi_window)
+        self.df[self.sma_short_col] = Indicators.sma(self.df["close"], self.sma_short)
+        self.df[self.sma_long_col] = Indicators.sma(self.df["close"], self.sma_long)
+        macd_df = Indicators.macd(self.df["close"], self.macd_fast, self.macd_slow, self.macd_signal)
         self.df = pd.concat([self.df, macd_df], axis=1)
 
+    @timed("strategy.signals")
     def generate_signals(self) -> pd.DataFrame:
         df = self.df.copy()
-        df["rsi_buy"] = df["rsi"] < 30
-        # sma cross: today sma20 > sma50 and yesterday sma20 <= sma50
-        df["sma_cross"] = (df["sma20"] > df["sma50"]) & (df["sma20"].shift(1) <= df["sma50"].shift(1))
-        df["buy_signal"] = df["rsi_buy"] & df["sma_cross"]
-        # Sell rule (example): RSI > 70 or sma20 crosses below sma50
-        df["rsi_sell"] = df["rsi"] > 70
-        df["sma_cross_down"] = (df["sma20"] < df["sma50"]) & (df["sma20"].shift(1) >= df["sma50"].shift(1))
-        df["sell_signal"] = df["rsi_sell"] | df["sma_cross_down"]
+        cols = signal_columns(
+            df["rsi"].to_numpy(dtype=float),
+            df[self.sma_short_col].to_numpy(dtype=float),
+            df[self.sma_long_col].to_numpy(dtype=float),
+            self.rsi_buy,
+            self.rsi_sell,
+        )
+        for name, values in cols.items():
+            df[name] = values
         return df
@@ -0,0 +1,358 @@
+"""Incremental (O(1) per bar) counterparts of the batch indicators in `indicators`.
+
+Each indicator can be seeded from history, updated one bar at a time, and
+round-tripped through a plain dict (`to_dict` / `indicator_from_dict`) so the
+state can be persisted between runs. Values match the batch versions up to
+floating-point rounding.
+
+Missing bars (NaN closes) are skipped, as in PanelIndicators: `update(nan)` leaves the
+state unchanged, so the values match the batch versions run on the series with its
+missing bars dropped.
+"""
+import json
+import math
+import os
+from collections import deque
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from indicators import Indicators
+from strategy import signal_columns
+
+NAN = float("nan")
+
+
+def _valid(values: Sequence[float]) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    return values[~np.isnan(values)]
+
+
+class StreamingSMA:
+    """Matches Indicators.sma (rolling mean, min_periods=1)."""
+
+    # re-add the window from scratch this often so the running sum cannot drift
+    RESUM_EVERY = 1000
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self.total = 0.0
+        self._since_resum = 0
+
+    def seed(self, values: Sequence[float]) -> "StreamingSMA":
+        self.values = deque(_valid(values)[-self.window:].tolist(), maxlen=self.window)
+        self.total = math.fsum(self.values)
+        self._since_resum = 0
+        return self
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(float(x))
+        self.total += x
+        self._since_resum += 1
+        if self._since_resum >= self.RESUM_EVERY:
+            self.total = math.fsum(self.values)
+            self._since_resum = 0
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.total / len(self.values) if self.values else NAN
+
+    def to_dict(self) -> dict:
+        return {"type": "sma", "window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "StreamingSMA":
+        return cls(d["window"]).seed(d["values"])
+
+
+class StreamingEMA:
+    """Matches Indicators.ema (ewm(span=window, adjust=False))."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self.value: float = NAN
+
+    def seed(self, values: Sequence[float]) -> "StreamingEMA":
+        values = _valid(values)
+        if len(values):
+            self.value = float(Indicators.ema(pd.Series(values), self.window).iloc[-1])
+        return self
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+        if math.isnan(self.value):
+            self.value = float(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"type": "ema", "window": self.window, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "StreamingEMA":
+        ema = cls(d["window"])
+        ema.value = d["value"]
+        return ema
+
+
+class StreamingRSI:
+    """Matches Indicators.rsi (simple rolling means of gains/losses, min_periods=window)."""
+
+    RESUM_EVERY = 1000
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.prev: float = NAN
+        self.ups: deque = deque(maxlen=window)
+        self.downs: deque = deque(maxlen=window)
+        self.up_total = 0.0
+        self.down_total = 0.0
+        self._since_resum = 0
+
+    def _resum(self):
+        self.up_total = math.fsum(self.ups)
+        self.down_total = math.fsum(self.downs)
+        self._since_resum = 0
+
+    def seed(self, values: Sequence[float]) -> "StreamingRSI":
+        tail = _valid(values)[-(self.window + 1):]
+        self.prev = float(tail[-1]) if len(tail) else NAN
+        delta = np.diff(tail)
+        self.ups = deque(np.clip(delta, 0, None).tolist(), maxlen=self.window)
+        self.downs = deque((-np.clip(delta, None, 0)).tolist(), maxlen=self.window)
+        self._resum()
+        return self
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+        if not math.isnan(self.prev):
+            delta = x - self.prev
+            up = delta if delta > 0 else 0.0
+            down = -delta if delta < 0 else 0.0
+            if len(self.ups) == self.window:
+                self.up_total -= self.ups[0]
+                self.down_total -= self.downs[0]
+            self.ups.append(up)
+            self.downs.append(down)
+            self.up_total += up
+            self.down_total += down
+            self._since_resum += 1
+            if self._since_resum >= self.RESUM_EVERY:
+                self._resum()
+        self.prev = float(x)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.ups) < self.window:
+            return NAN
+        up = self.up_total / self.window
+        down = self.down_total / self.window
+        if down <= 0:
+            return 100.0 if up > 0 else NAN
+        return 100 - (100 / (1 + up / down))
+
+    def to_dict(self) -> dict:
+        return {"type": "rsi", "window": self.window, "prev": self.prev,
+                "ups": list(self.ups), "downs": list(self.downs)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "StreamingRSI":
+        rsi = cls(d["window"])
+        rsi.prev = d["prev"]
+        rsi.ups.extend(d["ups"])
+        rsi.downs.extend(d["downs"])
+        rsi._resum()
+        return rsi
+
+
+class StreamingMACD:
+    """Matches Indicators.macd; `update` returns (macd, signal, hist)."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def seed(self, values: Sequence[float]) -> "StreamingMACD":
+        values = _valid(values)
+        if len(values):
+            batch = Indicators.macd(pd.Series(values), self.fast.window, self.slow.window,
+                                    self.signal.window).iloc[-1]
+            self.fast.seed(values)
+            self.slow.seed(values)
+            self.signal.value = float(batch["signal"])
+        return self
+
+    def update(self, x: float):
+        if math.isnan(x):
+            return self.value
+        line = self.fast.update(x) - self.slow.update(x)
+        sig = self.signal.update(line)
+        return line, sig, line - sig
+
+    @property
+    def value(self):
+        line = self.fast.value - self.slow.value
+        return line, self.signal.value, line - self.signal.value
+
+    def to_dict(self) -> dict:
+        return {"type": "macd", "fast": self.fast.to_dict(), "slow": self.slow.to_dict(),
+                "signal": self.signal.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "StreamingMACD":
+        macd = cls()
+        macd.fast = StreamingEMA.from_dict(d["fast"])
+        macd.slow = StreamingEMA.from_dict(d["slow"])
+        macd.signal = StreamingEMA.from_dict(d["signal"])
+        return macd
+
+
+_TYPES = {"sma": StreamingSMA, "ema": StreamingEMA, "rsi": StreamingRSI, "macd": StreamingMACD}
+
+
+def indicator_from_dict(d: dict):
+    return _TYPES[d["type"]].from_dict(d)
+
+
+class SignalState:
+    """Per-ticker streaming version of Strategy: indicators plus the latest buy/sell flags.
+
+    The flags come from strategy.signal_columns, evaluated on the previous and current
+    bar, so the rules stay defined in one place.
+    """
+
+    def __init__(self, rsi_window: int = 14, rsi_buy: float = 30, rsi_sell: float = 70,
+                 sma_short: int = 20, sma_long: int = 50, macd_fast: int = 12, macd_slow: int = 26,
+                 macd_signal: int = 9):
+        self.rsi_buy = rsi_buy
+        self.rsi_sell = rsi_sell
+        self.rsi = StreamingRSI(rsi_window)
+        self.sma_short = StreamingSMA(sma_short)
+        self.sma_long = StreamingSMA(sma_long)
+        self.macd = StreamingMACD(macd_fast, macd_slow, macd_signal)
+        self.last_ts: Optional[pd.Timestamp] = None
+        self.last_close: float = NAN
+        # (rsi, sma_short, sma_long) of the previous and current bar
+        self._prev = (NAN, NAN, NAN)
+        self._curr = (NAN, NAN, NAN)
+
+    def seed(self, closes: pd.Series) -> "SignalState":
+        closes = closes.dropna()
+        values = closes.to_numpy(dtype=float)
+        if len(values) == 0:
+            return self
+        # seed on all but the last bar, then update so both prev and curr are populated
+        for ind in (self.rsi, self.sma_short, self.sma_long, self.macd):
+            ind.seed(values[:-1])
+        self._curr = (self.rsi.value, self.sma_short.value, self.sma_long.value)
+        self.update(closes.index[-1], values[-1])
+        return self
+
+    def update(self, ts: pd.Timestamp, close: float):
+        """Feed one bar; read `signal` afterwards for the flags. A NaN close is skipped."""
+        if math.isnan(close):
+            return
+        self.rsi.update(close)
+        self.sma_short.update(close)
+        self.sma_long.update(close)
+        self.macd.update(close)
+        self._prev = self._curr
+        self._curr = (self.rsi.value, self.sma_short.value, self.sma_long.value)
+        self.last_ts = pd.Timestamp(ts)
+        self.last_close = float(close)
+
+    @property
+    def signal(self) -> dict:
+        arrays = [np.array([p, c], dtype=float) for p, c in zip(self._prev, self._curr)]
+        cols = signal_columns(*arrays, self.rsi_buy, self.rsi_sell)
+        macd, sig, hist = self.macd.value
+        return {
+            "timestamp": self.last_ts,
+            "close": self.last_close,
+            "rsi": self._curr[0],
+            "sma_short": self._curr[1],
+            "sma_long": self._curr[2],
+            "macd": macd,
+            "signal": sig,
+            "hist": hist,
+            "buy_signal": bool(cols["buy_signal"][1]),
+            "sell_signal": bool(cols["sell_signal"][1]),
+        }
+
+    def catch_up(self, df: pd.DataFrame, on_bar: Optional[Callable[[dict], None]] = None) -> dict:
+        """Bring the state up to the last bar of `df`, reseeding if it cannot be continued.
+
+        Only bars after `last_ts` are fed in. If `last_ts` is missing from `df`, or its
+        close differs (the history was re-adjusted), the state is rebuilt from `df`.
+        `on_bar` is called with the signal of every bar fed in (after a reseed, only
+        the last bar's).
+        """
+        closes = df["Close"]
+        if self.last_ts is not None and self.last_ts in closes.index:
+            if math.isclose(float(closes.loc[self.last_ts]), self.last_close, rel_tol=1e-9):
+                pos = closes.index.get_loc(self.last_ts) + 1
+                for ts, close in zip(closes.index[pos:], closes.to_numpy(dtype=float)[pos:]):
+                    self.update(ts, close)
+                    if on_bar is not None:
+                        on_bar(self.signal)
+                return self.signal
+        self.seed(closes)
+        if on_bar is not None and self.last_ts is not None:
+            on_bar(self.signal)
+        return self.signal
+
+    def to_dict(self) -> dict:
+        return {
+            "rsi_buy": self.rsi_buy,
+            "rsi_sell": self.rsi_sell,
+            "rsi": self.rsi.to_dict(),
+            "sma_short": self.sma_short.to_dict(),
+            "sma_long": self.sma_long.to_dict(),
+            "macd": self.macd.to_dict(),
+            "last_ts": self.last_ts.isoformat() if self.last_ts is not None else None,
+            "last_close": self.last_close,
+            "prev": list(self._prev),
+            "curr": list(self._curr),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "SignalState":
+        state = cls(rsi_buy=d["rsi_buy"], rsi_sell=d["rsi_sell"])
+        state.rsi = StreamingRSI.from_dict(d["rsi"])
+        state.sma_short = StreamingSMA.from_dict(d["sma_short"])
+        state.sma_long = StreamingSMA.from_dict(d["sma_long"])
+        state.macd = StreamingMACD.from_dict(d["macd"])
+        state.last_ts = pd.Timestamp(d["last_ts"]) if d["last_ts"] else None
+        state.last_close = d["last_close"]
+        state._prev = tuple(d["prev"])
+        state._curr = tuple(d["curr"])
+        return state
+
+
+def load_signal_states(path: str) -> Dict[str, SignalState]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        raw = json.load(f)
+    return {t: SignalState.from_dict(d) for t, d in raw.items()}
+
+
+def save_signal_states(states: Dict[str, SignalState], path: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        # NaN is valid for json.load on the way back in
+        json.dump({t: s.to_dict() for t, s in states.items()}, f)
+    os.replace(tmp, path)
@@ -0,0 +1,139 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester
+from journal import NULL_JOURNAL
+from performance import compute_metrics, periods_per_year
+from config import LOG
+from indicators import Indicators
+from strategy import signal_columns
+
+# Only parameters that feed buy/sell signals are swept; the MACD settings on
+# Strategy affect ML features, not the backtest, so sweeping them would just
+# repeat identical runs.
+DEFAULT_GRID: Dict[str, List] = {
+    "rsi_window": [14],
+    "rsi_buy": [30],
+    "rsi_sell": [70],
+    "sma_short": [20],
+    "sma_long": [50],
+}
+
+
+def param_grid(grid: Optional[Dict[str, Iterable]] = None) -> List[dict]:
+    """Expand a grid into parameter combos, dropping ones that can never trade sensibly."""
+    full = dict(DEFAULT_GRID)
+    full.update({k: list(v) for k, v in (grid or {}).items()})
+    unknown = set(full) - set(DEFAULT_GRID)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    keys = list(full)
+    combos = []
+    for values in itertools.product(*(full[k] for k in keys)):
+        combo = dict(zip(keys, values))
+        if combo["sma_short"] >= combo["sma_long"] or combo["rsi_buy"] >= combo["rsi_sell"]:
+            continue
+        combos.append(combo)
+    return combos
+
+
+def _sweep_ticker(ticker: str, df: pd.DataFrame, combos: List[dict], starting_cash: float) -> List[dict]:
+    """Backtest every combo for one ticker, computing each distinct indicator series once."""
+    close_s = df["Close"]
+    sma_cache: Dict[int, np.ndarray] = {}
+    rsi_cache: Dict[int, np.ndarray] = {}
+    rows = []
+    equity: List[np.ndarray] = []
+    shares: List[np.ndarray] = []
+    for combo in combos:
+        rw, fast, slow = combo["rsi_window"], combo["sma_short"], combo["sma_long"]
+        if rw not in rsi_cache:
+            rsi_cache[rw] = Indicators.rsi(close_s, rw).to_numpy(dtype=float)
+        for w in (fast, slow):
+            if w not in sma_cache:
+                sma_cache[w] = Indicators.sma(close_s, w).to_numpy(dtype=float)
+        cols = signal_columns(rsi_cache[rw], sma_cache[fast], sma_cache[slow], combo["rsi_buy"], combo["rsi_sell"])
+        signals = pd.DataFrame(
+            {"Close": close_s, "buy_signal": cols["buy_signal"], "sell_signal": cols["sell_signal"]},
+            index=df.index,
+        )
+        bt = Backtester(signals_df=signals, ticker=ticker, starting_cash=starting_cash, journal=NULL_JOURNAL)
+        _, final_value = bt.run()
+        rows.append({"ticker": ticker, **combo, **bt.summary(), "final_value": final_value})
+        equity.append(bt.equity)
+        shares.append(bt.shares)
+    if rows and len(df):
+        # score every combo's equity curve in one pass over the (bars x combos) panel
+        metrics = compute_metrics(np.column_stack(equity), np.column_stack(shares), close_s.to_numpy(dtype=float),
+                                  periods_per_year(df.index))
+        for i, row in enumerate(rows):
+            row.update({name: float(values[i]) for name, values in metrics.items()})
+    return rows
+
+
+def _init_worker():
+    # per-trade BUY/SELL lines from thousands of backtests would swamp the output
+    LOG.setLevel("WARNING")
+
+
+def run_sweep(data: Union[List[str], Dict[str, pd.DataFrame]], grid: Optional[Dict[str, Iterable]] = None,
+              period: str = "6mo", starting_cash: float = 100000.0, max_workers: Optional[int] = None,
+              rank_by: str = "total_pnl") -> pd.DataFrame:
+    """Backtest every parameter combo on every ticker and return the results ranked by `rank_by`.
+
+    `data` is either a ticker list (fetched through DataFetcher) or an already loaded
+    {ticker: OHLCV frame} dict. Tickers are fanned out over a process pool; pass
+    max_workers=1 to run in-process.
+    """
+    if not isinstance(data, dict):
+        from data_fetcher import DataFetcher
+        data = DataFetcher(tickers=list(data), period=period).fetch()
+    combos = param_grid(grid)
+    LOG.info(f"Sweeping {len(combos)} parameter combos over {len(data)} tickers")
+
+    rows: List[dict] = []
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(data) == 1:
+        level = LOG.level
+        _init_worker()
+        try:
+            for t, df in data.items():
+                rows.extend(_sweep_ticker(t, df, combos, starting_cash))
+        finally:
+            LOG.setLevel(level)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(data)), initializer=_init_worker) as pool:
+            futures = {t: pool.submit(_sweep_ticker, t, df, combos, starting_cash) for t, df in data.items()}
+            for t, fut in futures.items():
+                try:
+                    rows.extend(fut.result())
+                except Exception:
+                    LOG.exception(f"Sweep failed for {t}")
+
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results
+    return results.sort_values(rank_by, ascending=False, kind="stable").reset_index(drop=True)
+
+
+def rank_params(results: pd.DataFrame, rank_by: str = "total_pnl") -> pd.DataFrame:
+    """Aggregate per-ticker sweep rows into one ranked row per parameter combo."""
+    keys = [k for k in DEFAULT_GRID if k in results]
+    agg = results.groupby(keys).agg(
+        tickers=("ticker", "nunique"),
+        trades=("trades", "sum"),
+        wins=("wins", "sum"),
+        losses=("losses", "sum"),
+        total_pnl=("total_pnl", "sum"),
+        mean_final_value=("final_value", "mean"),
+        mean_sharpe=("sharpe", "mean"),
+        worst_drawdown=("max_drawdown", "min"),
+    )
+    closed = agg["wins"] + agg["losses"]
+    agg["win_ratio"] = (agg["wins"] / closed).where(closed > 0)
+    return agg.sort_values(rank_by, ascending=False).reset_index()
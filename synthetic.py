@@ -0,0 +1,130 @@
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from providers import DataProvider, ProviderError, RateLimitError, period_to_offset
+
+
+def synthetic_ohlcv(ticker: str, n_bars: int = 252, start: str = "2020-01-01", freq: str = "B",
+                    seed: Optional[int] = None, start_price: float = 100.0, volatility: float = 0.02,
+                    tz: Optional[str] = None) -> pd.DataFrame:
+    """Deterministic geometric-random-walk OHLCV frame in the shape yfinance returns.
+
+    The default seed is derived from the ticker name so the same ticker always
+    produces the same bars, independent of which other tickers are generated.
+    """
+    if seed is None:
+        seed = zlib.crc32(ticker.encode())
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start=start, periods=n_bars, freq=freq, tz=tz)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, n_bars)))
+    open_ = np.empty(n_bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1] * np.exp(rng.normal(0.0, volatility / 4, n_bars - 1))
+    spread = np.abs(rng.normal(0.0, volatility / 2, n_bars))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.integers(100_000, 5_000_000, n_bars).astype(float)
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": volume,
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        },
+        index=pd.DatetimeIndex(index, name="Date"),
+    )
+
+
+def synthetic_universe(n_tickers: int, n_bars: int = 252, start: str = "2020-01-01", freq: str = "B",
+                       prefix: str = "SYN") -> Dict[str, pd.DataFrame]:
+    tickers: List[str] = [f"{prefix}{i:04d}" for i in range(n_tickers)]
+    return {t: synthetic_ohlcv(t, n_bars=n_bars, start=start, freq=freq) for t in tickers}
+
+
+def _align(ts, index: pd.DatetimeIndex) -> pd.Timestamp:
+    """Make `ts` comparable with `index` (naive indexes are treated as UTC)."""
+    ts = pd.Timestamp(ts)
+    if index.tz is None and ts.tz is not None:
+        return ts.tz_convert("UTC").tz_localize(None)
+    if index.tz is not None and ts.tz is None:
+        return ts.tz_localize(index.tz)
+    return ts
+
+
+class SyntheticProvider(DataProvider):
+    """Offline DataProvider serving slices of pre-built frames.
+
+    Frames can be appended to (or replaced) between calls to simulate new bars or a
+    back-adjustment; `requests` and `rows_served` count what a real provider would
+    have downloaded. To stand in for a remote API it can also inject per-request
+    `latency` (seconds), random failures with probability `error_rate`, and throttling:
+    more than `max_rps` requests within a second raise RateLimitError. With
+    `max_request_span` a request whose result would cover more than the interval's span
+    raises ProviderError, like an intraday-capped API.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], latency: float = 0.0, error_rate: float = 0.0,
+                 max_rps: Optional[float] = None, seed: int = 0,
+                 max_request_span: Optional[Dict[str, pd.Timedelta]] = None):
+        self.frames = frames
+        if max_request_span is not None:
+            self.max_request_span = max_request_span
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.requests = 0
+        self.rows_served = 0
+        self.errors = 0
+        self.throttled = 0
+        self._rng = np.random.default_rng(seed)
+        self._recent: List[float] = []
+        self._lock = threading.Lock()
+
+    def _admit(self, ticker: str):
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            if self.max_rps is not None:
+                self._recent = [t for t in self._recent if now - t < 1.0]
+                if len(self._recent) >= self.max_rps:
+                    self.throttled += 1
+                    raise RateLimitError(f"Too many requests ({ticker})")
+                self._recent.append(now)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ProviderError(f"Injected failure for {ticker}")
+
+    def history(self, ticker: str, interval: str = "1d", period: Optional[str] = None,
+                start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        self._admit(ticker)
+        df = self.frames.get(ticker)
+        if df is None or df.empty:
+            return pd.DataFrame()
+        if start is None and end is None:
+            offset = period_to_offset(period)
+            if offset is not None:
+                df = df[df.index > df.index[-1] - offset]
+        else:
+            if start is not None:
+                df = df[df.index >= _align(start, df.index)]
+            if end is not None:
+                df = df[df.index < _align(end, df.index)]
+        span = self.max_request_span.get(interval)
+        if span is not None and len(df) and df.index[-1] - df.index[0] > span:
+            raise ProviderError(f"{interval} request for {ticker} spans more than {span}")
+        with self._lock:
+            self.rows_served += len(df)
+        return df.copy()
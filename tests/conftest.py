@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+# modules live at the repo root and import each other absolutely (`from config import LOG`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def _workdir(tmp_path, monkeypatch):
+    """Run every test in a scratch directory; DATA_DIR and the default stores are relative paths."""
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import Backtester
+from journal import TradeJournal
+from strategy import Strategy
+from synthetic import synthetic_universe
+
+UNIVERSE = synthetic_universe(6, n_bars=400)
+
+
+def _history(ticker: str) -> pd.DataFrame:
+    return UNIVERSE[ticker].copy()
+
+
+def _random_signals(ticker: str, seed: int, p: float = 0.05) -> pd.DataFrame:
+    """Strategy signals rarely fire on a random walk, so also test dense random entries/exits."""
+    df = _history(ticker)
+    rng = np.random.default_rng(seed)
+    df["buy_signal"] = rng.random(len(df)) < p
+    df["sell_signal"] = rng.random(len(df)) < p
+    return df
+
+
+def _run(signals: pd.DataFrame, ticker: str, mode: str):
+    bt = Backtester(signals, ticker, mode=mode, journal=TradeJournal(log=False))
+    trade_log, cash = bt.run()
+    return bt, trade_log, cash
+
+
+CASES = [(t, lambda t=t: Strategy(_history(t)).generate_signals()) for t in list(UNIVERSE)[:3]]
+CASES += [(t, lambda t=t, i=i: _random_signals(t, i)) for i, t in enumerate(UNIVERSE)]
+
+
+@pytest.mark.parametrize("ticker,make_signals", CASES)
+def test_vectorized_matches_loop(ticker, make_signals):
+    signals = make_signals()
+    loop, loop_log, loop_cash = _run(signals, ticker, "loop")
+    vec, vec_log, vec_cash = _run(signals, ticker, "vectorized")
+
+    pd.testing.assert_frame_equal(vec_log.to_frame(), loop_log.to_frame())
+    assert vec.trades == loop.trades
+    assert vec_cash == pytest.approx(loop_cash, rel=1e-12)
+    np.testing.assert_allclose(vec.equity, loop.equity, rtol=1e-12)
+    np.testing.assert_allclose(vec.drawdown, loop.drawdown, rtol=1e-12, atol=1e-15)
+    np.testing.assert_array_equal(vec.shares, loop.shares)
+    assert vec.summary() == loop.summary()
+    assert vec.journal.events == loop.journal.events
+
+
+def test_open_position_is_closed_on_last_bar():
+    signals = _history("SYN0000")
+    signals["buy_signal"] = False
+    signals["sell_signal"] = False
+    signals.iloc[10, signals.columns.get_loc("buy_signal")] = True
+    for mode in ("loop", "vectorized"):
+        bt, trade_log, _ = _run(signals, "SYN0000", mode)
+        assert len(trade_log) == 1
+        trade = bt.trades[0]
+        assert trade.entry_date == signals.index[10].date()
+        assert trade.exit_date == signals.index[-1].date()
+        assert trade.exit_price == signals["Close"].iloc[-1]
+        assert [e.kind for e in bt.journal.events] == ["BUY", "CLOSE"]
+        assert [e.bar for e in bt.journal.events] == [10, len(signals) - 1]
@@ -0,0 +1,32 @@
+import os
+
+from benchmark import bench_quality, bench_stages, compare_to_baseline
+
+
+def test_stage_benchmark_reports_every_stage():
+    report = bench_stages(n_tickers=3, n_bars=150, ml_tickers=2, memory=True, workdir=".")
+    assert set(report["stages"]) == {"fetch_cached", "indicators", "panel_indicators", "signals", "backtest",
+                                     "ml_train", "results_logging"}
+    for stats in report["stages"].values():
+        assert stats["seconds"] >= 0 and stats["peak_mb"] >= 0
+    assert report["total_s"] == sum(s["seconds"] for s in report["stages"].values())
+    assert (report["tickers"], report["bars"], report["ml_tickers"]) == (3, 150, 2)
+    # the scratch directory is cleaned up
+    assert not [name for name in os.listdir(".") if name.startswith("tmp")]
+
+
+def test_quality_benchmark_scores_clean_synthetic_data():
+    report = bench_quality(n_tickers=4, n_bars=100, workdir=".")
+    assert report["min_score"] == 100.0
+    assert {"cold", "cached", "one_changed"} <= set(report)
+
+
+def test_compare_to_baseline_flags_only_real_slowdowns():
+    baseline = {"stages": {"fetch": {"seconds": 1.0}, "tiny": {"seconds": 0.001}}, "migrate_s": 2.0,
+                "levels": [{"workers": 1, "seconds": 0.5}], "tickers": 500}
+    report = {"stages": {"fetch": {"seconds": 1.2}, "tiny": {"seconds": 0.01}}, "migrate_s": 3.0,
+              "levels": [{"workers": 1, "seconds": 0.9}], "tickers": 500}
+    regressions = compare_to_baseline(report, baseline, tolerance=0.25)
+    # fetch is within tolerance, tiny is under min_seconds, and counts are not timings
+    assert [r.split(":")[0] for r in regressions] == ["migrate_s", "levels.0.seconds"]
+    assert compare_to_baseline(baseline, baseline) == []
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_fetcher import DataFetcher
+from market_store import MarketDataStore
+from providers import ProviderError
+from synthetic import SyntheticProvider, synthetic_ohlcv
+
+TICKER = "SYN0000"
+
+
+@pytest.fixture
+def full():
+    return synthetic_ohlcv(TICKER, n_bars=300)
+
+
+def _fetcher(provider, store, **kwargs) -> DataFetcher:
+    return DataFetcher([TICKER], period="max", store=store, provider=provider, backoff=0.0, **kwargs)
+
+
+def test_incremental_fetch_downloads_only_the_tail(full):
+    store = MarketDataStore("store")
+    provider = SyntheticProvider({TICKER: full.iloc[:250].copy()})
+    first = _fetcher(provider, store).fetch()[TICKER]
+    assert len(first) == 250
+
+    provider.frames[TICKER] = full.copy()
+    fetcher = _fetcher(provider, store)
+    df = fetcher.fetch()[TICKER]
+
+    # the last two cached bars are re-requested to detect back-adjustment
+    assert fetcher.rows_downloaded[TICKER] == 50 + 2
+    np.testing.assert_allclose(df["Close"].to_numpy(), full["Close"].to_numpy())
+    assert df.index.equals(full.index)
+    assert len(store.load(TICKER)) == 300
+
+
+def test_no_new_bars_keeps_the_cache(full):
+    store = MarketDataStore("store")
+    provider = SyntheticProvider({TICKER: full})
+    _fetcher(provider, store).fetch()
+    fetcher = _fetcher(provider, store)
+    df = fetcher.fetch()[TICKER]
+    assert fetcher.rows_downloaded[TICKER] == 2
+    assert len(df) == len(full)
+
+
+def test_split_triggers_full_refresh(full):
+    store = MarketDataStore("store")
+    provider = SyntheticProvider({TICKER: full.iloc[:250].copy()})
+    _fetcher(provider, store).fetch()
+
+    # a 2:1 split on a new bar, with the history back-adjusted by the provider
+    adjusted = full.copy()
+    prices = ["Open", "High", "Low", "Close", "Adj Close"]
+    adjusted.loc[adjusted.index[:260], prices] /= 2
+    adjusted.loc[adjusted.index[260], "Stock Splits"] = 2.0
+    provider.frames[TICKER] = adjusted
+    fetcher = _fetcher(provider, store)
+    df = fetcher.fetch()[TICKER]
+
+    assert fetcher.rows_downloaded[TICKER] == 52 + 300  # overlap check, then the whole history
+    np.testing.assert_allclose(df["Close"].to_numpy(), adjusted["Close"].to_numpy())
+
+
+def test_back_adjusted_history_triggers_full_refresh(full):
+    store = MarketDataStore("store")
+    provider = SyntheticProvider({TICKER: full.iloc[:250].copy()})
+    _fetcher(provider, store).fetch()
+
+    # dividend adjustment of the whole history, without a split/dividend on a new bar
+    adjusted = full.copy()
+    adjusted[["Close", "Adj Close"]] *= 0.99
+    provider.frames[TICKER] = adjusted
+    df = _fetcher(provider, store).fetch()[TICKER]
+    np.testing.assert_allclose(df["Close"].to_numpy(), adjusted["Close"].to_numpy())
+
+
+class FlakyProvider(SyntheticProvider):
+    """Fails the first `failures` requests, then serves normally."""
+
+    def __init__(self, frames, failures: int):
+        super().__init__(frames)
+        self.failures = failures
+
+    def history(self, ticker, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ProviderError("transient")
+        return super().history(ticker, **kwargs)
+
+
+def test_retries_transient_errors(full):
+    provider = FlakyProvider({TICKER: full}, failures=2)
+    fetcher = _fetcher(provider, MarketDataStore("store"), retries=3)
+    result = fetcher.fetch()
+    assert len(result[TICKER]) == len(full)
+    assert fetcher.failures == {}
+    assert provider.requests == 1  # the failing attempts never reached the base provider
+
+
+def test_gives_up_after_retries(full):
+    provider = FlakyProvider({TICKER: full}, failures=10)
+    fetcher = _fetcher(provider, MarketDataStore("store"), retries=2)
+    assert fetcher.fetch() == {}
+    assert TICKER in fetcher.failures
+    assert provider.failures == 10 - 3  # one attempt plus two retries
+
+
+SPAN = {"5m": pd.Timedelta(days=1)}
+
+
+@pytest.fixture
+def intraday():
+    # five days of round-the-clock 5m bars ending at the last completed bar
+    end = pd.Timestamp.now(tz="UTC").floor("5min") - pd.Timedelta(minutes=5)
+    n_bars = 5 * 288
+    return synthetic_ohlcv(TICKER, n_bars=n_bars, start=end - (n_bars - 1) * pd.Timedelta(minutes=5), freq="5min",
+                           tz="UTC")
+
+
+def _intraday_fetcher(provider, store) -> DataFetcher:
+    return DataFetcher([TICKER], period="3d", interval="5m", store=store, provider=provider, backoff=0.0)
+
+
+def test_long_intraday_range_is_downloaded_in_chunks(intraday):
+    provider = SyntheticProvider({TICKER: intraday}, max_request_span=SPAN)
+    fetcher = _intraday_fetcher(provider, MarketDataStore("store"))
+    df = fetcher.fetch()[TICKER]
+
+    # three one-day chunks, none of which the provider rejected for spanning too much
+    assert provider.requests == 3 and fetcher.failures == {}
+    assert df.index[0] - (df.index[-1] - pd.Timedelta(days=3)) <= pd.Timedelta(minutes=10)
+    expected = intraday.loc[df.index[0]:]
+    assert df.index.is_unique and df.index.equals(expected.index)
+    np.testing.assert_allclose(df["Close"].to_numpy(), expected["Close"].to_numpy())
+    assert MarketDataStore("store").load(f"{TICKER}@5m").index.equals(df.index)
+
+
+class SeamProvider(SyntheticProvider):
+    """Treats `end` as inclusive, so consecutive chunks share their boundary bar."""
+
+    def history(self, ticker, interval="1d", period=None, start=None, end=None):
+        if end is not None:
+            end = end + pd.Timedelta(minutes=5)
+        return super().history(ticker, interval=interval, period=period, start=start, end=end)
+
+
+def test_bars_at_chunk_seams_are_not_duplicated(intraday):
+    # a grid-aligned range, so every seam falls exactly on a bar
+    aligned = intraday.loc[intraday.index[-1] - pd.Timedelta(days=3):]
+    provider = SeamProvider({TICKER: aligned}, max_request_span={"5m": pd.Timedelta(days=1, minutes=5)})
+    fetcher = _intraday_fetcher(provider, MarketDataStore("store"))
+    df = fetcher.fetch()[TICKER]
+
+    assert fetcher.rows_downloaded[TICKER] > len(df)  # the seams were served twice
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    expected = aligned.loc[df.index[0]:]
+    assert df.index.equals(expected.index)
+    np.testing.assert_allclose(df["Close"].to_numpy(), expected["Close"].to_numpy())
+
+
+def test_intraday_delta_is_chunked_too(intraday):
+    store = MarketDataStore("store")
+    provider = SyntheticProvider({TICKER: intraday.iloc[:-2 * 288].copy()}, max_request_span=SPAN)
+    first = _intraday_fetcher(provider, store).fetch()[TICKER]
+
+    provider.frames[TICKER] = intraday
+    provider.requests = 0
+    fetcher = _intraday_fetcher(provider, store)
+    df = fetcher.fetch()[TICKER]
+
+    # two days of new bars plus the overlap: three chunks of at most a day
+    assert provider.requests == 3
+    assert fetcher.rows_downloaded[TICKER] == 2 * 288 + 2
+    expected = intraday.loc[first.index[0]:]
+    assert df.index.equals(expected.index)
+    np.testing.assert_allclose(df["Close"].to_numpy(), expected["Close"].to_numpy())
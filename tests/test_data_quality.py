@@ -0,0 +1,107 @@
+import pandas as pd
+import pytest
+
+from data_quality import DataQualityValidator
+from synthetic import synthetic_universe
+
+PRICES = ["Open", "High", "Low", "Close", "Adj Close"]
+
+
+@pytest.fixture
+def universe():
+    return synthetic_universe(3, n_bars=300)
+
+
+def _counts(report: dict) -> dict:
+    return {k: v for k, v in report["counts"].items() if v}
+
+
+def _validator(**kwargs) -> DataQualityValidator:
+    kwargs.setdefault("cache_path", None)
+    return DataQualityValidator(**kwargs)
+
+
+def test_clean_data_scores_100(universe):
+    reports = _validator().validate_panel(universe)
+    assert all(r["quality_score"] == 100.0 and not r["issues"] for r in reports.values())
+
+
+def test_price_jump(universe):
+    df = universe["SYN0000"].copy()
+    df.loc[df.index[100:], PRICES] *= 1.4
+    report = _validator().validate(df)
+    assert _counts(report) == {"price_jumps": 1}
+    assert str(df.index[100]) in report["issues"][0]
+    assert report["quality_score"] < 100
+
+
+def test_unadjusted_split_and_recorded_split(universe):
+    df = universe["SYN0000"].copy()
+    df.loc[df.index[:100], PRICES] *= 2  # a 2:1 split at bar 100 that was not back-adjusted
+    assert _counts(_validator().validate(df)) == {"unadjusted_splits": 1}
+    df.loc[df.index[100], "Stock Splits"] = 2.0
+    # with the split on record it is an ordinary (if large) jump
+    assert _counts(_validator().validate(df)) == {"price_jumps": 1}
+
+
+def test_stale_prices_flag_the_whole_run(universe):
+    df = universe["SYN0000"].copy()
+    for col in ["Open", "High", "Low", "Close"]:
+        df.loc[df.index[50:57], col] = df["Close"].iloc[50]
+    assert _counts(_validator().validate(df)) == {"stale_prices": 7}
+    assert _counts(_validator(stale_run=8).validate(df)) == {}
+
+
+def test_missing_sessions_ignore_exchange_holidays(universe):
+    frames = {t: df.drop(df.index[[20]]) for t, df in universe.items()}  # nobody traded that day
+    frames["SYN0001"] = frames["SYN0001"].drop(frames["SYN0001"].index[10:13])
+    reports = _validator().validate_panel(frames)
+    assert _counts(reports["SYN0001"]) == {"missing_sessions": 3}
+    assert _counts(reports["SYN0000"]) == {}
+    # an explicit calendar counts the holiday too
+    calendar = universe["SYN0000"].index
+    reports = _validator(calendar=calendar).validate_panel(frames)
+    assert _counts(reports["SYN0000"]) == {"missing_sessions": 1}
+    assert _counts(reports["SYN0001"]) == {"missing_sessions": 4}
+
+
+def test_reports_are_cached_by_data_hash(universe, monkeypatch):
+    validator = DataQualityValidator(cache_path="quality.json")
+    first = validator.validate_panel(universe)
+
+    checked = []
+    original = DataQualityValidator._check
+
+    def spy(self, frames, sessions):
+        checked.append(sorted(frames))
+        return original(self, frames, sessions)
+
+    monkeypatch.setattr(DataQualityValidator, "_check", spy)
+    # a new validator reads the cache from disk
+    again = DataQualityValidator(cache_path="quality.json")
+    assert again.validate_panel(universe) == first
+    assert checked == []
+
+    revised = dict(universe)
+    revised["SYN0002"] = universe["SYN0002"].copy()
+    revised["SYN0002"].iloc[-1, revised["SYN0002"].columns.get_loc("Volume")] = 0
+    reports = again.validate_panel(revised)
+    assert checked == [["SYN0002"]]
+    assert _counts(reports["SYN0002"]) == {"zero_volume": 1}
+
+
+def test_cache_follows_the_sessions_other_tickers_define(universe):
+    validator = DataQualityValidator(cache_path="quality.json")
+    gappy = universe["SYN0000"].drop(universe["SYN0000"].index[10])
+    # alone, nobody traded that day, so it is not a missing session
+    assert _counts(validator.validate_panel({"SYN0000": gappy})["SYN0000"]) == {}
+    # next to a ticker that traded it, the same unchanged frame now misses a session
+    reports = validator.validate_panel({"SYN0000": gappy, "SYN0001": universe["SYN0001"]})
+    assert _counts(reports["SYN0000"]) == {"missing_sessions": 1}
+    # a ticker that only trades outside SYN0000's span does not invalidate its report
+    later = universe["SYN0002"].copy()
+    later.index = later.index + pd.offsets.BDay(1000)
+    validator.validate_panel({"SYN0000": gappy, "SYN0001": universe["SYN0001"]})
+    key_before = validator._cache["SYN0000"]["key"]
+    validator.validate_panel({"SYN0000": gappy, "SYN0001": universe["SYN0001"], "SYN0002": later})
+    assert validator._cache["SYN0000"]["key"] == key_before
@@ -0,0 +1,99 @@
+import os
+
+import pandas as pd
+import pytest
+
+from feature_cache import FeatureCache, frame_hash
+from ml_model import MLModel
+from orchestration import run_ml_for_ticker
+from strategy import Strategy
+from synthetic import synthetic_ohlcv
+
+
+@pytest.fixture
+def features():
+    df = synthetic_ohlcv("AAA", n_bars=300, tz="America/New_York")
+    X, y = MLModel(Strategy(df).generate_signals()).prepare_features()
+    return df, X, y
+
+
+def _touch(cache: FeatureCache, key: str, age: int):
+    # file mtimes order the LRU; set them explicitly rather than relying on timer resolution
+    t = 1_000_000_000 + age
+    os.utime(os.path.join(cache.cache_dir, f"{key}.npz"), (t, t))
+
+
+def test_hit_round_trips_and_miss_is_counted(features):
+    df, X, y = features
+    cache = FeatureCache("features")
+    key = cache.key(df, {"rsi": 14})
+    assert cache.get(key) is None and cache.misses == 1
+
+    cache.put(key, X, y)
+    X2, y2 = FeatureCache("features").get(key)
+    # the index name is not stored
+    pd.testing.assert_frame_equal(X2, X, check_freq=False, check_index_type=False, check_names=False)
+    pd.testing.assert_series_equal(y2, y, check_freq=False, check_index_type=False, check_dtype=False,
+                                   check_index=False)
+    assert X2.index.equals(X.index)
+    assert str(X2.index.tz) == "America/New_York"
+    cache.get(key)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_follows_data_and_params(features):
+    df, _, _ = features
+    key = FeatureCache.key(df, {"rsi": 14})
+    assert FeatureCache.key(df.copy(), {"rsi": 14}) == key
+    assert FeatureCache.key(df, {"rsi": 21}) != key
+    revised = df.copy()
+    revised.iloc[-1, revised.columns.get_loc("Close")] += 0.01
+    assert FeatureCache.key(revised, {"rsi": 14}) != key
+    assert frame_hash(df.iloc[:-1]) != frame_hash(df)
+    # the same instants in another zone are the same data
+    assert frame_hash(df.tz_convert("UTC")) == frame_hash(df)
+
+
+def test_least_recently_used_entries_are_evicted(features):
+    _, X, y = features
+    cache = FeatureCache("features", max_entries=2)
+    cache.put("a", X, y)
+    _touch(cache, "a", 0)
+    cache.put("b", X, y)
+    _touch(cache, "b", 1)
+    cache.get("a")  # now the most recently used
+    cache.put("c", X, y)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    size = os.path.getsize(os.path.join("features", "a.npz"))
+    small = FeatureCache("small", max_bytes=int(size * 1.5))
+    small.put("a", X, y)
+    _touch(small, "a", 0)
+    small.put("b", X, y)
+    assert sorted(os.listdir("small")) == ["b.npz"]
+
+
+def test_tagged_put_replaces_the_tickers_previous_entry(features):
+    _, X, y = features
+    cache = FeatureCache("features")
+    cache.put("old", X, y, tag="AAA")
+    cache.put("other", X, y, tag="BBB")
+    cache.put("new", X, y, tag="AAA")
+    assert cache.get("old") is None
+    assert cache.get("new") is not None and cache.get("other") is not None
+
+
+def test_ml_stage_reuses_cached_features(features, monkeypatch):
+    df, _, _ = features
+    cache = FeatureCache("features")
+    first = run_ml_for_ticker(df, cache=cache, ticker="AAA")
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("features were rebuilt on a cache hit")
+
+    monkeypatch.setattr(Strategy, "generate_signals", fail)
+    again = run_ml_for_ticker(df, cache=cache, ticker="AAA")
+    assert cache.hits == 1
+    assert first["success"] and again["accuracy"] == first["accuracy"]
@@ -0,0 +1,170 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from fake_sheets import FakeSheetsClient
+from gsheets_logger import TRADE_HEADER, GSheetsLogger
+from strategy import Trade
+
+SHEET = "prototype"
+
+
+class GatedClient(FakeSheetsClient):
+    """FakeSheetsClient whose calls block while `gate` is clear, to hold the writer mid-batch."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.waiting = threading.Event()
+
+    def _call(self, name: str):
+        if not self.gate.is_set():
+            self.waiting.set()
+            self.gate.wait(5)
+        super()._call(name)
+
+
+def _trades(n: int, ticker: str = "AAA"):
+    start = datetime(2024, 1, 1)
+    return [Trade(ticker=ticker, entry_date=start + timedelta(days=i), entry_price=100.0 + i,
+                  exit_date=start + timedelta(days=i + 1), exit_price=101.0 + i, size=10)
+            for i in range(n)]
+
+
+def _logger(client, **kw) -> GSheetsLogger:
+    kw.setdefault("backoff", 0.0)
+    return GSheetsLogger(spreadsheet_name=SHEET, client=client, **kw)
+
+
+def _tab(client, name: str):
+    return client.spreadsheets[SHEET].worksheets[name].cells
+
+
+def _count(client, call: str) -> int:
+    return client.calls.count(call)
+
+
+def test_queued_writes_are_coalesced_into_one_append_per_tab():
+    client = GatedClient()
+    logger = _logger(client)
+    client.gate.clear()
+    logger.write_trade_log(_trades(1))
+    # the writer is now blocked on the first batch; everything below queues up behind it
+    assert client.waiting.wait(5)
+    for i in range(9):
+        logger.write_trade_log(_trades(1, ticker=f"T{i}"))
+    logger.write_trade_log(_trades(3), tab_name="other")
+    client.gate.set()
+    assert logger.flush(5)
+
+    assert _count(client, "append_rows:trade_log") == 2
+    assert _count(client, "append_rows:other") == 1
+    rows = _tab(client, "trade_log")
+    assert rows[0] == TRADE_HEADER
+    assert [r[0] for r in rows[1:]] == ["AAA"] + [f"T{i}" for i in range(9)]
+    assert len(_tab(client, "other")) == 1 + 3
+    logger.close()
+
+
+def test_large_batches_are_split_at_max_batch_rows():
+    client = FakeSheetsClient()
+    logger = _logger(client, max_batch_rows=5)
+    logger.write_trade_log(_trades(12))
+    assert logger.flush(5)
+    assert _count(client, "append_rows:trade_log") == 3
+    # the header goes out once, with the first chunk
+    rows = _tab(client, "trade_log")
+    assert rows.count(TRADE_HEADER) == 1 and len(rows) == 1 + 12
+    logger.close()
+
+
+def test_only_the_newest_summary_is_written_and_leftovers_are_cleared():
+    client = GatedClient()
+    logger = _logger(client)
+    logger.write_summary({"a": 1, "b": 2, "c": 3})
+    assert logger.flush(5)
+    client.gate.clear()
+    logger.write_trade_log(_trades(1))
+    assert client.waiting.wait(5)
+    logger.write_summary({"x": 9, "y": 8, "z": 7})
+    logger.write_summary({"total": 42})
+    client.gate.set()
+    assert logger.flush(5)
+
+    assert _count(client, "update:summary") == 2
+    assert _tab(client, "summary") == [["total", 42]]
+    logger.close()
+
+
+def test_existing_tab_with_header_gets_no_second_header():
+    client = FakeSheetsClient()
+    ws = client.create(SHEET).add_worksheet("trade_log")
+    ws.append_rows([TRADE_HEADER])
+    logger = _logger(client)
+    logger.write_trade_log(_trades(2))
+    logger.close()
+    assert _tab(client, "trade_log").count(TRADE_HEADER) == 1
+    assert len(_tab(client, "trade_log")) == 3
+
+
+def test_close_flushes_queued_writes_and_rejects_new_ones():
+    client = FakeSheetsClient(latency=0.005)
+    logger = _logger(client)
+    for i in range(5):
+        logger.write_trade_log(_trades(2, ticker=f"T{i}"))
+    logger.write_summary({"trades": 10})
+    logger.close(5)
+
+    assert not logger._thread.is_alive()
+    assert len(_tab(client, "trade_log")) == 1 + 10
+    assert _tab(client, "summary") == [["trades", 10]]
+    with pytest.raises(RuntimeError):
+        logger.write_trade_log(_trades(1))
+    # the writer thread is gone, so a flush must not wait for it
+    assert logger.flush(timeout=None)
+    logger.close()  # closing twice is a no-op
+
+
+def test_quota_errors_are_retried():
+    client = FakeSheetsClient()
+    logger = _logger(client, retries=3)
+    client.fail_next(2, code=429)
+    logger.write_trade_log(_trades(2))
+    assert logger.flush(5)
+    assert logger.failed == []
+    assert len(_tab(client, "trade_log")) == 3
+    logger.close()
+
+
+def test_batches_that_keep_failing_are_kept_and_the_writer_carries_on():
+    client = FakeSheetsClient()
+    logger = _logger(client, retries=2)
+    client.fail_next(3, code=503)  # the initial attempt and both retries
+    logger.write_trade_log(_trades(2))
+    assert logger.flush(5)
+    assert len(logger.failed) == 1
+    tab, rows, error = logger.failed[0]
+    assert tab == "trade_log" and len(rows) == 2 and "503" in error
+
+    logger.write_trade_log(_trades(1))
+    assert logger.flush(5)
+    rows = _tab(client, "trade_log")
+    assert rows[0] == TRADE_HEADER and len(rows) == 2
+    logger.close()
+
+
+def test_non_transient_errors_are_not_retried():
+    client = FakeSheetsClient()
+    logger = _logger(client, retries=5)
+    logger.write_trade_log(_trades(1))
+    assert logger.flush(5)
+    client.fail_next(1, code=403)
+    logger.write_trade_log(_trades(1))
+    assert logger.flush(5)
+
+    assert _count(client, "append_rows:trade_log") == 2
+    assert len(logger.failed) == 1 and "403" in logger.failed[0][2]
+    assert len(_tab(client, "trade_log")) == 2
+    logger.close()
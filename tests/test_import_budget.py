@@ -0,0 +1,15 @@
+import pytest
+
+from benchmark import IMPORT_BUDGETS, import_profile
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_entry_modules_leave_heavy_packages_to_their_modes(module):
+    """Entry modules don't import heavy packages at load time.
+
+    Wall-clock budgets depend on the machine, so they are checked by `benchmark.py imports`.
+    """
+    _, forbidden = IMPORT_BUDGETS[module]
+    loaded = {name.split(".")[0] for name in import_profile(module)["modules"]}
+    eager = sorted(loaded.intersection(forbidden))
+    assert not eager, f"{module} imports {', '.join(eager)} at load time"
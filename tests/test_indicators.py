@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import Indicators, PanelIndicators
+from synthetic import synthetic_universe
+
+
+@pytest.fixture(scope="module")
+def closes() -> pd.DataFrame:
+    """Wide close panel with different listing dates, a delisting and scattered missing bars."""
+    universe = synthetic_universe(6, n_bars=400)
+    panel = pd.DataFrame({t: df["Close"] for t, df in universe.items()})
+    rng = np.random.default_rng(1)
+    panel.iloc[:120, 1] = np.nan  # listed later
+    panel.iloc[:399, 2] = np.nan  # a single bar
+    panel.iloc[300:, 3] = np.nan  # delisted
+    for col in (0, 4):
+        panel.iloc[rng.choice(400, size=40, replace=False), col] = np.nan
+    panel.iloc[:, 5] = np.nan  # never traded
+    return panel
+
+
+def _per_series(closes: pd.DataFrame, fn) -> pd.DataFrame:
+    """`fn` on each ticker's own valid bars, NaN where the ticker has no bar."""
+    return pd.DataFrame({t: fn(closes[t].dropna()).reindex(closes.index) for t in closes})
+
+
+def _assert_frame_close(actual: pd.DataFrame, expected: pd.DataFrame):
+    assert actual.index.equals(expected.index) and list(actual.columns) == list(expected.columns)
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("window", [1, 20, 50])
+def test_sma_matches_per_series(closes, window):
+    _assert_frame_close(PanelIndicators.sma(closes, window), _per_series(closes, lambda s: Indicators.sma(s, window)))
+
+
+@pytest.mark.parametrize("window", [12, 26])
+def test_ema_matches_per_series(closes, window):
+    _assert_frame_close(PanelIndicators.ema(closes, window), _per_series(closes, lambda s: Indicators.ema(s, window)))
+
+
+def test_rsi_matches_per_series(closes):
+    _assert_frame_close(PanelIndicators.rsi(closes, 14), _per_series(closes, lambda s: Indicators.rsi(s, 14)))
+
+
+def test_compute_matches_per_series(closes):
+    result = PanelIndicators.compute(closes, rsi_window=14, sma_windows=(20, 50), macd=(12, 26, 9))
+    assert set(result) == {"rsi", "sma20", "sma50", "macd", "signal", "hist"}
+    for name in ("macd", "signal", "hist"):
+        _assert_frame_close(result[name], _per_series(closes, lambda s: Indicators.macd(s)[name]))
+    _assert_frame_close(result["sma50"], _per_series(closes, lambda s: Indicators.sma(s, 50)))
+    _assert_frame_close(result["rsi"], _per_series(closes, lambda s: Indicators.rsi(s, 14)))
+
+
+def test_arrays_and_single_series_are_accepted(closes):
+    values = closes.to_numpy()
+    np.testing.assert_allclose(PanelIndicators.ema(values, 26), PanelIndicators.ema(closes, 26).to_numpy(),
+                               equal_nan=True)
+    series = closes.iloc[:, 0].dropna()
+    np.testing.assert_allclose(PanelIndicators.ema(series.to_numpy(), 26), Indicators.ema(series, 26), rtol=1e-12)
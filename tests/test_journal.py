@@ -0,0 +1,80 @@
+import datetime as dt
+import logging
+
+import pandas as pd
+import pytest
+
+import journal
+from config import LOG
+from journal import BUY, CLOSE, NULL_JOURNAL, SELL, TradeJournal
+from strategy import Trade
+
+DAYS = pd.date_range("2024-01-01", periods=6, freq="D")
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def captured():
+    handler = ListHandler()
+    level = LOG.level
+    LOG.addHandler(handler)
+    LOG.setLevel(logging.INFO)
+    yield handler.messages
+    journal.drain()
+    LOG.removeHandler(handler)
+    LOG.setLevel(level)
+
+
+def _record_tape(j: TradeJournal):
+    j.record(BUY, "AAA", DAYS[0], 10.0, 5, bar=0)
+    j.record(BUY, "BBB", DAYS[1], 20.0, 1, bar=1)
+    j.record(SELL, "AAA", DAYS[2], 12.0, 5, bar=2)
+    j.record(SELL, "BBB", DAYS[3], 18.0, 1, bar=3)  # closes BBB
+    j.record(SELL, "AAA", DAYS[4], 13.0, 5, bar=4)  # no open AAA position: ignored
+    j.record(BUY, "AAA", DAYS[5], 11.0, 2, bar=5)  # still open at the end
+
+
+def test_trades_pair_entries_with_the_next_exit():
+    j = TradeJournal(log=False)
+    _record_tape(j)
+    assert j.trades() == [
+        Trade("AAA", dt.date(2024, 1, 1), 10.0, dt.date(2024, 1, 3), 12.0, size=5),
+        Trade("BBB", dt.date(2024, 1, 2), 20.0, dt.date(2024, 1, 4), 18.0, size=1),
+    ]
+    assert j.trades("BBB") == j.trades()[1:]
+    frame = j.to_frame()
+    assert list(frame.columns) == ["kind", "ticker", "timestamp", "price", "size", "bar"]
+    assert frame["bar"].tolist() == [0, 1, 2, 3, 4, 5]
+    j.clear()
+    assert j.events == [] and j.trades() == []
+
+
+def test_publish_logs_each_signal_once_off_thread(captured):
+    j = TradeJournal()
+    j.record(BUY, "AAA", DAYS[0], 10.0, 5, bar=0)
+    j.publish()
+    j.record(CLOSE, "AAA", DAYS[1], 11.0, 5, bar=1)
+    j.publish()
+    j.publish()  # nothing new
+    journal.drain()
+    assert captured == ["AAA BUY on 2024-01-01 @ 10.0 size=5"]
+
+
+def test_disabled_and_silent_journals(captured):
+    NULL_JOURNAL.record(BUY, "AAA", DAYS[0], 10.0, 1)
+    NULL_JOURNAL.publish()
+    assert NULL_JOURNAL.events == []
+
+    silent = TradeJournal(log=False)
+    silent.record(BUY, "AAA", DAYS[0], 10.0, 1)
+    silent.publish()
+    journal.drain()
+    assert len(silent.events) == 1 and captured == []
@@ -0,0 +1,108 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_store import MANIFEST_NAME, MarketDataStore, legacy_csv_path, read_legacy_csv
+from synthetic import synthetic_ohlcv
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    df = synthetic_ohlcv("AAA", n_bars=200)
+    df["Volume"] = df["Volume"].astype(np.int64)
+    # the store keeps timestamps as int64 nanoseconds
+    df.index = df.index.as_unit("ns")
+    return df
+
+
+def _manifest(root: str) -> dict:
+    with open(os.path.join(root, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_write_load_round_trip_keeps_values_and_dtypes(frame, mmap):
+    store = MarketDataStore("store")
+    store.write("AAA", frame)
+    loaded = store.load("AAA", mmap=mmap)
+    pd.testing.assert_frame_equal(loaded, frame, check_freq=False)
+    assert loaded["Volume"].dtype == np.int64
+    assert store.load("MISSING") is None
+
+
+def test_tz_aware_index_round_trips(frame):
+    intraday = frame.copy()
+    intraday.index = pd.date_range("2024-03-01 09:15", periods=len(frame), freq="15min", tz="Asia/Kolkata",
+                                   name="Datetime")
+    store = MarketDataStore("store")
+    store.write("AAA@15m", intraday)
+    # a fresh store instance only has the manifest and the column file to go on
+    loaded = MarketDataStore("store").load("AAA@15m")
+    assert str(loaded.index.tz) == "Asia/Kolkata"
+    assert loaded.index.name == "Datetime"
+    assert loaded.index.equals(intraday.index)
+    start, end = MarketDataStore("store").date_range("AAA@15m")
+    assert start == intraday.index[0] and end == intraday.index[-1]
+
+
+def test_load_tail_and_column_subset(frame):
+    store = MarketDataStore("store")
+    store.write("AAA", frame)
+    tail = store.load("AAA", columns=["Close", "Volume"], tail=30)
+    assert list(tail.columns) == ["Close", "Volume"]
+    pd.testing.assert_frame_equal(tail, frame[["Close", "Volume"]].iloc[-30:], check_freq=False)
+    # a tail longer than the history is the whole history
+    assert len(store.load("AAA", tail=10_000)) == len(frame)
+
+
+def test_manifest_tracks_writes_flushes_and_deletes(frame):
+    store = MarketDataStore("store")
+    store.write("AAA", frame.iloc[:100])
+    entry = _manifest("store")["AAA"]
+    assert entry["rows"] == 100 and entry["end"] == frame.index[99].isoformat()
+
+    # bulk writes only reach the manifest file on flush
+    store.write("AAA", frame, flush=False)
+    store.write("BBB", frame, flush=False)
+    assert _manifest("store")["AAA"]["rows"] == 100 and "BBB" not in _manifest("store")
+    store.flush()
+    assert _manifest("store")["AAA"]["rows"] == len(frame)
+    assert MarketDataStore("store").tickers() == ["AAA", "BBB"]
+
+    store.delete("BBB")
+    assert "BBB" not in store and "BBB" not in _manifest("store")
+    assert not os.path.exists(os.path.join("store", "BBB.bin"))
+
+
+def test_empty_frame(frame):
+    store = MarketDataStore("store")
+    store.write("EMPTY", frame.iloc[:0])
+    loaded = store.load("EMPTY")
+    assert loaded.empty and list(loaded.columns) == list(frame.columns)
+
+
+def test_import_csv_cache_migrates_legacy_files(frame):
+    os.makedirs("legacy")
+    frame.to_csv(legacy_csv_path("legacy", "RELIANCE.NS"))
+    aware = frame.copy()
+    aware.index = aware.index.tz_localize("Asia/Kolkata")
+    aware.to_csv(legacy_csv_path("legacy", "TCS.NS"))
+    with open(os.path.join("legacy", "BROKEN_NS.csv"), "w") as f:
+        f.write("not,a\ncache,file\n")
+
+    store = MarketDataStore("store")
+    imported = store.import_csv_cache("legacy")
+    assert imported == ["RELIANCE.NS", "TCS.NS"]
+    assert set(_manifest("store")) == {"RELIANCE.NS", "TCS.NS"}
+    np.testing.assert_allclose(store.load("RELIANCE.NS")["Close"], frame["Close"])
+    assert store.load("RELIANCE.NS").index.equals(pd.DatetimeIndex(frame.index, name="Date"))
+    tcs = store.load("TCS.NS")
+    assert tcs.index.equals(read_legacy_csv(legacy_csv_path("legacy", "TCS.NS")).index)
+    assert tcs.index[0] == aware.index[0]
+
+    # already imported tickers are skipped unless overwrite is set
+    assert store.import_csv_cache("legacy") == []
+    assert store.import_csv_cache("legacy", overwrite=True) == ["RELIANCE.NS", "TCS.NS"]
@@ -0,0 +1,88 @@
+import json
+import os
+import pstats
+
+import pytest
+
+from data_fetcher import DataFetcher
+from market_store import MarketDataStore
+from metrics import METRICS, MetricsRegistry, profiled, timed
+from synthetic import SyntheticProvider, synthetic_universe
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    with registry.timer("stage.fetch", "AAA"):
+        pass
+    registry.incr("fetch.requests")
+    registry.observe("latency", 1.0)
+    assert registry.snapshot() == {"timers": {}, "counters": {}, "histograms": {}}
+
+
+def test_timers_counters_and_histograms():
+    registry = MetricsRegistry(enabled=True)
+    registry.record_time("stage.backtest", 0.5, "AAA")
+    registry.record_time("stage.backtest", 1.5, "BBB")
+    registry.record_time("stage.backtest", 1.0, "AAA")
+    with registry.timer("stage.fetch"):
+        pass
+    registry.incr("fetch.requests")
+    registry.incr("fetch.rows_downloaded", 250)
+    for value in range(1, 101):
+        registry.observe("latency", value)
+
+    snap = registry.snapshot()
+    backtest = snap["timers"]["stage.backtest"]
+    assert (backtest["count"], backtest["total_s"], backtest["min_s"], backtest["max_s"]) == (3, 3.0, 0.5, 1.5)
+    assert backtest["mean_s"] == 1.0 and backtest["by_ticker"] == {"AAA": 1.5, "BBB": 1.5}
+    assert snap["timers"]["stage.fetch"]["count"] == 1 and snap["timers"]["stage.fetch"]["by_ticker"] == {}
+    assert snap["counters"] == {"fetch.requests": 1, "fetch.rows_downloaded": 250}
+    assert snap["histograms"]["latency"]["p50"] == pytest.approx(50.5)
+    assert snap["histograms"]["latency"]["max"] == 100.0
+
+    assert registry.by_ticker().loc["AAA", "stage.backtest"] == 1.5
+    report = registry.report()
+    assert report.index("stage.backtest") < report.index("stage.fetch")  # sorted by total time
+    assert "fetch.rows_downloaded" in report and "Seconds per ticker:" in report
+    assert json.loads(registry.to_json("metrics.json")) == json.loads(open("metrics.json").read())
+
+    registry.reset()
+    assert registry.snapshot()["timers"] == {}
+
+
+def test_fetch_is_instrumented_when_enabled():
+    universe = synthetic_universe(3, n_bars=50)
+    METRICS.reset()
+    METRICS.enable()
+    try:
+        DataFetcher(list(universe), period="max", store=MarketDataStore("store"),
+                    provider=SyntheticProvider(universe)).fetch()
+        snap = METRICS.snapshot()
+    finally:
+        METRICS.disable()
+        METRICS.reset()
+    assert snap["counters"]["fetch.requests"] == 3
+    assert snap["counters"]["fetch.rows_downloaded"] == 150
+    assert set(snap["timers"]["fetch.ticker"]["by_ticker"]) == set(universe)
+
+
+def test_timed_decorator_and_profiler():
+    @timed("work")
+    def work(x):
+        return x * 2
+
+    assert work(2) == 4 and METRICS.snapshot()["timers"] == {}
+    METRICS.enable()
+    try:
+        assert work(3) == 6
+        assert METRICS.snapshot()["timers"]["work"]["count"] == 1
+    finally:
+        METRICS.disable()
+        METRICS.reset()
+
+    with profiled(None) as profiler:
+        assert profiler is None
+    with profiled("run.pstats"):
+        work(1)
+    assert os.path.exists("run.pstats")
+    assert pstats.Stats("run.pstats").total_calls > 0
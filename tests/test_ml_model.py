@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from ml_model import FEATURES, MLModel, PooledModel, feature_columns, make_model
+from orchestration import run_ml_for_ticker
+from strategy import Strategy
+from synthetic import synthetic_ohlcv, synthetic_universe
+
+PRICES = synthetic_ohlcv("AAA", n_bars=600)
+SIGNALS = Strategy(PRICES).generate_signals()
+
+
+@pytest.mark.parametrize("model_type", ["tree", "logistic", "sgd"])
+def test_walk_forward_predicts_every_test_block(model_type):
+    result = MLModel(SIGNALS).walk_forward(model_type, n_windows=4, max_workers=1)
+    windows = result["windows"]
+    assert len(windows) == 4
+    assert (windows["train_end"] < windows["test_start"]).all()
+    assert result["predictions"].notna().sum() == windows["n_test"].sum()
+    assert 0.0 <= result["accuracy"] <= 1.0
+
+
+def test_sgd_model_scales_its_inputs():
+    X, y = MLModel(SIGNALS).prepare_features()
+    model = make_model("sgd", alpha=0.01)
+    assert model[-1].alpha == 0.01
+    model.fit(X, y)
+    assert np.allclose(model[0].mean_, X.mean().to_numpy())
+
+
+def test_ml_stage_reports_walk_forward_accuracy():
+    result = run_ml_for_ticker(PRICES, walk_forward=3)
+    assert result["success"]
+    assert 0.0 <= result["walk_forward_accuracy"] <= 1.0
+    assert "walk_forward_accuracy" not in run_ml_for_ticker(PRICES)
+
+
+def test_features_follow_the_configured_sma_windows():
+    assert feature_columns() == FEATURES
+    assert feature_columns(sma_short=10, sma_long=30)[-2:] == ["sma10", "sma30"]
+    df = synthetic_ohlcv("AAA", n_bars=300)
+    result = run_ml_for_ticker(df, strategy_params={"sma_short": 10, "sma_long": 30})
+    assert result["success"], result
+
+
+def test_pooled_model_target_encodes_the_ticker():
+    universe = synthetic_universe(5, n_bars=300)
+    signals = {t: Strategy(df).generate_signals() for t, df in universe.items()}
+    pooled = PooledModel("logistic")
+    X, y, ids, when = pooled.stack(signals)
+    assert X.shape[1] == len(FEATURES) + 1
+    # the last column is each row's ticker up-rate, learned on training dates only
+    assert np.array_equal(X[:, -1], pooled.up_rate[ids])
+    train = when < pooled.cutoff.to_datetime64()
+    raw = np.bincount(ids[train], weights=y[train]) / np.bincount(ids[train])
+    pooled_rate = y[train].mean()
+    assert np.all(np.abs(pooled.up_rate - pooled_rate) <= np.abs(raw - pooled_rate) + 1e-12)
+
+    pooled.fit(signals)
+    predictions = pooled.predict_latest(signals)
+    assert list(predictions.index) == list(universe)
@@ -0,0 +1,63 @@
+import pytest
+
+from ml_search import search_executor, search_hyperparameters, search_tickers, time_series_folds
+from strategy import Strategy
+from synthetic import synthetic_ohlcv
+
+SPACE = {"tree": {"max_depth": [2, 3, 5], "min_samples_leaf": [1, 20]}, "logistic": {"C": [0.1, 1.0]}}
+
+
+@pytest.fixture(scope="module")
+def signals():
+    return Strategy(synthetic_ohlcv("AAA", n_bars=500)).generate_signals()
+
+
+def test_folds_train_strictly_before_test_newest_first():
+    folds = time_series_folds(120, n_splits=4)
+    assert len(folds) == 4
+    for train_end, (test_start, test_end) in folds:
+        assert train_end <= test_start < test_end <= 120
+    assert [test_end for _, (_, test_end) in folds] == sorted((te for _, (_, te) in folds), reverse=True)
+
+
+def test_successive_halving_prunes_to_the_best_config(signals):
+    ml_results, table = search_hyperparameters(signals, space=SPACE, n_splits=4, factor=2, max_workers=1)
+    assert set(ml_results) == {"tree", "logistic"}
+    for model_type, result in ml_results.items():
+        assert set(result) == {"accuracy", "auc", "cv_mean", "cv_std", "params"}
+        rounds = table[table["model"] == model_type]
+        # every config is scored in round 0, only the best survive to the last round on every fold
+        n_configs = {"tree": 6, "logistic": 2}[model_type]
+        assert rounds[rounds["round"] == 0]["params"].nunique() == n_configs
+        last = rounds[rounds["round"] == rounds["round"].max()]
+        assert (last["folds"] == 4).all()
+        best = last.sort_values("cv_mean", ascending=False).iloc[0]
+        assert best["cv_mean"] == pytest.approx(result["cv_mean"])
+    tree_rounds = table[table["model"] == "tree"].groupby("round")["params"].nunique().tolist()
+    assert tree_rounds == sorted(tree_rounds, reverse=True) and tree_rounds[-1] < tree_rounds[0]
+
+
+def test_shared_executor_gives_the_same_results(signals):
+    local, _ = search_hyperparameters(signals, space=SPACE, model_types=("logistic",), n_splits=3, max_workers=1)
+    with search_executor(2) as executor:
+        shared, _ = search_hyperparameters(signals, space=SPACE, model_types=("logistic",), n_splits=3,
+                                           executor=executor)
+        # the executor stays usable for the next ticker
+        again, _ = search_hyperparameters(signals, space=SPACE, model_types=("logistic",), n_splits=3,
+                                          executor=executor)
+    for result in (shared, again):
+        assert result["logistic"]["params"] == local["logistic"]["params"]
+        assert result["logistic"]["cv_mean"] == pytest.approx(local["logistic"]["cv_mean"])
+        assert result["logistic"]["accuracy"] == pytest.approx(local["logistic"]["accuracy"])
+
+
+def test_short_history_raises(signals):
+    with pytest.raises(ValueError):
+        search_hyperparameters(signals.iloc[:20], space=SPACE, n_splits=5, max_workers=1)
+
+
+def test_search_tickers_reports_failures_and_carries_on(signals):
+    results = search_tickers({"SHORT": signals.iloc[:20], "AAA": signals}, max_workers=2, space=SPACE,
+                             model_types=("logistic",), n_splits=3)
+    assert results["SHORT"]["success"] is False and results["SHORT"]["error"]
+    assert set(results["AAA"]) == {"logistic"}
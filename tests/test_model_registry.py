@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pytest
+
+from ml_model import MLModel, make_model
+from model_registry import ModelRegistry
+from orchestration import predict_latest, run_ml_for_ticker
+from strategy import Strategy
+from synthetic import synthetic_ohlcv
+
+DF = synthetic_ohlcv("AAA", n_bars=400)
+SIGNALS = Strategy(DF).generate_signals()
+
+
+@pytest.fixture
+def fitted():
+    X, y = MLModel(SIGNALS).prepare_features()
+    model = make_model("tree").fit(X, y)
+    return X, y, model
+
+
+def test_key_follows_the_training_window_and_params(fitted):
+    X, y, _ = fitted
+    key = ModelRegistry.key("AAA", "tree", X, y, {"max_depth": 5})
+    assert ModelRegistry.key("AAA", "tree", X.copy(), y.copy(), {"max_depth": 5}) == key
+    assert ModelRegistry.key("AAA", "tree", X.iloc[:-1], y.iloc[:-1], {"max_depth": 5}) != key
+    assert ModelRegistry.key("AAA", "tree", X, y, {"max_depth": 6}) != key
+    assert ModelRegistry.key("AAA", "logistic", X, y, {"max_depth": 5}) != key
+    assert ModelRegistry.key("BBB", "tree", X, y, {"max_depth": 5}) != key
+    assert ModelRegistry.window(X) == {"train_start": str(X.index[0]), "train_end": str(X.index[-1]),
+                                       "rows": len(X)}
+
+
+def test_put_get_latest_and_replace(fitted):
+    X, y, model = fitted
+    registry = ModelRegistry("models")
+    assert registry.get("missing") is None and registry.latest("AAA", "tree") is None
+    registry.put("k1", model, "AAA", "tree", accuracy=0.5, **registry.window(X))
+
+    # a new instance reads the index and loads the model from disk
+    reopened = ModelRegistry("models")
+    loaded, meta = reopened.get("k1")
+    assert meta["accuracy"] == 0.5 and meta["rows"] == len(X)
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+    assert reopened.latest("AAA", "tree")[1]["key"] == "k1"
+    assert (reopened.hits, reopened.misses) == (1, 0)
+
+    reopened.put("k2", model, "AAA", "tree", accuracy=0.6)
+    assert reopened.get("k1") is None and reopened.get("k2")[1]["accuracy"] == 0.6
+    assert not os.path.exists(os.path.join("models", "k1.joblib"))
+    assert ModelRegistry("models").latest("AAA", "tree")[1]["key"] == "k2"
+
+    assert ModelRegistry("models", refit=True).get("k2") is None
+    small = ModelRegistry("models", max_loaded=1)
+    small.put("k3", model, "BBB", "tree")
+    small.get("k2")
+    assert list(small._loaded) == ["k2"]
+
+
+def test_ml_stage_reuses_the_registered_model(monkeypatch):
+    registry = ModelRegistry("models")
+    first = run_ml_for_ticker(DF, ticker="AAA", signals=SIGNALS, registry=registry)
+    assert first["success"] and first["prediction"] in (0, 1) and first["as_of"] == SIGNALS.index[-1]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("model was refit")
+
+    monkeypatch.setattr(MLModel, "train", fail)
+    again = run_ml_for_ticker(DF, ticker="AAA", signals=SIGNALS, registry=ModelRegistry("models"))
+    assert again == first
+
+    predicted = predict_latest(ModelRegistry("models"), "AAA", SIGNALS)
+    assert predicted["success"] and predicted["prediction"] == first["prediction"]
+    assert not predict_latest(ModelRegistry("models"), "BBB", SIGNALS)["success"]
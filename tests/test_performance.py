@@ -0,0 +1,73 @@
+import math
+import statistics
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import Backtester
+from journal import TradeJournal
+from performance import compute_metrics, drawdown, metrics_frame
+from synthetic import synthetic_ohlcv
+
+EQUITY = [100.0, 110.0, 88.0, 99.0, 110.0, 120.0]
+SHARES = [0.0, 1.0, 1.0, 0.0, 2.0, 2.0]
+PRICES = [100.0, 110.0, 88.0, 99.0, 110.0, 120.0]
+PERIODS = 4  # bars per year, to keep the annualisation easy to follow
+
+
+def test_drawdown_depth_and_duration():
+    dd, bars = drawdown(EQUITY)
+    np.testing.assert_allclose(dd, [0.0, 0.0, -0.2, -0.1, 0.0, 0.0])
+    assert bars.tolist() == [0, 0, 1, 2, 0, 0]
+
+
+def test_small_curve_against_hand_computed_values():
+    m = compute_metrics(EQUITY, SHARES, PRICES, periods=PERIODS)
+    returns = [0.1, -0.2, 0.125, 1 / 9, 1 / 11]
+    mean, std = statistics.mean(returns), statistics.stdev(returns)
+    downside = math.sqrt(0.2 ** 2 / 5)
+    assert m["total_return"] == pytest.approx(0.2)
+    assert m["cagr"] == pytest.approx(1.2 ** (4 / 5) - 1)
+    assert m["volatility"] == pytest.approx(std * 2)
+    assert m["sharpe"] == pytest.approx(mean / std * 2)
+    assert m["sortino"] == pytest.approx(mean / downside * 2)
+    assert m["max_drawdown"] == pytest.approx(-0.2)
+    assert m["max_drawdown_duration"] == 2
+    assert m["exposure"] == pytest.approx(4 / 6)
+    # bought 1 at 110, sold it at 99, bought 2 at 110; over a mean equity of 104.5 across 6 bars
+    assert m["turnover"] == pytest.approx((110 + 99 + 220) / 104.5 * PERIODS / 6)
+    # a risk-free rate comes off every bar's return
+    assert compute_metrics(EQUITY, periods=PERIODS, risk_free=0.04)["sharpe"] == pytest.approx((mean - 0.01) / std * 2)
+
+
+def test_flat_curve_scores_zero_rather_than_nan():
+    m = compute_metrics([100.0] * 10, periods=PERIODS)
+    for name in ("total_return", "cagr", "volatility", "sharpe", "sortino", "max_drawdown", "max_drawdown_duration"):
+        assert m[name] == 0.0, name
+    # without positions there is nothing to measure exposure or turnover from
+    assert math.isnan(m["exposure"]) and math.isnan(m["turnover"])
+    assert all(math.isnan(v) for v in compute_metrics([100.0]).values())
+
+
+def test_backtest_without_trades():
+    signals = synthetic_ohlcv("AAA", n_bars=100)
+    signals["buy_signal"] = False
+    signals["sell_signal"] = False
+    bt = Backtester(signals, "AAA", starting_cash=1000.0, journal=TradeJournal(log=False))
+    bt.run()
+    m = bt.get_performance_metrics()
+    assert m["Total_Trades"] == 0 and m["Win_Rate"] == 0.0 and m["Final_Equity"] == 1000.0
+    for key in ("Total_Return_Pct", "CAGR_Pct", "Volatility_Pct", "Sharpe_Ratio", "Sortino_Ratio",
+                "Max_Drawdown_Pct", "Max_Drawdown_Duration", "Exposure_Pct", "Turnover"):
+        assert m[key] == 0.0, key
+
+
+def test_panel_columns_match_single_curves():
+    index = pd.date_range("2024-01-01", periods=len(EQUITY), freq="D")
+    panel = pd.DataFrame({"a": EQUITY, "flat": 100.0, "b": EQUITY[::-1]}, index=index)
+    frame = metrics_frame(panel, periods=PERIODS)
+    for col in panel:
+        expected = compute_metrics(panel[col].to_numpy(), periods=PERIODS)
+        for name, value in expected.items():
+            assert frame.loc[col, name] == pytest.approx(value, nan_ok=True), (col, name)
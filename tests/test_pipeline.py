@@ -0,0 +1,75 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data_fetcher import DataFetcher
+from market_store import MarketDataStore
+from orchestration import Pipeline
+from strategy import Strategy
+from synthetic import SyntheticProvider, synthetic_universe
+
+UNIVERSE = synthetic_universe(4, n_bars=300)
+
+
+def _pipeline(**kwargs):
+    provider = SyntheticProvider(UNIVERSE)
+    fetcher = DataFetcher(list(UNIVERSE), period="max", store=MarketDataStore("store"), provider=provider)
+    kwargs.setdefault("state_path", "scan_state.json")
+    return Pipeline(list(UNIVERSE), fetcher=fetcher, max_workers=2, **kwargs), provider
+
+
+def test_plan_adds_dependencies_in_execution_order():
+    assert Pipeline.plan(["scan"]) == ["fetch", "indicators", "signals", "backtest", "scan"]
+    assert Pipeline.plan(["ml", "validate", "backtest"]) == \
+        ["fetch", "indicators", "signals", "ml", "validate", "backtest"]
+    assert Pipeline.plan([]) == []
+    with pytest.raises(ValueError):
+        Pipeline.plan(["deploy"])
+
+
+def test_stages_share_one_fetch_and_one_set_of_signals():
+    pipeline, provider = _pipeline()
+    results = pipeline.run(["backtest"])
+    assert provider.requests == len(UNIVERSE)
+    for t, done in results.items():
+        expected = Strategy(UNIVERSE[t]).generate_signals()
+        pd.testing.assert_series_equal(done["signals"]["buy_signal"], expected["buy_signal"], check_freq=False)
+        assert done["backtest"]["summary"]["trades"] == len(done["backtest"]["trades"])
+
+    signals = {t: done["signals"] for t, done in results.items()}
+    pipeline.run(["backtest", "scan"])
+    assert provider.requests == len(UNIVERSE)  # nothing is fetched twice
+    for t, done in pipeline.results.items():
+        assert done["signals"] is signals[t]
+        assert done["scan"]["latest"]["timestamp"] == UNIVERSE[t].index[-1]
+    assert os.path.exists("scan_state.json")
+
+
+def test_a_failed_stage_stops_that_ticker_only(monkeypatch):
+    original = Pipeline._stage_signals
+
+    def flaky(self, t, done):
+        if t == "SYN0001":
+            raise RuntimeError("bad data")
+        return original(self, t, done)
+
+    monkeypatch.setattr(Pipeline, "_stage_signals", flaky)
+    pipeline, _ = _pipeline()
+    results = pipeline.run(["scan"])
+    assert results["SYN0001"] == {"signals": {"success": False, "error": "bad data"}}
+    for t in ("SYN0000", "SYN0002", "SYN0003"):
+        assert set(results[t]) == {"signals", "backtest", "scan"}
+    trades, summary = pipeline.scan_results()
+    assert set(summary) == {"SYN0000", "SYN0002", "SYN0003"}
+
+
+def test_min_quality_drops_bad_tickers_before_the_indicators():
+    bad = UNIVERSE["SYN0002"].copy()
+    bad.loc[bad.index[50:200], ["Open", "High", "Low", "Close", "Adj Close"]] = bad["Close"].iloc[50]
+    pipeline, provider = _pipeline(min_quality=90)
+    provider.frames = {**UNIVERSE, "SYN0002": bad}
+    results = pipeline.run(["signals"])
+    assert pipeline.quality["SYN0002"]["quality_score"] < 90
+    assert "SYN0002" not in results and "SYN0002" not in pipeline.panel["rsi"]
+    assert set(results) == {"SYN0000", "SYN0001", "SYN0003"}
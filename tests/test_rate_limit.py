@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from rate_limit import TokenBucket, retry_with_backoff
+
+
+class FakeClock:
+    """Manual clock; `sleep` advances it instead of blocking."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.5  # one token at 2/s
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now += 10  # refill is capped at capacity
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_acquire_sleeps_until_a_token_is_available():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4.0, capacity=1, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        bucket.acquire()
+    # the first token is there from the start, every later one waits 1/rate
+    assert clock.sleeps == pytest.approx([0.25] * 4)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def _failing(n: int, exc=RuntimeError):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= n:
+            raise exc(f"failure {len(calls)}")
+        return "ok"
+
+    return fn, calls
+
+
+def test_retry_backs_off_exponentially():
+    clock = FakeClock()
+    fn, calls = _failing(3)
+    assert retry_with_backoff(fn, retries=3, base_delay=0.5, jitter=False, sleep=clock.sleep) == "ok"
+    assert len(calls) == 4
+    assert clock.sleeps == [0.5, 1.0, 2.0]
+
+
+def test_retry_delay_is_capped():
+    clock = FakeClock()
+    fn, _ = _failing(4)
+    retry_with_backoff(fn, retries=4, base_delay=1.0, max_delay=3.0, jitter=False, sleep=clock.sleep)
+    assert clock.sleeps == [1.0, 2.0, 3.0, 3.0]
+
+
+def test_retry_jitter_stays_within_half_to_full_delay():
+    random.seed(0)
+    clock = FakeClock()
+    fn, _ = _failing(3)
+    retry_with_backoff(fn, retries=3, base_delay=1.0, sleep=clock.sleep)
+    for delay, full in zip(clock.sleeps, [1.0, 2.0, 4.0]):
+        assert full / 2 <= delay <= full
+
+
+def test_retry_reraises_after_exhausting_retries():
+    clock = FakeClock()
+    fn, calls = _failing(10)
+    with pytest.raises(RuntimeError, match="failure 3"):
+        retry_with_backoff(fn, retries=2, base_delay=0.1, jitter=False, sleep=clock.sleep)
+    assert len(calls) == 3
+    assert len(clock.sleeps) == 2
+
+
+def test_retry_if_rejects_errors_immediately():
+    clock = FakeClock()
+    fn, calls = _failing(1, exc=ValueError)
+    with pytest.raises(ValueError):
+        retry_with_backoff(fn, retries=3, sleep=clock.sleep, retry_if=lambda e: not isinstance(e, ValueError))
+    assert len(calls) == 1
+    assert clock.sleeps == []
+
+
+def test_errors_outside_retry_on_propagate():
+    fn, calls = _failing(1, exc=KeyError)
+    with pytest.raises(KeyError):
+        retry_with_backoff(fn, retries=3, retry_on=(RuntimeError,), sleep=lambda s: None)
+    assert len(calls) == 1
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from resample import OHLCV_AGG, resample_ohlcv
+from synthetic import synthetic_ohlcv
+
+PANDAS_RULE = {"5m": "5min", "15m": "15min", "1h": "1h", "1d": "1D"}
+
+
+@pytest.fixture(scope="module")
+def minutes() -> pd.DataFrame:
+    """1m session bars over the US DST change in March 2024, with missing bars and NaNs."""
+    days = pd.bdate_range("2024-03-05", "2024-03-15")
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{day.date()} 09:30", f"{day.date()} 15:59", freq="1min", tz="America/New_York")
+        for day in days
+    ]), name="Datetime")
+    df = synthetic_ohlcv("AAA", n_bars=len(index), freq="1min").set_axis(index)
+    rng = np.random.default_rng(3)
+    df = df.drop(df.index[rng.choice(len(df), size=300, replace=False)])
+    df.iloc[rng.choice(len(df), size=20, replace=False), df.columns.get_loc("High")] = np.nan
+    df.iloc[rng.choice(len(df), size=20, replace=False), df.columns.get_loc("Volume")] = np.nan
+    return df
+
+
+def _pandas(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    resampler = df.resample(PANDAS_RULE[interval])
+    return resampler.agg(OHLCV_AGG)[resampler.size() > 0]
+
+
+@pytest.mark.parametrize("interval", sorted(PANDAS_RULE))
+def test_matches_pandas_resample(minutes, interval):
+    actual = resample_ohlcv(minutes, interval)
+    expected = _pandas(minutes, interval)
+    assert actual.index.equals(expected.index) and str(actual.index.tz) == "America/New_York"
+    pd.testing.assert_frame_equal(actual, expected, check_freq=False, check_dtype=False)
+
+
+def test_naive_index_and_edge_cases(minutes):
+    naive = minutes.tz_localize(None)
+    pd.testing.assert_frame_equal(resample_ohlcv(naive, "1h"), _pandas(naive, "1h"), check_freq=False,
+                                  check_dtype=False)
+    assert resample_ohlcv(minutes.iloc[:0], "1h").empty
+    with pytest.raises(ValueError):
+        resample_ohlcv(minutes, "1wk")
+    with pytest.raises(ValueError):
+        resample_ohlcv(minutes.iloc[::-1], "1h")
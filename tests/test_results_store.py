@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from results_store import ResultsStore
+
+
+def _trades(ticker: str) -> pd.DataFrame:
+    return pd.DataFrame({
+        "entry_date": pd.to_datetime(["2024-01-02", "2024-01-08"]),
+        "entry_price": [100.0, 105.0],
+        "exit_price": [110.0, None],
+        "size": [2, 1],
+        "win": [True, False],
+        "ticker": ticker,
+    })
+
+
+def test_frames_and_metrics_round_trip_across_runs():
+    with ResultsStore(run_id="run1") as store:
+        store.write_frame("trades", _trades("AAA"))
+        store.write_frame("trades", _trades("BBB"))
+        store.write_metrics("performance", {"Sharpe_Ratio": 1.25, "Win_Rate": 50, "Note": "ok",
+                                            "params": {"rsi_buy": 30, "open": None}}, ticker="AAA")
+        assert store.flush(timeout=10)
+        # readable while the run is still open
+        assert len(ResultsStore.load("trades", runs=["run1"])) == 4
+    with ResultsStore(run_id="run2") as store:
+        trades = _trades("AAA").assign(pnl=[20.0, float("nan")])  # a column the first run did not have
+        store.write_frame("trades", trades)
+        store.write_metrics("performance", {"Sharpe_Ratio": 0.5}, ticker="AAA")
+
+    runs = ResultsStore.runs()
+    assert runs["run_id"].tolist() == ["run1", "run2"] and runs["finished_at"].notna().all()
+
+    aaa = ResultsStore.load("trades", ticker="AAA")
+    assert aaa["run_id"].tolist() == ["run1", "run1", "run2", "run2"]
+    first = aaa[aaa["run_id"] == "run1"]
+    assert first["entry_date"].tolist() == ["2024-01-02T00:00:00", "2024-01-08T00:00:00"]
+    assert first["entry_price"].tolist() == [100.0, 105.0] and pd.isna(first["exit_price"].iloc[1])
+    assert first["size"].tolist() == [2, 1] and first["win"].tolist() == [1, 0]
+    assert aaa[aaa["run_id"] == "run2"]["pnl"].iloc[0] == 20.0
+    assert len(ResultsStore.load("trades", runs=["run2"])) == 2
+    assert ResultsStore.load("equity_curve").empty
+
+    sharpe = ResultsStore.metric("Sharpe_Ratio", ticker="AAA")
+    assert sharpe[["run_id", "value"]].values.tolist() == [["run1", 1.25], ["run2", 0.5]]
+    metrics = ResultsStore.load("metrics", runs=["run1"]).set_index("metric")
+    assert metrics.loc["Note", "text"] == "ok" and pd.isna(metrics.loc["Note", "value"])
+    assert metrics.loc["rsi_buy", "category"] == "params" and metrics.loc["rsi_buy", "value"] == 30.0
+
+
+def test_closed_store_rejects_writes_and_flush_returns():
+    store = ResultsStore(run_id="run1")
+    store.write_frame("trades", _trades("AAA"))
+    store.close()
+    assert store.flush(timeout=None)
+    with pytest.raises(RuntimeError):
+        store.write_frame("trades", _trades("AAA"))
+    # nothing queued was lost
+    assert len(ResultsStore.load("trades")) == 2
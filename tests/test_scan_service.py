@@ -0,0 +1,115 @@
+import json
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from data_fetcher import DataFetcher
+from market_store import MarketDataStore
+from scan_service import ScanSchedule, ScanService
+from strategy import Strategy
+from synthetic import SyntheticProvider, synthetic_universe
+
+TZ = "Asia/Kolkata"
+# loose thresholds so a random walk trades within a few dozen bars
+PARAMS = {"rsi_buy": 60, "rsi_sell": 65, "sma_short": 3, "sma_long": 8}
+UNIVERSE = synthetic_universe(5, n_bars=300)
+SEEN = 240
+
+
+def _at(text: str) -> pd.Timestamp:
+    return pd.Timestamp(text, tz=TZ)
+
+
+def test_daily_schedule_skips_weekends():
+    schedule = ScanSchedule.parse("close", tz=TZ)
+    assert schedule.next_run(_at("2024-03-04 12:00")) == _at("2024-03-04 15:40")  # Monday
+    assert schedule.next_run(_at("2024-03-04 15:40")) == _at("2024-03-05 15:40")
+    assert schedule.next_run(_at("2024-03-08 16:00")) == _at("2024-03-11 15:40")  # Friday -> Monday
+    assert ScanSchedule.parse("09:05", tz=TZ).next_run(_at("2024-03-09 08:00")) == _at("2024-03-11 09:05")
+
+
+def test_interval_schedule_stays_in_the_session():
+    schedule = ScanSchedule.parse("15m", tz=TZ)
+    assert schedule.next_run(_at("2024-03-04 08:00")) == _at("2024-03-04 09:30")
+    assert schedule.next_run(_at("2024-03-04 10:07")) == _at("2024-03-04 10:15")
+    assert schedule.next_run(_at("2024-03-04 10:15")) == _at("2024-03-04 10:30")
+    # one run after the close picks up the closing bar, then the next session
+    assert schedule.next_run(_at("2024-03-04 15:31")) == _at("2024-03-04 15:45")
+    assert schedule.next_run(_at("2024-03-04 15:45")) == _at("2024-03-05 09:30")
+    anywhere = ScanSchedule.parse("1h", tz=TZ, session_only=False, weekdays_only=False)
+    assert anywhere.next_run(_at("2024-03-09 23:10")) == _at("2024-03-10 00:00")
+    with pytest.raises(ValueError):
+        ScanSchedule(tz=TZ)
+    with pytest.raises(ValueError):
+        ScanSchedule(every=pd.Timedelta(0), tz=TZ)
+
+
+def _service(provider, **kwargs) -> ScanService:
+    fetcher = DataFetcher(list(UNIVERSE), period="max", store=MarketDataStore("store"), provider=provider)
+    kwargs.setdefault("status_port", None)
+    return ScanService(list(UNIVERSE), ScanSchedule.parse("close", tz=TZ), fetcher=fetcher,
+                       state_path="scan_state.json", strategy_params=PARAMS, **kwargs)
+
+
+def _expected_events(ticker: str) -> list:
+    """BUY when flat / SELL when long, from the last bar seen on start-up onwards."""
+    signals = Strategy(UNIVERSE[ticker], **PARAMS).generate_signals().iloc[SEEN - 1:]
+    events, holding = [], False
+    for ts, row in signals.iterrows():
+        if row["buy_signal"] and not holding:
+            events.append(("BUY", ts, row["Close"]))
+            holding = True
+        elif row["sell_signal"] and holding:
+            events.append(("SELL", ts, row["Close"]))
+            holding = False
+    return events
+
+
+def test_ticks_stream_new_bars_into_trade_events():
+    provider = SyntheticProvider({t: df.iloc[:SEEN].copy() for t, df in UNIVERSE.items()})
+    service = _service(provider)
+    first = service.tick()
+    assert first["error"] is None
+    provider.frames = dict(UNIVERSE)
+    second = service.tick()
+
+    events = first["events"] + second["events"]
+    for t in UNIVERSE:
+        expected = _expected_events(t)
+        assert [(e.kind, e.timestamp) for e in events if e.ticker == t] == [(k, ts) for k, ts, _ in expected]
+        assert [e.price for e in events if e.ticker == t] == pytest.approx([p for _, _, p in expected])
+    assert provider.rows_served == len(UNIVERSE) * (SEEN + 60 + 2)  # only the tails after start-up
+
+    status = service.status()
+    assert status["ticks"] == 2 and status["healthy"]
+    assert {s["timestamp"] for s in status["signals"].values()} == {UNIVERSE["SYN0000"].index[-1]}
+    assert set(status["open_positions"]) == {t for t in UNIVERSE if _expected_events(t)[-1][0] == "BUY"}
+
+    # a restarted service resumes from the saved states: no reseed, no repeated events
+    restarted = _service(provider)
+    assert restarted.states["SYN0000"].last_ts == UNIVERSE["SYN0000"].index[-1]
+    assert restarted.tick()["events"] == []
+
+
+def test_failed_tick_is_reported_over_http(monkeypatch):
+    service = _service(SyntheticProvider(UNIVERSE), status_port=0)
+    service.start_status_server()
+    try:
+        url = f"http://127.0.0.1:{service._server.server_address[1]}"
+        service.tick()
+        assert urllib.request.urlopen(url + "/health").read() == b"ok"
+
+        def fail(**kwargs):
+            raise RuntimeError("provider down")
+
+        monkeypatch.setattr(service.fetcher, "fetch", fail)
+        assert "provider down" in service.tick()["error"]
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(url + "/health")
+        assert err.value.code == 503
+        status = json.loads(urllib.request.urlopen(url + "/status").read())
+        assert status["ticks"] == 2 and "provider down" in status["last_error"]
+    finally:
+        service.shutdown()
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from data_fetcher import DataFetcher
+from market_store import MarketDataStore
+from screener import Screener
+from strategy import Strategy
+from synthetic import SyntheticProvider, synthetic_universe
+
+# loose RSI thresholds so a random walk produces hits on the last bar
+PARAMS = {"rsi_buy": 45, "rsi_sell": 55, "sma_short": 5, "sma_long": 15}
+
+
+@pytest.fixture
+def universe():
+    return synthetic_universe(120, n_bars=200)
+
+
+def _screener(universe, store, provider=None) -> Screener:
+    fetcher = DataFetcher(list(universe), period="max", store=store,
+                          provider=provider or SyntheticProvider(universe), backoff=0.0)
+    return Screener(list(universe), fetcher=fetcher, strategy_params=PARAMS)
+
+
+def test_flags_match_strategy_on_the_same_tail(universe):
+    screener = _screener(universe, MarketDataStore("store"))
+    tails = screener.load_tails()
+    latest = screener.screen(tails)
+    expected = {}
+    for t, tail in tails.items():
+        last = Strategy(tail, **PARAMS).generate_signals().iloc[-1]
+        # and the tail reproduces the full-history signal of the newest bar
+        full = Strategy(universe[t], **PARAMS).generate_signals().iloc[-1]
+        assert (last["buy_signal"], last["sell_signal"]) == (full["buy_signal"], full["sell_signal"])
+        expected[t] = "BUY" if last["buy_signal"] else "SELL" if last["sell_signal"] else ""
+    assert latest["signal"].fillna("").to_dict() == expected
+    assert latest["signal"].notna().any()
+    np.testing.assert_allclose(latest.loc[list(tails), "rsi"],
+                               [Strategy(tails[t], **PARAMS).df["rsi"].iloc[-1] for t in tails])
+
+
+def test_cached_tickers_are_brought_up_to_date(universe):
+    store = MarketDataStore("store")
+    provider = SyntheticProvider({t: df.iloc[:150].copy() for t, df in universe.items()})
+    first = _screener(universe, store, provider).run()
+    assert (first["latest"]["as_of"] == universe["SYN0000"].index[149]).all()
+
+    provider.frames = {t: df.copy() for t, df in universe.items()}
+    second = _screener(universe, store, provider).run()
+    assert (second["latest"]["as_of"] == universe["SYN0000"].index[-1]).all()
+
+    # update=False reads the store as is
+    provider.frames = {t: df.iloc[:100].copy() for t, df in universe.items()}
+    offline = _screener(universe, store, provider).run(update=False)
+    assert (offline["latest"]["as_of"] == universe["SYN0000"].index[-1]).all()
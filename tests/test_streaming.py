@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import Indicators
+from streaming import (SignalState, StreamingEMA, StreamingMACD, StreamingRSI, StreamingSMA, indicator_from_dict,
+                       load_signal_states, save_signal_states)
+from strategy import Strategy
+from synthetic import synthetic_ohlcv
+
+# longer than RESUM_EVERY, so the periodic re-summing of the running totals is covered too
+N_BARS = 2500
+SEED_BARS = 300
+
+
+@pytest.fixture(scope="module")
+def closes() -> pd.Series:
+    return synthetic_ohlcv("AAA", n_bars=N_BARS)["Close"]
+
+
+def _stream(indicator, values: np.ndarray) -> np.ndarray:
+    """Seed on the first SEED_BARS values, then update bar by bar; one output row per update."""
+    indicator.seed(values[:SEED_BARS])
+    return np.array([indicator.update(x) for x in values[SEED_BARS:]], dtype=float)
+
+
+BATCH = {
+    "sma": (lambda: StreamingSMA(20), lambda s: Indicators.sma(s, 20)),
+    "ema": (lambda: StreamingEMA(26), lambda s: Indicators.ema(s, 26)),
+    "rsi": (lambda: StreamingRSI(14), lambda s: Indicators.rsi(s, 14)),
+}
+
+
+@pytest.mark.parametrize("name", sorted(BATCH))
+def test_streaming_matches_batch(closes, name):
+    make, batch = BATCH[name]
+    streamed = _stream(make(), closes.to_numpy())
+    np.testing.assert_allclose(streamed, batch(closes).to_numpy()[SEED_BARS:], rtol=1e-9, atol=1e-9)
+
+
+def test_streaming_macd_matches_batch(closes):
+    streamed = _stream(StreamingMACD(12, 26, 9), closes.to_numpy())
+    expected = Indicators.macd(closes, 12, 26, 9).to_numpy()[SEED_BARS:]
+    np.testing.assert_allclose(streamed, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("name", sorted(BATCH) + ["macd"])
+def test_missing_bars_are_skipped(closes, name):
+    values = closes.to_numpy().copy()
+    rng = np.random.default_rng(0)
+    gaps = rng.choice(np.arange(10, N_BARS), size=100, replace=False)
+    values[gaps] = np.nan
+    if name == "macd":
+        streamed = _stream(StreamingMACD(), values)[:, 0]
+        batch = lambda s: Indicators.macd(s)["macd"]
+    else:
+        make, batch = BATCH[name]
+        streamed = _stream(make(), values)
+    # NaN bars repeat the previous value; elsewhere the batch indicator over the valid bars
+    valid = ~np.isnan(values)
+    expected = pd.Series(batch(pd.Series(values[valid])).to_numpy(), index=np.flatnonzero(valid))
+    expected = expected.reindex(np.arange(N_BARS)).ffill().to_numpy()[SEED_BARS:]
+    assert not np.isnan(streamed[-100:]).any()
+    np.testing.assert_allclose(streamed, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("indicator", [StreamingSMA(5), StreamingEMA(5), StreamingRSI(5), StreamingMACD(3, 6, 2)])
+def test_indicator_round_trips_through_dict(closes, indicator):
+    values = closes.to_numpy()
+    indicator.seed(values[:50])
+    restored = indicator_from_dict(indicator.to_dict())
+    for x in values[50:80]:
+        assert np.allclose(indicator.update(x), restored.update(x), equal_nan=True)
+
+
+def _signals(state: SignalState, df: pd.DataFrame) -> list:
+    out = []
+    state.catch_up(df, on_bar=out.append)
+    return out
+
+
+def _assert_same(a: list, b: list):
+    assert len(a) == len(b)
+    for x, y in zip(a, b):
+        assert {k: v for k, v in x.items() if not isinstance(v, float)} == \
+            {k: v for k, v in y.items() if not isinstance(v, float)}
+        assert np.allclose([x[k] for k in x if isinstance(x[k], float)],
+                           [y[k] for k in y if isinstance(y[k], float)], rtol=1e-9, equal_nan=True)
+
+
+def test_signal_state_matches_strategy_and_round_trips(closes, tmp_path):
+    df = closes.to_frame()
+    state = SignalState().seed(df["Close"].iloc[:SEED_BARS])
+    path = str(tmp_path / "states.json")
+    save_signal_states({"AAA": state}, path)
+    loaded = load_signal_states(path)["AAA"]
+    copied = SignalState.from_dict(state.to_dict())
+
+    streamed = _signals(state, df)
+    for restored in (loaded, copied):
+        # equal up to rounding: the running sums are re-added on a different schedule
+        _assert_same(_signals(restored, df), streamed)
+
+    batch = Strategy(df).generate_signals().iloc[SEED_BARS:]
+    assert [s["timestamp"] for s in streamed] == list(batch.index)
+    assert [s["buy_signal"] for s in streamed] == batch["buy_signal"].tolist()
+    assert [s["sell_signal"] for s in streamed] == batch["sell_signal"].tolist()
+    np.testing.assert_allclose([s["rsi"] for s in streamed], batch["rsi"], rtol=1e-9)
+
+
+def test_catch_up_reseeds_after_history_is_readjusted(closes):
+    df = closes.iloc[:1000].to_frame()
+    state = SignalState().seed(df["Close"])
+    adjusted = closes.iloc[:1010].to_frame() / 2  # e.g. a 2:1 split back-adjusted into the history
+    bars = _signals(state, adjusted)
+    # the state was rebuilt from the adjusted frame rather than continued from the old closes
+    assert len(bars) == 1
+    fresh = SignalState().seed(adjusted["Close"]).signal
+    assert bars[0] == fresh
+    assert state.last_close == pytest.approx(adjusted["Close"].iloc[-1])
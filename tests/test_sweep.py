@@ -0,0 +1,53 @@
+import pytest
+
+from backtester import Backtester
+from journal import TradeJournal
+from strategy import Strategy
+from sweep import param_grid, rank_params, run_sweep
+from synthetic import synthetic_universe
+
+# loose thresholds so a random walk trades under most combos
+GRID = {"rsi_window": [7, 14], "rsi_buy": [40, 45], "rsi_sell": [55], "sma_short": [5, 20], "sma_long": [10]}
+UNIVERSE = synthetic_universe(3, n_bars=300)
+
+
+def test_param_grid_drops_impossible_combos():
+    combos = param_grid(GRID)
+    assert len(combos) == 4  # sma_short 20 >= sma_long 10 is dropped
+    assert all(c["sma_short"] < c["sma_long"] for c in combos)
+    with pytest.raises(ValueError):
+        param_grid({"stop_loss": [0.1]})
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_sweep_rows_match_a_direct_backtest(max_workers):
+    results = run_sweep(UNIVERSE, grid=GRID, starting_cash=10_000.0, max_workers=max_workers)
+    assert len(results) == len(UNIVERSE) * 4
+    assert results["total_pnl"].is_monotonic_decreasing
+    assert results["trades"].sum() > 0
+    for row in results.to_dict("records"):
+        params = {k: row[k] for k in GRID}
+        signals = Strategy(UNIVERSE[row["ticker"]], **params).generate_signals()
+        bt = Backtester(signals, row["ticker"], starting_cash=10_000.0, journal=TradeJournal(log=False))
+        _, final_value = bt.run()
+        direct = bt.get_performance_metrics()
+        assert row["final_value"] == pytest.approx(final_value)
+        assert (row["trades"], row["wins"], row["losses"]) == \
+            (direct["Total_Trades"], direct["Winning_Trades"], direct["Losing_Trades"])
+        assert row["total_pnl"] == pytest.approx(direct["Total_PnL"])
+        assert row["sharpe"] == pytest.approx(direct["Sharpe_Ratio"])
+        assert row["max_drawdown"] * 100 == pytest.approx(direct["Max_Drawdown_Pct"])
+        assert row["turnover"] == pytest.approx(direct["Turnover"])
+
+
+def test_rank_params_aggregates_over_tickers():
+    results = run_sweep(UNIVERSE, grid=GRID, max_workers=1)
+    ranked = rank_params(results)
+    assert len(ranked) == 4 and (ranked["tickers"] == 3).all()
+    assert ranked["total_pnl"].sum() == pytest.approx(results["total_pnl"].sum())
+    best = ranked.iloc[0]
+    rows = results[(results[list(GRID)] == best[list(GRID)]).all(axis=1)]
+    assert len(rows) == 3
+    assert best["total_pnl"] == pytest.approx(rows["total_pnl"].sum())
+    assert best["worst_drawdown"] == pytest.approx(rows["max_drawdown"].min())
+    assert ranked["total_pnl"].is_monotonic_decreasing
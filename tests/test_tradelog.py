@@ -0,0 +1,80 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import Trade
+from tradelog import TradeLog
+
+TRADES = [
+    Trade("AAA", dt.date(2024, 1, 2), 100.0, dt.date(2024, 1, 5), 110.0, size=2.0),
+    Trade("BBB", dt.date(2024, 1, 3), 50.0, dt.date(2024, 1, 4), 45.0),
+    Trade("AAA", dt.date(2024, 1, 8), 105.0, dt.date(2024, 1, 10), 100.0),
+    Trade("BBB", dt.date(2024, 1, 9), 40.0),  # still open
+]
+
+
+def test_from_trades_round_trips():
+    log = TradeLog.from_trades(TRADES)
+    assert len(log) == 4 and log.tickers == ["AAA", "BBB"]
+    assert log.to_trades() == TRADES
+    assert list(log) == TRADES and log[1] == TRADES[1]
+    assert log[1:3].to_trades() == TRADES[1:3]
+    assert log[log.wins].to_trades() == [TRADES[0]]
+    np.testing.assert_allclose(log.pnl, [20.0, -5.0, -5.0, np.nan])
+    assert log.holding_period[0] == np.timedelta64(3, "D") and np.isnat(log.holding_period[3])
+
+
+def test_intraday_times_keep_their_time_zone():
+    entry = pd.Timestamp("2024-03-01 09:30", tz="America/New_York")
+    trade = Trade("AAA", entry, 10.0, entry + pd.Timedelta(minutes=45), 11.0)
+    log = TradeLog.from_trades([trade], tz="America/New_York")
+    # stored in UTC, handed back in the log's zone
+    assert log.records["entry_time"][0] == np.datetime64("2024-03-01T14:30")
+    assert log[0] == trade and log[0].entry_date.tz is not None
+    # naive times are read as being in the log's zone
+    naive = Trade("AAA", entry.tz_localize(None), 10.0)
+    assert TradeLog.from_trades([naive], tz="America/New_York")[0].entry_date == entry
+
+
+def test_concat_remaps_ticker_ids():
+    first = TradeLog.from_trades(TRADES[:2])  # AAA=0, BBB=1
+    second = TradeLog.from_trades([TRADES[3], TRADES[2], Trade("CCC", dt.date(2024, 1, 11), 7.0, dt.date(2024, 1, 12),
+                                                                8.0)])  # BBB=0, AAA=1, CCC=2
+    merged = TradeLog.concat([first, TradeLog(), second])
+    assert merged.tickers == ["AAA", "BBB", "CCC"]
+    assert merged.to_trades() == TRADES[:2] + [TRADES[3], TRADES[2]] + second.to_trades()[2:]
+    assert list(merged.ticker_names) == ["AAA", "BBB", "BBB", "AAA", "CCC"]
+    assert len(TradeLog.concat([])) == 0
+
+
+def test_by_ticker_and_summary():
+    log = TradeLog.from_trades(TRADES)
+    table = log.by_ticker()
+    assert list(table.index) == ["AAA", "BBB"]
+    assert table.loc["AAA", ["trades", "wins", "losses"]].tolist() == [2, 1, 1]
+    assert table.loc["AAA", "win_ratio"] == 0.5
+    assert table.loc["AAA", "total_pnl"] == pytest.approx(15.0)
+    assert table.loc["AAA", "mean_return"] == pytest.approx((0.1 + 100 / 105 - 1) / 2)
+    assert table.loc["AAA", "mean_holding"] == pd.Timedelta(days=2.5)
+    # the open BBB trade counts as a loss with no P&L, and is left out of the return and holding means
+    assert table.loc["BBB", ["trades", "wins", "losses"]].tolist() == [2, 0, 2]
+    assert table.loc["BBB", "total_pnl"] == pytest.approx(-5.0)
+    assert table.loc["BBB", "mean_return"] == pytest.approx(-0.1)
+    assert table.loc["BBB", "mean_holding"] == pd.Timedelta(days=1)
+    assert log.summary() == {"trades": 4, "wins": 1, "losses": 3, "win_ratio": 0.25, "total_pnl": 10.0}
+    assert TradeLog().summary()["win_ratio"] is None and TradeLog().by_ticker().empty
+
+
+def test_to_frame():
+    frame = TradeLog.from_trades(TRADES).to_frame()
+    assert list(frame.columns) == ["ticker", "entry_date", "entry_price", "exit_date", "exit_price", "size", "pnl"]
+    # daily trades are written as plain dates, like the Trade objects they came from
+    assert frame["entry_date"].tolist() == [t.entry_date for t in TRADES]
+    assert frame["exit_date"].iloc[0] == dt.date(2024, 1, 5) and pd.isna(frame["exit_date"].iloc[3])
+    np.testing.assert_allclose(frame["pnl"], [20.0, -5.0, -5.0, np.nan])
+
+    entry = pd.Timestamp("2024-03-01 09:30", tz="Asia/Kolkata")
+    intraday = TradeLog.from_trades([Trade("AAA", entry, 10.0, entry + pd.Timedelta(hours=1), 12.0)]).to_frame()
+    assert intraday["entry_date"].iloc[0] == entry and intraday["pnl"].iloc[0] == 2.0
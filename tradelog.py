@@ -0,0 +1,222 @@
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from strategy import Trade, bar_time
+
+# one packed record per trade; open trades have NaT exit_time and NaN exit_price
+TRADE_DTYPE = np.dtype([
+    ("ticker", np.int32),
+    ("entry_time", "M8[ns]"),
+    ("exit_time", "M8[ns]"),
+    ("entry_price", np.float64),
+    ("exit_price", np.float64),
+    ("size", np.float64),
+])
+
+
+def _to_utc_ns(times) -> np.ndarray:
+    index = pd.DatetimeIndex(times)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").to_numpy()
+
+
+class TradeLog:
+    """Columnar trade list: a structured array (TRADE_DTYPE) plus the ticker-id -> name table.
+
+    Statistics (`pnl`, `summary`, `by_ticker`, ...) are computed over whole columns.
+    Indexing with an int, or iterating, gives `strategy.Trade` objects, so a TradeLog can
+    stand in for the list of trades it replaces. Slices and boolean masks give a
+    TradeLog. Timestamps are kept in UTC and shown in `tz`.
+    """
+
+    def __init__(self, records: Optional[np.ndarray] = None, tickers: Sequence[str] = (), tz=None):
+        self.records = records if records is not None else np.empty(0, dtype=TRADE_DTYPE)
+        self.tickers: List[str] = list(tickers)
+        self.tz = tz
+
+    @classmethod
+    def from_arrays(cls, ticker: str, entry_times, exit_times, entry_prices, exit_prices, sizes) -> "TradeLog":
+        """One ticker's trades from parallel arrays; times may be tz-aware (the tz is kept)."""
+        entry_index = pd.DatetimeIndex(entry_times)
+        records = np.empty(len(entry_index), dtype=TRADE_DTYPE)
+        records["ticker"] = 0
+        records["entry_time"] = _to_utc_ns(entry_index)
+        records["exit_time"] = _to_utc_ns(exit_times)
+        records["entry_price"] = entry_prices
+        records["exit_price"] = exit_prices
+        records["size"] = sizes
+        return cls(records, [ticker], entry_index.tz)
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade], tz=None) -> "TradeLog":
+        """Pack Trade objects; naive (or date-only) times are taken to be in `tz` when given.
+
+        Without `tz` the log takes the zone of the first tz-aware entry time, if any.
+        """
+        trades = list(trades)
+        if tz is None:
+            tz = next((t.entry_date.tz for t in trades
+                       if isinstance(t.entry_date, pd.Timestamp) and t.entry_date.tz is not None), None)
+        tickers = list(dict.fromkeys(t.ticker for t in trades))
+        ids = {name: i for i, name in enumerate(tickers)}
+
+        def times(values) -> np.ndarray:
+            index = pd.DatetimeIndex([pd.NaT if v is None else pd.Timestamp(v) for v in values])
+            if tz is not None and index.tz is None:
+                index = index.tz_localize(tz)
+            return _to_utc_ns(index)
+
+        records = np.empty(len(trades), dtype=TRADE_DTYPE)
+        records["ticker"] = [ids[t.ticker] for t in trades]
+        records["entry_time"] = times([t.entry_date for t in trades])
+        records["exit_time"] = times([t.exit_date for t in trades])
+        records["entry_price"] = [t.entry_price for t in trades]
+        records["exit_price"] = [np.nan if t.exit_price is None else t.exit_price for t in trades]
+        records["size"] = [t.size for t in trades]
+        return cls(records, tickers, tz)
+
+    @classmethod
+    def concat(cls, logs: Iterable["TradeLog"]) -> "TradeLog":
+        """Merge logs (e.g. one per ticker from a sweep), remapping ticker ids."""
+        logs = list(logs)
+        tickers: List[str] = []
+        ids = {}
+        parts = []
+        for log in logs:
+            mapping = np.empty(len(log.tickers), dtype=np.int32)
+            for i, name in enumerate(log.tickers):
+                if name not in ids:
+                    ids[name] = len(tickers)
+                    tickers.append(name)
+                mapping[i] = ids[name]
+            part = log.records.copy()
+            if len(part):
+                part["ticker"] = mapping[part["ticker"]]
+            parts.append(part)
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=TRADE_DTYPE)
+        tz = next((log.tz for log in logs if log.tz is not None), None)
+        return cls(records, tickers, tz)
+
+    # ---- sequence protocol --------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, key) -> Union[Trade, "TradeLog"]:
+        if isinstance(key, (int, np.integer)):
+            return self._trade(self.records[key])
+        return TradeLog(self.records[key], self.tickers, self.tz)
+
+    def __iter__(self) -> Iterator[Trade]:
+        return iter(self.to_trades())
+
+    def __repr__(self) -> str:
+        return f"TradeLog({len(self)} trades, {len(self.tickers)} tickers)"
+
+    def _time(self, ns) -> Optional[object]:
+        if np.isnat(ns):
+            return None
+        ts = pd.Timestamp(ns)
+        if self.tz is not None:
+            ts = ts.tz_localize("UTC").tz_convert(self.tz)
+        return bar_time(ts)
+
+    def _trade(self, r) -> Trade:
+        exit_price = float(r["exit_price"])
+        return Trade(ticker=self.tickers[r["ticker"]], entry_date=self._time(r["entry_time"]),
+                     entry_price=float(r["entry_price"]), exit_date=self._time(r["exit_time"]),
+                     exit_price=None if np.isnan(exit_price) else exit_price, size=float(r["size"]))
+
+    def to_trades(self) -> List[Trade]:
+        return [self._trade(r) for r in self.records]
+
+    # ---- columns ------------------------------------------------------------------
+
+    @property
+    def ticker_names(self) -> np.ndarray:
+        return np.asarray(self.tickers, dtype=object)[self.records["ticker"]] if len(self) else np.empty(0, dtype=object)
+
+    def _times(self, field: str) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(self.records[field])
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    @property
+    def entry_times(self) -> pd.DatetimeIndex:
+        return self._times("entry_time")
+
+    @property
+    def exit_times(self) -> pd.DatetimeIndex:
+        return self._times("exit_time")
+
+    @property
+    def pnl(self) -> np.ndarray:
+        """Per-trade P&L; NaN for trades that are still open."""
+        return (self.records["exit_price"] - self.records["entry_price"]) * self.records["size"]
+
+    @property
+    def returns(self) -> np.ndarray:
+        return self.records["exit_price"] / self.records["entry_price"] - 1.0
+
+    @property
+    def holding_period(self) -> np.ndarray:
+        """exit - entry as timedelta64[ns] (NaT while open)."""
+        return self.records["exit_time"] - self.records["entry_time"]
+
+    @property
+    def wins(self) -> np.ndarray:
+        return self.pnl > 0
+
+    # ---- aggregations --------------------------------------------------------------
+
+    def summary(self) -> dict:
+        """Same keys and semantics as the old per-trade loop: open trades count as 0 P&L losses."""
+        pnl = np.nan_to_num(self.pnl)
+        n = len(pnl)
+        wins = int(np.count_nonzero(pnl > 0))
+        return {"trades": n, "wins": wins, "losses": n - wins, "win_ratio": wins / n if n else None,
+                "total_pnl": float(pnl.sum())}
+
+    def by_ticker(self) -> pd.DataFrame:
+        """Per-ticker trades, wins, losses, win_ratio, total_pnl, mean_return and mean_holding."""
+        n_tickers = len(self.tickers)
+        ids = self.records["ticker"]
+        pnl = np.nan_to_num(self.pnl)
+        trades = np.bincount(ids, minlength=n_tickers)
+        wins = np.bincount(ids, weights=pnl > 0, minlength=n_tickers).astype(int)
+        total = np.bincount(ids, weights=pnl, minlength=n_tickers)
+        closed = ~np.isnat(self.records["exit_time"])
+        closed_n = np.bincount(ids[closed], minlength=n_tickers)
+        holding = self.holding_period[closed].astype(np.int64)
+        hold_sum = np.bincount(ids[closed], weights=holding, minlength=n_tickers)
+        ret_sum = np.bincount(ids[closed], weights=self.returns[closed], minlength=n_tickers)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame = pd.DataFrame({
+                "trades": trades,
+                "wins": wins,
+                "losses": trades - wins,
+                "win_ratio": np.where(trades > 0, wins / trades, np.nan),
+                "total_pnl": total,
+                "mean_return": ret_sum / closed_n,
+                "mean_holding": pd.to_timedelta(hold_sum / closed_n, unit="ns"),
+            }, index=pd.Index(self.tickers, name="ticker"))
+        return frame[frame["trades"] > 0]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Rows shaped like Trade (plus pnl) for CSVSLogger.log_trades and the Sheets trade tab."""
+        entry = self.entry_times
+        exit_ = self.exit_times
+        daily = len(self) and (entry == entry.normalize()).all() and (exit_.isna() | (exit_ == exit_.normalize())).all()
+        return pd.DataFrame({
+            "ticker": self.ticker_names,
+            "entry_date": entry.date if daily else entry,
+            "entry_price": self.records["entry_price"],
+            "exit_date": exit_.date if daily else exit_,
+            "exit_price": self.records["exit_price"],
+            "size": self.records["size"],
+            "pnl": self.pnl,
+        })